@@ -29,6 +29,7 @@ import os
 # Import custom modules
 import views as v
 import models as m
+import playback
 from mainmenu import MainMenu
 
 
@@ -54,6 +55,16 @@ class Application(tk.Tk):
         self.audio_data = pd.DataFrame()
         self._load_audiolist_model()
 
+        # One output stream for the whole session
+        self.player = playback.PlaybackEngine(
+            device=self.sessionpars['Audio Device ID'].get())
+
+        # Preload level-scaled stimuli so playback does not 
+        # wait on reading and scaling a file
+        self.stim_cache = m.StimulusCache(
+            self.sessionpars['Adjusted Presentation Level'].get())
+        self._preload_stimuli()
+
         # Initialize objects
         self.model = m.CSVModel(self.sessionpars)
         self.main_frame = v.MainFrame(self, self.model, self.sessionpars)
@@ -68,7 +79,7 @@ class Application(tk.Tk):
         # Create callback dictionary
         event_callbacks = {
             '<<FileSession>>': lambda _: self._show_sessionpars(),
-            '<<FileQuit>>': lambda _: self.quit(),
+            '<<FileQuit>>': lambda _: self._quit(),
             '<<ParsDialogOk>>': lambda _: self._save_sessionpars(),
             '<<ParsDialogCancel>>': lambda _: self._load_sessionpars(),
             '<<ToolsSpeaker>>': lambda _: self._show_audioconfig(),
@@ -81,6 +92,9 @@ class Application(tk.Tk):
         for sequence, callback in event_callbacks.items():
             self.bind(sequence, callback)
 
+        # Close the output stream when the window is closed
+        self.protocol('WM_DELETE_WINDOW', self._quit)
+
         # Status label to display trial count
         self.status = tk.StringVar(value="Trials Completed: 0")
         ttk.Label(self, textvariable=self.status).grid(
@@ -131,6 +145,9 @@ class Application(tk.Tk):
         print(f"Calculated level from _calc_level: " +
             f"{self.sessionpars['Adjusted Presentation Level'].get()}")
         self._save_sessionpars()
+        # Drop cached stimuli scaled to the old level
+        self.stim_cache.set_level(
+            self.sessionpars['Adjusted Presentation Level'].get())
 
 
     def resource_path(self, relative_path):
@@ -167,7 +184,8 @@ class Application(tk.Tk):
 
         # Present calibration stimulus
         cal_stim.play(device_id=self.sessionpars['Audio Device ID'].get(), 
-            channels=self.sessionpars['Speaker Number'].get())
+            channels=self.sessionpars['Speaker Number'].get(),
+            engine=self.player)
     
 
     def _load_sessionpars(self):
@@ -220,6 +238,14 @@ class Application(tk.Tk):
             )
 
 
+    def _preload_stimuli(self):
+        """ Read and level-scale every file in the audio list """
+        try:
+            self.stim_cache.preload(self.df_audio_data["Audio List"])
+        except AttributeError:
+            print("App: No audio files to preload")
+
+
     def _get_audio(self, *_):
         """ Increment counter, pull audio file, present audio """
         # Get what button was pressed
@@ -265,17 +291,16 @@ class Application(tk.Tk):
         # Calculate adjusted presentation level in case of change
         self._calc_level()
 
-        # Create audio object from stimulus list
-        # Audio object expects a full file path and a presentation level
+        # Get level-scaled audio object from the stimulus cache
+        # (only read from disk if not already cached)
         print(f"Adjusted presentation level: " + 
             f"{self.sessionpars['Adjusted Presentation Level'].get()}")
-        print(type(self.sessionpars['Adjusted Presentation Level'].get()))
-        audio_obj = m.Audio(self.filename, 
-            self.sessionpars['Adjusted Presentation Level'].get())
+        audio_obj = self.stim_cache.get(self.filename)
 
         # Present wav file stimulus
         audio_obj.play(device_id=self.sessionpars['Audio Device ID'].get(),
-            channels=self.sessionpars['Speaker Number'].get())
+            channels=self.sessionpars['Speaker Number'].get(),
+            engine=self.player)
 
 
     def _on_submit(self, *_):
@@ -298,6 +323,7 @@ class Application(tk.Tk):
 
     def _quit(self):
         """ Exit the program """
+        self.player.close()
         self.destroy()
 
 
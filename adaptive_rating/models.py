@@ -5,6 +5,7 @@ import csv
 from pathlib import Path
 from datetime import datetime
 import os
+from collections import OrderedDict
 
 # Import data science packages
 import numpy as np
@@ -214,8 +215,9 @@ class Audio:
         self.file_path = file_path
         self.level = level
 
-        # Read audio file
-        fs, audio_file = wavfile.read(self.file_path)
+        # Read audio file as a memory map: samples stay on 
+        # disk until they are used
+        fs, audio_file = self._read_wav(self.file_path)
 
         # Get number of channels
         try:
@@ -227,34 +229,109 @@ class Audio:
         # Assign audio file attributes
         self.fs = fs
         self.original_audio = audio_file
-        self.dur = len(self.original_audio) / self.fs
-        self.t = np.arange(0, self.dur, 1/self.fs)
+        self._n_samples = len(audio_file)
+        self.dur = self._n_samples / self.fs
 
         # Get data type
         #self.data_type = np.dtype(audio_file[0])
         self.data_type = audio_file.dtype
         print(f"Incoming audio data type: {self.data_type}")
 
-        # Immediately convert to float64 for processing
-        self.convert_to_float()
+        # Conversion to float64 is deferred until working_audio 
+        # (or a slice of the audio) is requested
+        self._working_audio = None
+        self.scaled = False
+
+
+    @staticmethod
+    def _read_wav(file_path):
+        """ Read a .wav file as a read-only memory map, so 
+            opening a file does not copy its samples into RAM. 
+            Falls back to a normal read for formats scipy 
+            cannot memory map (e.g., 24-bit).
+
+            The file stays open for as long as the mapped 
+            array lives; on Windows it cannot be replaced or 
+            deleted until then. Objects kept for a long time 
+            should call release().
+        """
+        try:
+            return wavfile.read(file_path, mmap=True)
+        except ValueError:
+            return wavfile.read(file_path)
+
+
+    def release(self):
+        """ Drop the original audio, closing the .wav file. 
+            Working audio is converted first (if it was not 
+            already), so only one copy of the samples stays 
+            in memory. Afterwards, only working_audio can be 
+            used: slicing the object raises a ValueError.
+        """
+        if self._working_audio is None:
+            self.convert_to_float()
+        self.original_audio = None
+
+
+    @property
+    def t(self):
+        """ Time base in seconds, computed only when asked for """
+        return np.arange(0, self.dur, 1/self.fs)
+
+
+    @property
+    def working_audio(self):
+        """ Float64 audio for processing. Converted from the 
+            memory-mapped original audio on first use.
+        """
+        if self._working_audio is None:
+            self.convert_to_float()
+        return self._working_audio
+
+
+    @working_audio.setter
+    def working_audio(self, sig):
+        self._working_audio = sig
+
+
+    def __len__(self):
+        return self._n_samples
+
+
+    def __getitem__(self, index):
+        """ Float64 samples for a slice of the audio. Only the 
+            requested samples are read and converted, e.g.:
+                block = audio_obj[start:stop]
+        """
+        if self.original_audio is None:
+            raise ValueError(f"{self.name} was released; " +
+                "use working_audio")
+        return self._to_float(self.original_audio[index])
+
+
+    def _to_float(self, sig):
+        """ Convert samples of the original data type to float64 """
+        if self.data_type == 'float64':
+            return np.array(sig)
+        # 1. Convert to float64
+        sig = np.asarray(sig, dtype=np.float64)
+        # 2. Divide by original dtype max val
+        return sig / self.wav_dict[str(self.data_type)][1]
 
 
     def convert_to_float(self):
         """ Convert original audio data type to float64 
             for processing
         """
-        if self.data_type == 'float64':
-            self.working_audio = self.original_audio
-        else:
-            # 1. Convert to float64
-            sig = self.original_audio.astype(np.float64)
-            # 2. Divide by original dtype max val
-            sig = sig / self.wav_dict[str(self.data_type)][1]
-            self.working_audio = sig
+        self.working_audio = self[:]
 
 
-    def play(self, device_id, channels):
-        """ Present working audio """
+    def play(self, device_id, channels, engine=None):
+        """ Present working audio. If ENGINE (see 
+            playback.PlaybackEngine) is given, the audio 
+            replaces whatever the engine is playing; 
+            otherwise it is played with sd.play.
+        """
         #print(f"Presenting audio data type: {np.dtype(self.working_audio[0])}")
         print(f"Presenting audio data type: {self.working_audio.dtype}")
         # plt.subplot(1,3,1)
@@ -262,7 +339,29 @@ class Audio:
         # plt.subplot(1,3,2)
         # plt.plot(self.working_audio)
 
+        self.apply_level()
+        # plt.subplot(1,3,3)
+        # plt.plot(self.working_audio)
+        # plt.show()
+
+        if engine is not None:
+            engine.play(self.working_audio.T, fs=self.fs,
+                mapping=channels, device=device_id)
+            return
+
         sd.default.device = device_id
+        sd.play(self.working_audio.T, self.fs, mapping=channels)
+        #sd.wait(self.dur+0.5)
+
+
+    def apply_level(self):
+        """ Scale working audio to the presentation level. 
+            Only scales once, so a level-scaled Audio object 
+            can be played again (e.g., from StimulusCache) 
+            without re-running setRMS.
+        """
+        if self.scaled:
+            return
 
         if self.channels == 1:
             sig = self.setRMS(self.working_audio, self.level)
@@ -271,12 +370,7 @@ class Audio:
             left = self.setRMS(self.working_audio[:,0], self.level)
             right = self.setRMS(self.working_audio[:,1], self.level)
             self.working_audio = np.array([left, right])
-        # plt.subplot(1,3,3)
-        # plt.plot(self.working_audio)
-        # plt.show()
-
-        sd.play(self.working_audio.T, self.fs, mapping=channels)
-        #sd.wait(self.dur+0.5)
+        self.scaled = True
 
 
     def convert_to_original(self):
@@ -420,3 +514,68 @@ class Audio:
 
             sigBothAdj = np.array([sigAdjLeft, sigAdjRight])
             return sigBothAdj
+
+
+class StimulusCache:
+    """ Level-scaled Audio objects, ready to play. 
+        
+        Stimuli are keyed by file path. Every entry is scaled 
+        to the same presentation level; changing the level 
+        (see set_level) empties the cache. Stimuli can be 
+        preloaded at session start, or loaded on first use. 
+        If MAX_ITEMS is given, the least recently used 
+        stimuli are dropped once the cache is full.
+    """
+    def __init__(self, level, max_items=None):
+        self.level = level
+        self.max_items = max_items
+        self._stimuli = OrderedDict()
+
+
+    def set_level(self, level):
+        """ Update the presentation level. Cached stimuli were 
+            scaled to the old level, so they are dropped.
+        """
+        if level != self.level:
+            print(f"Models: Presentation level changed to {level}; " +
+                "clearing stimulus cache")
+            self.level = level
+            self.clear()
+
+
+    def get(self, file_path):
+        """ Return a level-scaled Audio object for FILE_PATH,
+            reading and scaling it only if it is not cached
+        """
+        if file_path in self._stimuli:
+            self._stimuli.move_to_end(file_path)
+            return self._stimuli[file_path]
+
+        audio_obj = Audio(file_path, self.level)
+        audio_obj.apply_level()
+        # Cached stimuli live for the whole session: don't keep 
+        # their files open (locked on Windows)
+        audio_obj.release()
+        self._stimuli[file_path] = audio_obj
+        if self.max_items is not None and len(self._stimuli) > self.max_items:
+            self._stimuli.popitem(last=False)
+        return audio_obj
+
+
+    def preload(self, file_paths):
+        """ Read and scale every file in FILE_PATHS """
+        for file_path in file_paths:
+            self.get(file_path)
+        print(f"Models: Preloaded {len(self._stimuli)} stimuli")
+
+
+    def clear(self):
+        self._stimuli.clear()
+
+
+    def __contains__(self, file_path):
+        return file_path in self._stimuli
+
+
+    def __len__(self):
+        return len(self._stimuli)
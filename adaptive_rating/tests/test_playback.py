@@ -0,0 +1,165 @@
+"""Unit tests for the playback engine, run through
+    FakeOutputStream (no sound card needed).
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+
+# Import system packages
+import os
+import filecmp
+
+# Import custom module for testing
+from playback import PlaybackEngine, FakeOutputStream
+
+
+#########
+# Setup #
+#########
+FS = 1000
+BLOCK = 512
+
+
+def make_engine(**kwargs):
+    """Engine with a 2 second buffer at 1 kHz """
+    engine = PlaybackEngine(fs=FS, buffer_dur=2, blocksize=BLOCK,
+        backend=FakeOutputStream, **kwargs)
+    engine.start()
+    return engine
+
+
+##################
+# Playback Tests #
+##################
+class TestQueue(unittest.TestCase):
+    def test_queue_plays_in_order(self):
+        engine = make_engine()
+        engine.queue(np.full(300, 1.0))
+        engine.queue(np.full(300, 2.0))
+        out = engine.stream.pump(2)
+        np.testing.assert_array_equal(out[0:300, 0], 1)
+        np.testing.assert_array_equal(out[300:600, 0], 2)
+        np.testing.assert_array_equal(out[600:], 0)
+        np.testing.assert_array_equal(out[:, 1], 0)
+        self.assertFalse(engine.is_playing)
+
+    def test_buffer_full(self):
+        engine = make_engine()
+        engine.queue(np.zeros(1500))
+        with self.assertRaises(ValueError):
+            engine.queue(np.zeros(1000))
+        # The failed queue() is not tracked for latency
+        self.assertEqual(len(engine._starts), 1)
+
+    def test_stop(self):
+        engine = make_engine()
+        engine.queue(np.ones(1500))
+        engine.stream.pump(1)
+        engine.stop()
+        self.assertFalse(engine.is_playing)
+        out = engine.stream.pump(2)
+        np.testing.assert_array_equal(out[BLOCK:], 0)
+
+
+class TestReplace(unittest.TestCase):
+    def test_play_before_callback(self):
+        # Discarded audio must count as free space even
+        # before the callback applies the flush
+        engine = make_engine()
+        engine.queue(np.ones(1500))
+        engine.play(np.full(1000, 2.0))
+        self.assertTrue(engine.is_playing)
+        out = engine.stream.pump(3)
+        np.testing.assert_array_equal(out[0:1000, 0], 2)
+        np.testing.assert_array_equal(out[1000:], 0)
+
+    def test_play_while_playing(self):
+        engine = make_engine()
+        engine.queue(np.ones(1500))
+        engine.stream.pump(1)
+        engine.play(np.full(1800, 2.0))
+        out = engine.stream.pump(5)
+        np.testing.assert_array_equal(out[0:BLOCK, 0], 1)
+        np.testing.assert_array_equal(out[BLOCK:BLOCK + 1800, 0], 2)
+        np.testing.assert_array_equal(out[BLOCK + 1800:], 0)
+
+    def test_repeated_replace(self):
+        engine = make_engine()
+        for value in [1.0, 2.0, 3.0]:
+            engine.play(np.full(1500, value))
+        out = engine.stream.pump(3)
+        np.testing.assert_array_equal(out[0:1500, 0], 3)
+        np.testing.assert_array_equal(out[1500:], 0)
+
+
+class TestMapping(unittest.TestCase):
+    def test_mono_to_channels(self):
+        engine = make_engine()
+        engine.queue(np.ones(100), mapping=[2])
+        out = engine.stream.pump(1)
+        np.testing.assert_array_equal(out[0:100, 0], 0)
+        np.testing.assert_array_equal(out[0:100, 1], 1)
+
+    def test_multichannel_from_start_channel(self):
+        engine = make_engine(min_channels=4)
+        sig = np.column_stack([np.full(100, 1.0), np.full(100, 2.0)])
+        engine.queue(sig, mapping=3)
+        out = engine.stream.pump(1)
+        np.testing.assert_array_equal(out[0:100, 0:2], 0)
+        np.testing.assert_array_equal(out[0:100, 2], 1)
+        np.testing.assert_array_equal(out[0:100, 3], 2)
+
+    def test_more_channels_reopens_stream(self):
+        engine = make_engine()
+        first = engine.stream
+        engine.queue(np.ones(100), mapping=[1, 4])
+        self.assertIsNot(engine.stream, first)
+        self.assertEqual(engine.stream.channels, 4)
+        out = engine.stream.pump(1)
+        np.testing.assert_array_equal(out[0:100, [0, 3]], 1)
+        np.testing.assert_array_equal(out[0:100, [1, 2]], 0)
+
+    def test_bad_mapping(self):
+        engine = make_engine()
+        with self.assertRaises(ValueError):
+            engine.queue(np.zeros((100, 3)), mapping=[1, 2])
+
+
+class TestLatency(unittest.TestCase):
+    def test_latency(self):
+        engine = make_engine()
+        block_dur = BLOCK / FS
+        engine.queue(np.zeros(1000))
+        engine.stream.pump(1)
+        self.assertAlmostEqual(engine.latency['reported'], block_dur)
+        self.assertAlmostEqual(engine.latency['buffer'], block_dur)
+        # Queued at t=0 and played from the first sample
+        self.assertAlmostEqual(engine.latency['start'], block_dur)
+
+        # Queued behind 488 frames still waiting
+        engine.queue(np.zeros(100))
+        engine.stream.pump(1)
+        self.assertAlmostEqual(engine.latency['start'],
+            (1000 - BLOCK) / FS + block_dur)
+
+
+
+class TestCopies(unittest.TestCase):
+    def test_rating_slider_copy(self):
+        # Each app is bundled on its own, so rating_slider keeps 
+        # its own copy of playback.py; it must not drift
+        here = os.path.dirname(os.path.abspath(__file__))
+        ours = os.path.join(here, '..', 'playback.py')
+        theirs = os.path.join(here, '..', '..', 'rating_slider',
+            'playback.py')
+        self.assertTrue(filecmp.cmp(ours, theirs, shallow=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,11 @@ import seaborn as sns
 from scipy.stats import kde
 
 # Import system packages
-from pathlib import Path
+import os
+
+# Import custom modules
+from session_store import SessionStore
+from batch_render import FigureJob, render_jobs
 
 
 #########
@@ -23,8 +27,13 @@ from pathlib import Path
 # Import all data files as a single dataframe
 path = "C:/Users/MooTra/OneDrive - Starkey/Documents/Projects/EdgeMode/Transition Speed Pilot/Data/"
 path = path + 'MOA Data'
-files = Path(path).glob('*.csv')
-df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+# Only new or changed sessions are parsed (see session_store.py);
+# the store lives next to this script, not in the working directory
+store = SessionStore(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session_store'),
+    study='MOA')
+store.ingest(path)
+df = store.load()
 # Rename the "filename_value" column to reflect the data
 df.rename(columns = {'filename_value':'rating'}, inplace=True)
 # Convert subject numbers to strings for plotting
@@ -122,13 +131,20 @@ def mk_plot(gain_condition):
     plt.suptitle(gain_condition.iloc[1].condition.split('_')[1])
 
 
-# Call plotting function for each gain condition
-mk_plot(oag)
-mk_plot(lfg)
-mk_plot(hfg)
-
-# Show all plots
-plt.show()
+# Render the plots headlessly, in parallel, instead of showing 
+# them (see batch_render.py; unchanged data are skipped)
+BATCH_RENDER = False
+if BATCH_RENDER and __name__ == '__main__':
+    render_jobs([FigureJob('moa_' + name, mk_plot, args=(cond,))
+        for name, cond in [('oag', oag), ('lfg', lfg), ('hfg', hfg)]])
+elif not BATCH_RENDER:
+    # Call plotting function for each gain condition
+    mk_plot(oag)
+    mk_plot(lfg)
+    mk_plot(hfg)
+
+    # Show all plots
+    plt.show()
 
 
 # """ Bar Plot """
@@ -15,7 +15,11 @@ from statsmodels.formula.api import ols
 from statsmodels.stats.multicomp import pairwise_tukeyhsd
 
 # Import system packages
-from pathlib import Path
+import os
+
+# Import custom modules
+from session_store import SessionStore
+import resampling as rs
 
 
 #########
@@ -24,8 +28,13 @@ from pathlib import Path
 # Import all data files as a single dataframe
 path = "C:/Users/MooTra/OneDrive - Starkey/Documents/Projects/EdgeMode/Transition Speed Pilot/Data/"
 path = path + 'MOA Data'
-files = Path(path).glob('*.csv')
-df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+# Only new or changed sessions are parsed (see session_store.py);
+# the store lives next to this script, not in the working directory
+store = SessionStore(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session_store'),
+    study='MOA')
+store.ingest(path)
+df = store.load()
 
 # Rename the "filename_value" column to reflect the data
 df.rename(columns = {'filename_value':'rating'}, inplace=True)
@@ -65,45 +74,34 @@ print('')
 ###############
 # Effect Size #
 ###############
-# Cohen's d function
-def cohen_d(d1, d2):
-    """ Calculate Cohen's d for independent samples
-    """
-    # Calculate the size of the samples
-    n1, n2 = len(d1), len(d2)
-    # Calculate the variance of the samples
-    s1, s2 = np.var(d1, ddof=1), np.var(d2, ddof=1)
-    # Calculate the pooled standard deviation
-    s = np.sqrt(((n1 - 1) * s1 + (n2 - 1) * s2) / (n1 + n2 -2))
-    # Calculate the means of the samples
-    u1, u2 = np.mean(d1), np.mean(d2)
-    # Calculate the effect size
-    return (u1 - u2) / s
-
-# Get ratings by speed
-pref_ratings = df[df['speed']=='PREF']['rating']
-fast_ratings = df[df['speed']=='FAST']['rating']
-slow_ratings = df[df['speed']=='SLOW']['rating']
-
-# Get ratings by gain
-oag_ratings = df[df['gain']=='OAG']['rating']
-lfg_ratings = df[df['gain']=='LFG']['rating'] 
-hfg_ratings = df[df['gain']=='HFG']['rating']
+# Ratings for each speed and gain
+groups = {label: df[df[col] == label]['rating']
+    for col, labels in [('speed', ['PREF', 'FAST', 'SLOW']),
+        ('gain', ['OAG', 'LFG', 'HFG'])]
+    for label in labels}
 
 condition_sets = {
-    'PREF-FAST': (pref_ratings, fast_ratings), 
-    'PREF-SLOW': (pref_ratings, slow_ratings),
-    'SLOW-FAST': (slow_ratings, fast_ratings),
-    'OAG-LFG': (oag_ratings, lfg_ratings),
-    'OAG-HFG': (oag_ratings, hfg_ratings),
-    'LFG-HFG': (lfg_ratings, hfg_ratings)
+    'PREF-FAST': ('PREF', 'FAST'),
+    'PREF-SLOW': ('PREF', 'SLOW'),
+    'SLOW-FAST': ('SLOW', 'FAST'),
+    'OAG-LFG': ('OAG', 'LFG'),
+    'OAG-HFG': ('OAG', 'HFG'),
+    'LFG-HFG': ('LFG', 'HFG')
     }
 
-for key in condition_sets.keys():
-    d = cohen_d(condition_sets[key][0], condition_sets[key][1])
+# Cohen's d with 95% bootstrap CIs and permutation p-values
+# for all pairs at once (see resampling.py)
+effects = rs.contrasts(groups, condition_sets, n_boot=10000, n_perm=10000,
+    seed=2022)
+
+for row in effects.itertuples():
     print('-' * 60)
-    print(f"Cohen's d for {key}")
-    print(f"d = {np.round(d, 2)}")
+    print(f"Cohen's d for {row.pair}")
+    print(f"d = {np.round(row.d, 2)} " +
+        f"[{np.round(row.d_lwr, 2)}, {np.round(row.d_upr, 2)}]")
+    print(f"Mean difference = {np.round(row.mean_diff, 2)} " +
+        f"[{np.round(row.mean_diff_lwr, 2)}, {np.round(row.mean_diff_upr, 2)}], " +
+        f"permutation p = {np.round(row.p_perm, 4)}")
 
 print('')
 
@@ -1,5 +1,12 @@
 """ Data organization and analysis for Qualtrics-based APHAB results.
 
+    Scoring tables (subscales, reversed items and response
+    scores) are declared in questionnaires.APHAB. Subject
+    scores are kept as running sums and counts per
+    subscale, cached next to the Qualtrics export, so a
+    re-run only scores rows that were appended since the
+    last run.
+
     Author: Travis M. Moore
     Created: 10/19/2022
     Last Edited: 10/19/2022
@@ -9,91 +16,145 @@
 # Imports #
 ###########
 # Import data science packages
-import numpy as np
 import pandas as pd
 
+# Import system packages
+import os
+import hashlib
+import pickle
+
+# Import custom modules
+import questionnaires as qs
+
+
+#################
+# Set constants #
+#################
+INSTRUMENT = qs.APHAB
+SUBSCALES = INSTRUMENT.subscales
+
+# Number of questions scored (1:24)
+N_QUESTIONS = max(INSTRUMENT.items)
+
+# Format of the score cache (older caches are rescored)
+CACHE_VERSION = 2
+
+
+#############
+# Functions #
+#############
+def read_qualtrics(file_path):
+    """ Read a Qualtrics APHAB export. Returns a wide
+        dataframe: 'subject' and questions 1:27.
+    """
+    data_full = pd.read_csv(file_path)
+    # Subset only pertinent data
+    data = data_full.iloc[2:, 17:].copy()
+    # Generate new column names
+    colnames = list(range(1,28))
+    colnames.insert(0, 'subject')
+    data.columns = colnames
+    return data.reset_index(drop=True)
+
+
+def score_responses(wide):
+    """ Score wide responses (see read_qualtrics). Returns
+        a long dataframe with one row per subject and
+        question (1:24): subject, q_num, value, reversed,
+        score and subscale.
+    """
+    q_nums = list(range(1, N_QUESTIONS + 1))
+    long = qs.from_wide(wide[['subject'] + q_nums], INSTRUMENT.name)
+    long['response'] = long['response'].astype(int)
+    long = qs.score_items(long, {INSTRUMENT.name: INSTRUMENT})
+    long = long.rename(columns={'item': 'q_num', 'response': 'value'})
+    return long.drop(columns='instrument')
+
+
+def _sums(wide):
+    """ Score sums and counts per subject and subscale """
+    q_nums = list(range(1, N_QUESTIONS + 1))
+    long = qs.from_wide(wide[['subject'] + q_nums], INSTRUMENT.name)
+    long['response'] = long['response'].astype(int)
+    return qs.subscale_sums(long, {INSTRUMENT.name: INSTRUMENT})
+
+
+def subject_scores(sums):
+    """ Subscale and global scores (mean item score) per
+        subject, from score sums and counts.
+    """
+    scores = qs.subscale_scores(sums, {INSTRUMENT.name: INSTRUMENT})
+    return scores[INSTRUMENT.name]
+
+
+def _hash_rows(wide):
+    return hashlib.sha1(pd.util.hash_pandas_object(
+        wide, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def score_incremental(file_path, cache_path=None):
+    """ Score a Qualtrics APHAB export, only scoring rows
+        appended since the last run. Score sums and counts
+        are cached in CACHE_PATH (default: next to FILE_PATH).
+        If previously scored rows changed, everything is
+        rescored. Returns subject_scores().
+    """
+    if cache_path is None:
+        cache_path = os.path.splitext(file_path)[0] + '_scores.pkl'
+
+    wide = read_qualtrics(file_path)
+
+    cache = None
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as fh:
+            cache = pickle.load(fh)
+        n_rows = cache['n_rows']
+        if cache.get('version') != CACHE_VERSION:
+            cache = None
+        elif n_rows > len(wide) or _hash_rows(wide.iloc[:n_rows]) != cache['hash']:
+            print("aphab: Scored rows changed; rescoring all rows")
+            cache = None
+
+    if cache is None:
+        sums = _sums(wide)
+        print(f"aphab: Scored {len(wide)} rows")
+    else:
+        sums = cache['sums']
+        new = wide.iloc[cache['n_rows']:]
+        if len(new) > 0:
+            sums = sums.add(_sums(new), fill_value=0)
+        print(f"aphab: Scored {len(new)} new rows")
+
+    with open(cache_path, 'wb') as fh:
+        pickle.dump({
+            'version': CACHE_VERSION,
+            'n_rows': len(wide),
+            'hash': _hash_rows(wide),
+            'sums': sums
+        }, fh)
+
+    return subject_scores(sums)
+
+
+if __name__ == '__main__':
+    ####################
+    # Calculate scores #
+    ####################
+    scores = score_incremental('APHAB.csv')
+
+    # Subscale scores
+    print('-' * 60)
+    print('APHAB Subscale Scores')
+    print('-' * 60)
+    print(scores[SUBSCALES].stack().sort_index())
+    print('-' * 60)
+    print('\n')
 
-#######################
-# Organize APHAB Data #
-#######################
-# Read in data
-data_full = pd.read_csv('APHAB.csv')
-# Subset only pertinent data
-data = data_full.iloc[2:, 17:].copy()
-# Generate new column names
-colnames = list(range(1,28))
-colnames.insert(0, 'subject')
-data.columns = colnames
-# Convert from wide to long format
-data = pd.melt(data, id_vars='subject', value_vars=list(range(1,28)))
-# Rename variable column after melt
-data = data.rename(columns={'variable': 'q_num'})
-# Convert responses to integers
-data['value'] = data['value'].astype(int)
-# Retain only questions 1:24
-data = data[data['q_num'].isin(range(0,25))]
-
-
-######################
-# Create new columns #
-######################
-# Identify reversed questions
-data['reversed'] = data['q_num'].isin([1, 16, 19, 9, 11, 21])
-
-# Create scoring key dict for
-# reversed and not reversed questions
-scores = [99, 87, 75, 50, 25, 12, 1]
-not_reversed_score = {}
-for idx, score in enumerate(scores, start=1):
-    not_reversed_score[idx] = score
-scores.reverse()
-reversed_score = {}
-for idx, score in enumerate(scores, start=1):
-    reversed_score[idx] = score
-
-# Create converted score column
-data['score'] = np.where(
-    data['reversed']==True, # condition
-    data['value'].map(reversed_score), # if True
-    data['value'].map(not_reversed_score) # if False
-    )
-
-# Create subscales from question numbers
-EC = [4, 10, 12, 14, 15, 23]
-BN = [1, 6, 7, 16, 19, 24]
-RV = [2, 5, 9, 11, 18, 21]
-AV = [3, 8, 13, 17, 20, 22]
-
-# Create subscale column
-data['subscale'] = np.repeat(0,len(data))
-for ii in range(0, len(data)):
-    if data['q_num'][ii] in EC:
-        data.loc[ii, 'subscale'] = 'EC'
-    elif data['q_num'][ii] in BN:
-        data.loc[ii, 'subscale'] = 'BN'
-    elif data['q_num'][ii] in RV:
-        data.loc[ii, 'subscale'] = 'RV'
-    elif data['q_num'][ii] in AV:
-        data.loc[ii, 'subscale'] = 'AV'
-
-
-####################
-# Calculate scores #
-####################
-# Subscale scores
-print('-' * 60)
-print('APHAB Subscale Scores')
-print('-' * 60)
-print(data.groupby(['subject', 'subscale'])['score'].apply(np.mean))
-print('-' * 60)
-print('\n')
-
-# Global scores
-# Drop AV subscale to calculate global score
-data_global = data.loc[data['subscale'].isin(['BN', 'EC', 'RV'])]
-print('-' * 60)
-print('APHAB Global Scores')
-print('-' * 60)
-print(data_global.groupby(['subject'])['score'].apply(np.mean))
-print('-' * 60)
-print('\n')
+    # Global scores
+    # (AV subscale is not part of the global score)
+    print('-' * 60)
+    print('APHAB Global Scores')
+    print('-' * 60)
+    print(scores['global'])
+    print('-' * 60)
+    print('\n')
@@ -0,0 +1,196 @@
+"""Headless batch rendering of plotting functions.
+
+    Runs existing plotting functions (the ones that end in
+    plt.show()) with the Agg backend in a process pool.
+    Inside a job, plt.show() saves every open figure to
+    OUT_DIR instead of opening a window; figures left open
+    when the function returns are saved too.
+
+    Each job is hashed on its input data and on the source
+    of its plotting function. A manifest in OUT_DIR stores
+    the hash of every rendered job, so jobs whose inputs
+    have not changed are skipped on the next run.
+
+    Example:
+        jobs = [
+            FigureJob('box_swarm', mocs.box_swarm_condensed,
+                args=(data, info)),
+            FigureJob('outliers', mocs.plot_outliers,
+                args=(data, info))
+        ]
+        render_jobs(jobs, out_dir='plots')
+
+    OUT_DIR defaults to the DEM_PLOT_DIR environment
+    variable (or ./plots). Plotting functions must be
+    importable from a module (or defined in a script run
+    as __main__ on a platform that forks, e.g., Linux).
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+import pandas as pd
+import matplotlib
+
+# Import system packages
+import os
+import json
+import pickle
+import hashlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+
+
+#################
+# Set constants #
+#################
+OUT_DIR = os.environ.get('DEM_PLOT_DIR', 'plots')
+MANIFEST = '_render_manifest.json'
+
+
+###########
+# Classes #
+###########
+class FigureJob():
+    """One call of a plotting function.
+
+        NAME: unique name; output files are NAME_01.png, ...
+        FUNC: plotting function (called as FUNC(*ARGS, **KWARGS))
+        DATA: what to hash to decide if the job changed.
+            Defaults to ARGS and KWARGS; pass it when FUNC
+            reads module-level data instead of arguments.
+    """
+    def __init__(self, name, func, args=(), kwargs=None, data=None):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.data = data
+
+
+#############
+# Functions #
+#############
+def _update_hash(h, obj):
+    """Add OBJ to hash H. Dataframes and arrays are hashed
+        by content; other objects by their attributes or
+        their pickle.
+    """
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        h.update(str(type(obj)).encode())
+        if isinstance(obj, pd.DataFrame):
+            h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(str((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for key in sorted(obj, key=repr):
+            h.update(repr(key).encode())
+            _update_hash(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update_hash(h, item)
+    elif hasattr(obj, '__dict__') and not callable(obj):
+        # e.g., Data objects or mocs_plots.Aware
+        h.update(type(obj).__qualname__.encode())
+        _update_hash(h, vars(obj))
+    else:
+        try:
+            h.update(pickle.dumps(obj))
+        except Exception:
+            h.update(repr(obj).encode())
+
+
+def job_hash(job, fmt='png', dpi=100):
+    """Hash of a job's plotting code, data and output settings
+    """
+    h = hashlib.sha1()
+    h.update(f"{job.func.__module__}.{job.func.__qualname__}".encode())
+    try:
+        h.update(inspect.getsource(job.func).encode())
+    except (OSError, TypeError):
+        pass
+    _update_hash(h, job.data if job.data is not None
+        else (job.args, job.kwargs))
+    h.update(f"{fmt}{dpi}".encode())
+    return h.hexdigest()
+
+
+def _render(job, out_dir, fmt, dpi):
+    """Worker: run one job with the Agg backend, saving
+        figures instead of showing them. Returns file paths.
+    """
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+
+    files = []
+    def save_figures(*args, **kwargs):
+        for num in plt.get_fignums():
+            path = os.path.join(out_dir, f"{job.name}_{len(files) + 1:02d}.{fmt}")
+            plt.figure(num).savefig(path, dpi=dpi, bbox_inches='tight')
+            files.append(path)
+        plt.close('all')
+
+    show = plt.show
+    plt.show = save_figures
+    try:
+        job.func(*job.args, **job.kwargs)
+        save_figures() # figures the function did not show
+    finally:
+        plt.show = show
+        plt.close('all')
+    return files
+
+
+def render_jobs(jobs, out_dir=None, max_workers=None, force=False,
+    fmt='png', dpi=100):
+    """Render JOBS (a list of FigureJob) in parallel.
+
+        Jobs with the same hash as the last run (and whose
+        files still exist) are skipped unless FORCE is True.
+        Returns {job name: [file paths]}.
+    """
+    out_dir = out_dir or OUT_DIR
+    os.makedirs(out_dir, exist_ok=True)
+
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("FigureJob names must be unique")
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as fh:
+            manifest = json.load(fh)
+
+    # Skip unchanged jobs
+    todo = []
+    results = {}
+    for job in jobs:
+        h = job_hash(job, fmt, dpi)
+        entry = manifest.get(job.name)
+        if (not force and entry is not None and entry['hash'] == h
+            and all(os.path.exists(f) for f in entry['files'])):
+            results[job.name] = entry['files']
+        else:
+            todo.append((job, h))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [(job, h, pool.submit(_render, job, out_dir, fmt, dpi))
+                for job, h in todo]
+            for job, h, future in futures:
+                files = future.result()
+                results[job.name] = files
+                manifest[job.name] = {'hash': h, 'files': files}
+
+    with open(manifest_path, 'w') as fh:
+        json.dump(manifest, fh, indent=1)
+
+    print(f"batch_render: Rendered {len(todo)} jobs, skipped " +
+        f"{len(jobs) - len(todo)} unchanged; output in '{out_dir}'")
+    return results
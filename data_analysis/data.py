@@ -22,6 +22,10 @@ from matplotlib import pyplot as plt
 import sys
 import os
 
+# Import custom modules
+import outliers as ol
+import normality as nt
+
 
 ##############
 # Data class #
@@ -80,20 +84,13 @@ class Data():
 
     def calc_mad(self, dist='normal', data=None, values_colname=None):
         """Calculate the median absolute deviation (MAD) 
-            using a slightly different approach.
+            using a slightly different approach. DATA can be 
+            a dataframe (with VALUES_COLNAME) or the values 
+            themselves. See outliers.calc_limits.
         """
-        # Median of raw values
-        M = np.median(data[values_colname])
-
-        # Choose "C" value based on data distribution
-        # Strategies from: https://eurekastatistics.com/using-the-median-absolute-deviation-to-find-outliers/
-        if dist == 'normal':
-            C = 1.4826
-        elif dist == 'symmetrical':
-            C = 2/np.sqrt(3) # from 
-
-        # Calculate MAD
-        mad = C * np.median([abs(xi - M) for xi in data[values_colname]])
+        limits = ol.calc_limits(data, values_colname, dist=dist)
+        M = limits['median'].iloc[0]
+        mad = limits['mad_lower'].iloc[0]
 
         # Update object attributes
         self.mad = mad
@@ -118,22 +115,13 @@ class Data():
 
 
     def calc_double_mad(self, data):
-        # Set C to 1.4862 until I find a better solution
-        C = 1.4862
-
-        # Median of raw values
-        M = np.median(data)
-
-        # Get absolute deviation from median for each value
-        abs_dev = [abs(xi - M) for xi in data]
-        abs_dev = np.array(abs_dev) # convert to numpy array
-
-        # Find data LESS THAN the median
-        left_bools = np.array(data <= M)
-        left_mad = C * np.median(abs_dev[left_bools])
-        # Find data GREATER THAN the median
-        right_bools = np.array(data >= M)
-        right_mad = C * np.median(abs_dev[right_bools])
+        """Median and left/right MADs for skewed data (see 
+            outliers.calc_limits).
+        """
+        limits = ol.calc_limits(data, dist='skewed')
+        M = limits['median'].iloc[0]
+        left_mad = limits['mad_lower'].iloc[0]
+        right_mad = limits['mad_upper'].iloc[0]
 
         # Check for MAD == 0
         if left_mad == 0:
@@ -162,6 +150,22 @@ class Data():
         return lwr_lmt, upr_lmt
 
 
+    def flag_outliers(self, values_colname, by=None, dist='normal', k=3):
+        """Outlier limits and flags for every group in 
+            self.data at once (see outliers.flag_outliers).
+            BY: column name(s) to group by (e.g., 
+            ['subject', 'condition']), or None for one group.
+        """
+        limits, flags = ol.flag_outliers(self.data, values_colname,
+            by=by, dist=dist, k=k)
+
+        # Update attributes
+        self.limits = limits
+        self.flags = flags
+
+        return limits, flags
+
+
     # Alternative method for double mad outliers
     # def _calc_double_mad_distance(self, lwr, upr):
     #     M = np.median(self.data)
@@ -203,20 +207,20 @@ class Data():
 
 
     def normality_tests(self, data, title, output='verbose'):
-        """Arsenal of normality tests, complete with summary
+        """Arsenal of normality tests, complete with summary.
+            See normality.run_tests. Returns the results table.
         """
         # Formal statistical tests
-        jb = Jarque_Bera(data, output)
-        jb.run()
-        ks = Kolmogorov_Smirnov(data, output)
-        ks.run()
-        ad = Anderson_Darling(data, output)
-        ad.run()
-        sw = Shapiro_Wilk(data, output)
-        sw.run()
+        results = nt.run_tests(data, max_workers=1)
+        if output == 'verbose':
+            print(results.to_string(index=False))
         print('-'*80)
         print(f"Tests for {title.upper()} condition")
-        ad.show_summary()
+        print('-' * 80)
+        print("SUMMARY")
+        print(nt.summarize(results))
+        print(('-' * 80) + '\n')
+        return results
 
 
 #################################
@@ -227,13 +231,11 @@ class NormalityTestTemplate():
          the template pattern
     """
 
-    # Class-level variable to hold all test results
-    test_results = {}
-
     def __init__(self, data, output='verbose'):
         """Initialize attributes
         """
         self.data = data
+        self.test_results = {}
         self.output = output
         self.test_name = None
         self.hypothesis = None
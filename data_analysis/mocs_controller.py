@@ -8,80 +8,107 @@
 ###########
 # Imports #
 ###########
+# Import system packages
+import os
+
 # Import custom modules
 import mocs_data_funcs as mocs
 from mocs_load_data import load_data
 from data import Data
 import mocs_plots
+from batch_render import FigureJob, render_jobs
+
+
+# Render figures headlessly, in parallel, instead of showing 
+# them (see batch_render.py; unchanged inputs are skipped)
+BATCH_RENDER = False
+
+
+# Everything runs under the __main__ guard: batch_render's 
+# process pool re-imports this script in every worker (spawn)
+if __name__ == '__main__':
+    ################
+    # Prepare data #
+    ################
+    # Load data
+    path = 'C:/Users/MooTra/Documents/Projects/EdgeMode/Transition Speed Pilot/Data/'
+    path = path + 'MOCS Simulation Data'
+    # The store lives next to this script, not in the working directory
+    data_df = load_data(path, store_dir=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'session_store'))
+    data = Data(data_df)
+
+    # Create data info dict
+    info = {
+        'index': ['subject', 'condition', 'trans_dur'],
+        'levels': ['aware', 'accept'],
+        'subs': data.data['subject'].unique(),
+        'conds': data.data['condition'].unique(),
+        'durs': data.data['trans_dur'].unique()
+        }
+
+
+    ##############################
+    # Call exploratory functions #
+    ##############################
+    # Normality testing
+    #mocs.do_norm_test(data)
+
+    # Box and swarm plots
+    #mocs.box_swarm_per_condition(data, info)
+    #mocs.box_swarm_per_dur(data, info)
+    #mocs.box_swarm_condensed(data, info)
+
+    # Remove and plot outliers
+    mocs.delete_outliers(data, info) # must be called before plot_outliers()
+    #mocs.plot_outliers(data, info)
+
+
+    ############
+    # Plotting #
+    ############
+    # Subset data for plotting
+    aware_dstats, accept_dstats = mocs_plots.subset_data(data.clean_data)
+
+    # Awareness data object
+    aware = mocs_plots.Aware()
+    aware.data = aware_dstats
+    aware.ylab = 'Awareness'
+    aware.gains = {
+        'LFG': 'left',
+        #'HFG': 'center',
+        #'OAG': 'right'
+        }
+    aware.range = {
+        'Moderately\nAware': 75, 
+        'Somewhat\nAware': 50
+        }
 
+    # Acceptability data object
+    accept = mocs_plots.Accept()
+    accept.data = accept_dstats
+    accept.ylab = 'Acceptability'
+    accept.gains = {
+        'LFG': 'left',
+        #'HFG': 'center',
+        #'OAG': 'right'
+        }
+    accept.range = {
+        'Extremely\nAcceptable': 100, 
+        'Somewhat\nAcceptable': 50
+        }
 
-################
-# Prepare data #
-################
-# Load data
-path = 'C:/Users/MooTra/Documents/Projects/EdgeMode/Transition Speed Pilot/Data/'
-path = path + 'MOCS Simulation Data'
-data_df = load_data(path)
-data = Data(data_df)
-
-# Create data info dict
-info = {
-    'index': ['subject', 'condition', 'trans_dur'],
-    'levels': ['aware', 'accept'],
-    'subs': data.data['subject'].unique(),
-    'conds': data.data['condition'].unique(),
-    'durs': data.data['trans_dur'].unique()
-    }
-
-
-##############################
-# Call exploratory functions #
-##############################
-# Normality testing
-#mocs.do_norm_test(data)
-
-# Box and swarm plots
-#mocs.box_swarm_per_condition(data, info)
-#mocs.box_swarm_per_dur(data, info)
-#mocs.box_swarm_condensed(data, info)
-
-# Remove and plot outliers
-mocs.delete_outliers(data, info) # must be called before plot_outliers()
-#mocs.plot_outliers(data, info)
-
-
-############
-# Plotting #
-############
-# Subset data for plotting
-aware_dstats, accept_dstats = mocs_plots.subset_data(data.clean_data)
-
-# Awareness data object
-aware = mocs_plots.Aware()
-aware.data = aware_dstats
-aware.ylab = 'Awareness'
-aware.gains = {
-    'LFG': 'left',
-    #'HFG': 'center',
-    #'OAG': 'right'
-    }
-aware.range = {
-    'Moderately\nAware': 75, 
-    'Somewhat\nAware': 50
-    }
-
-# Acceptability data object
-accept = mocs_plots.Accept()
-accept.data = accept_dstats
-accept.ylab = 'Acceptability'
-accept.gains = {
-    'LFG': 'left',
-    #'HFG': 'center',
-    #'OAG': 'right'
-    }
-accept.range = {
-    'Extremely\nAcceptable': 100, 
-    'Somewhat\nAcceptable': 50
-    }
-
-mocs_plots.plot_data(aware_obj=aware, accept_obj=accept)
+    if BATCH_RENDER:
+        render_jobs([
+            FigureJob('box_swarm_per_condition', mocs.box_swarm_per_condition,
+                args=(data, info)),
+            FigureJob('box_swarm_per_dur', mocs.box_swarm_per_dur, 
+                args=(data, info)),
+            FigureJob('box_swarm_condensed', mocs.box_swarm_condensed, 
+                args=(data, info)),
+            FigureJob('plot_outliers', mocs.plot_outliers, args=(data, info)),
+            FigureJob('mocs_data', mocs_plots.plot_data, 
+                kwargs={'aware_obj': aware, 'accept_obj': accept})
+            ])
+    else:
+        mocs_plots.plot_data(aware_obj=aware, accept_obj=accept)
@@ -9,12 +9,17 @@
 # Imports #
 ###########
 # Import data science packages
+import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
 from matplotlib import rcParams
 rcParams.update({'figure.autolayout': True})
 import seaborn as sns
 
+# Import custom modules
+import outliers as ol
+import normality as nt
+
 # Import misc packages
 import warnings
 warnings.simplefilter(action='ignore', category=pd.errors.PerformanceWarning)
@@ -27,7 +32,8 @@ plt.style.use('seaborn')
 # Normality testing #
 #####################
 def do_norm_test(data):
-    """Return histogram, probability density function, and QQ plot.
+    """Return histogram, probability density function, and QQ plot,
+        and a table of normality tests for each level.
     """
     # All data
     vals = data.data['rating']
@@ -39,7 +45,15 @@ def do_norm_test(data):
     for level in levels:
         vals = data.data[data.data['level'] == level]['rating']
         data.normality_plots(data=vals, title=level)
-        data.normality_tests(data=vals, title=level, output='silent')
+
+    # Tests for every level at once (see normality.py); a
+    # handful of levels does not need a process pool
+    results = nt.run_tests(data.data, 'rating', by='level', max_workers=1)
+    print('-' * 80)
+    print("Normality tests by level")
+    print(nt.summarize(results))
+    print(('-' * 80) + '\n')
+    return results
 
 
 ###################
@@ -117,45 +131,67 @@ def box_swarm_condensed(data, info):
 
 ###################
 # Remove outliers #
-def delete_outliers(data, info):
-    """Identify and remove outliers.
+def delete_outliers(data, info, two_sided=False):
+    """Identify and remove outliers (symmetrical MAD, k=3) 
+        for every subject x condition x level x duration.
+
+        The data are sorted into groups once and the limits 
+        for every group are computed in one pass (see 
+        outliers.flag_outliers). Rows are returned in the 
+        same order as the original per-group loop.
+
+        TWO_SIDED: if False (default), only values above 
+            the upper limit are removed, matching the results 
+            of Data.remove_outliers (its lower-limit filter 
+            is overwritten by the upper-limit filter). If 
+            True, values below the lower limit are removed 
+            too.
+
+        Returns the cleaned dataframe (also stored as 
+        data.clean_data) and a report with the limits and 
+        number of outliers per group.
     """
-    clean_data = []
-    for sub in info['subs']:
-        for cond in info['conds']:
-            for level in info['levels']:
-                for dur in info['durs']:
-                    vals = data.data[
-                        (data.data['subject'] == sub) & 
-                        (data.data['condition'] == cond) &
-                        (data.data['level'] == level) &
-                        (data.data['trans_dur'] == dur)
-                        ]
-                    # Call remove outliers function
-                    num_outliers, clean_df = data.remove_outliers(
-                        vals=vals, values_colname='rating', 
-                        dist='symmetrical', k=3, plts='n')
-                    # Display number of outliers removed per iteration
-                    if num_outliers > 0:
-                        print(f"Found {num_outliers} outliers for index " +
-                        f"{sub}, {cond}, {dur}, {level}")
-                    # Add cleaned df to list
-                    clean_data.append(clean_df)
-
-                    # # For testing only!!
-                    # # Remove some data to test outlier plots
-                    # if cond == 'OAG': 
-                    #     clean_data.append(clean_df)
-                    # else:
-                    #     clean_data.append(clean_df[1:])
-
-    # Add newly-cleaned dataframe to object: self.clean_data
-    clean_data_df = pd.concat(clean_data)
-    #clean_data_df.reset_index(inplace=True)
+    factors = ['subject', 'condition', 'level', 'trans_dur']
+    keys = [info['subs'], info['conds'], info['levels'], info['durs']]
+
+    # Group codes in loop order (rows outside INFO are dropped)
+    codes = [pd.Categorical(data.data[col], categories=cats).codes
+        for col, cats in zip(factors, keys)]
+    keep = np.all([c >= 0 for c in codes], axis=0)
+    group = np.ravel_multi_index([c[keep] for c in codes],
+        [len(cats) for cats in keys])
+    # Sort and partition once (stable, so rows keep their order)
+    order = np.argsort(group, kind='stable')
+    vals = data.data[keep].iloc[order].copy()
+    vals['_group'] = group[order]
+
+    limits, flags = ol.flag_outliers(vals, 'rating', by='_group',
+        dist='symmetrical', k=3)
+    # Values that are not <= upper limit (incl. NaN) are removed
+    retained = flags['value'] <= flags['upr_lmt']
+    if two_sided:
+        retained &= flags['value'] >= flags['lwr_lmt']
+    clean_data_df = vals[retained.to_numpy()].drop(columns='_group')
+
+    # Per-group report
+    removed = pd.Series(~retained.to_numpy()).groupby(
+        vals['_group'].to_numpy()).sum()
+    report = vals.groupby('_group', sort=True)[factors].first()
+    report = report.join(limits.drop(columns='n_outliers'))
+    report['n_removed'] = removed.to_numpy()
+    report = report.reset_index(drop=True)
+
+    # Display number of outliers removed per group
+    for row in report[report['n_removed'] > 0].itertuples():
+        print(f"Found {row.n_removed} outliers for index " +
+            f"{row.subject}, {row.condition}, {row.trans_dur}, {row.level}")
+
     print(f"Total number of outliers removed: " +
        f"{data.data.shape[0] - clean_data_df.shape[0]}")
     data.clean_data = clean_data_df
-    #print(data.clean_data)
+    data.outlier_report = report
+
+    return clean_data_df, report
 
 
 def plot_outliers(data, info):
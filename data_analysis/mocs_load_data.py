@@ -4,15 +4,28 @@ import pandas as pd
 # Import system packages
 from pathlib import Path
 
+# Import custom modules
+from session_store import SessionStore
+
 #################
 # Organize Data #
 #################
-def load_data(path):
+def load_data(path, store_dir=None):
+    """Load MOCS session CSVs from PATH into a single long-format 
+        dataframe. If STORE_DIR is given, the CSVs are ingested 
+        into a SessionStore there (only new or changed sessions 
+        are parsed) and loaded from the store.
+    """
     # Import all data files as a single dataframe
     #path = 'C:/Users/MooTra/Documents/Projects/EdgeMode/Transition Speed Pilot/Data/'
     #path = path + 'MOCS Sample Data'
-    files = Path(path).glob('*.csv')
-    df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
+    if store_dir is not None:
+        store = SessionStore(store_dir, study='MOCS')
+        store.ingest(path)
+        df = store.load()
+    else:
+        files = Path(path).glob('*.csv')
+        df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
     # Rename the "filename_value" column to reflect the data
     df.rename(columns = {'filename_value':'trans_dur'}, inplace=True)
     df.rename(columns = {'awareness_rating':'aware'}, inplace=True)
@@ -0,0 +1,150 @@
+"""Batched normality tests for grouped data.
+
+    Runs the same four tests as the Data class
+    (Jarque-Bera, Kolmogorov-Smirnov, Anderson-Darling
+    and Shapiro-Wilk) for every group of a long-format
+    dataframe, in a process pool. Results are returned
+    as one tidy dataframe (one row per group and test);
+    nothing is printed and no state is kept between calls.
+
+    Decision rules follow the Data class:
+        *JB, KS, SW: normal if p >= ALPHA
+        *AD: normal if the statistic is below the
+            critical value at the 5% level
+
+    Example:
+        results = run_tests(data.data, 'rating', by='level')
+        print(summarize(results))
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+import pandas as pd
+from scipy.stats import jarque_bera
+from scipy.stats import kstest
+from scipy.stats import anderson
+from scipy.stats import shapiro
+
+# Import system packages
+from concurrent.futures import ProcessPoolExecutor
+
+
+#################
+# Set constants #
+#################
+TESTS = ['Jarque-Bera', 'Kolmogorov_Smirnov', 'Anderson-Darling',
+    'Shapiro-Wilk']
+
+COLUMNS = ['test', 'n', 'statistic', 'pvalue', 'crit_val', 'normal']
+
+
+#############
+# Functions #
+#############
+def _test_values(vals, tests, alpha):
+    """Worker: run TESTS on one array of values. Returns a
+        list of rows (see COLUMNS).
+    """
+    n = len(vals)
+    rows = []
+    for test in tests:
+        pvalue = crit_val = np.nan
+        if test == 'Jarque-Bera':
+            statistic, pvalue = jarque_bera(vals)
+        elif test == 'Kolmogorov_Smirnov':
+            statistic, pvalue = kstest(vals, cdf='norm')
+        elif test == 'Shapiro-Wilk':
+            statistic, pvalue = shapiro(vals)
+        elif test == 'Anderson-Darling':
+            ad = anderson(vals, dist='norm')
+            # Critical value at the 5% significance level
+            statistic, crit_val = ad[0], ad[1][2]
+        else:
+            raise ValueError(f"Unknown normality test: {test}")
+
+        if test == 'Anderson-Darling':
+            normal = statistic < crit_val
+        else:
+            normal = not pvalue < alpha
+        rows.append([test, n, float(statistic), float(pvalue),
+            float(crit_val), bool(normal)])
+    return rows
+
+
+def _test_chunk(chunk, tests, alpha):
+    """Worker: run TESTS on a list of value arrays """
+    return [_test_values(vals, tests, alpha) for vals in chunk]
+
+
+def run_tests(data, values_colname=None, by=None, tests=None, alpha=0.05,
+    max_workers=None, chunksize=None):
+    """Run every normality test on every group.
+
+        DATA can be a dataframe (with VALUES_COLNAME) or a
+        Series/array of values. BY: groupby key(s); None is
+        one group. TESTS: subset of TESTS (default: all).
+        MAX_WORKERS=1 runs in this process.
+
+        Returns a dataframe with the BY columns (if any)
+        followed by COLUMNS. AD rows have no p-value; other
+        rows have no critical value.
+    """
+    tests = list(TESTS if tests is None else tests)
+    unknown = [test for test in tests if test not in TESTS]
+    if unknown:
+        raise ValueError(f"Unknown normality tests: {unknown}")
+
+    if values_colname is None:
+        data = pd.DataFrame({'values': np.asarray(data)})
+        values_colname = 'values'
+
+    if by is None:
+        keys = [None]
+        arrays = [data[values_colname].to_numpy(dtype=float)]
+    else:
+        grouped = data.groupby(by, sort=True, observed=True)[values_colname]
+        keys, arrays = [], []
+        for key, vals in grouped:
+            keys.append(key)
+            arrays.append(vals.to_numpy(dtype=float))
+
+    if max_workers == 1 or len(arrays) == 1:
+        results = _test_chunk(arrays, tests, alpha)
+    else:
+        # Send groups to the workers in chunks
+        if chunksize is None:
+            chunksize = max(1, len(arrays) // (4 * (max_workers or 4)))
+        chunks = [arrays[ii:ii + chunksize]
+            for ii in range(0, len(arrays), chunksize)]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = [rows
+                for chunk in pool.map(_test_chunk, chunks,
+                    [tests] * len(chunks), [alpha] * len(chunks))
+                for rows in chunk]
+
+    table = pd.DataFrame([row for rows in results for row in rows],
+        columns=COLUMNS)
+
+    if by is not None:
+        by_cols = [by] if isinstance(by, str) else list(by)
+        key_rows = [key if isinstance(key, tuple) else (key,)
+            for key in keys for _ in tests]
+        table = pd.concat([pd.DataFrame(key_rows, columns=by_cols), table],
+            axis=1)
+    return table
+
+
+def summarize(results):
+    """Wide 'normal'/'NOT normal' summary of RUN_TESTS
+        results: one row per group, one column per test.
+    """
+    by_cols = [col for col in results.columns if col not in COLUMNS]
+    labels = results['normal'].map({True: 'normal', False: 'NOT normal'})
+    summary = results.assign(result=labels)
+    if not by_cols:
+        return summary.set_index('test')['result']
+    summary = summary.pivot(index=by_cols, columns='test', values='result')
+    return summary[[test for test in TESTS if test in summary.columns]]
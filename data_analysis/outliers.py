@@ -0,0 +1,136 @@
+"""Vectorized MAD and double MAD outlier detection.
+
+    Computes the median, MAD (or left/right MADs for the
+    double MAD) and outlier limits for every group of a
+    long-format dataframe at once, using pandas groupby
+    reductions instead of per-value loops.
+
+    Limits follow Data.calc_mad/calc_double_mad:
+        *MAD: M +/- k * C * median(|x - M|)
+        *Double MAD: the left MAD uses values <= M and
+            the right MAD uses values >= M
+
+    Values for "k" from Miller (1991):
+        *very conservative: 3
+        *moderately conservative: 2.5
+        *poorly conservative: 2
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+
+#################
+# Set constants #
+#################
+# "C" values based on data distribution. Strategies from:
+# https://eurekastatistics.com/using-the-median-absolute-deviation-to-find-outliers/
+C_VALUES = {
+    'normal': 1.4826,
+    'symmetrical': 2/np.sqrt(3)
+}
+
+# Set C to 1.4862 until I find a better solution
+DOUBLE_MAD_C = 1.4862
+
+
+#############
+# Functions #
+#############
+def _grouped(data, values_colname, by):
+    """Return the values as a float Series and the groupby
+        key(s). DATA can be a dataframe (with VALUES_COLNAME)
+        or a Series/array of values. BY=None is one group.
+    """
+    if values_colname is None:
+        if not isinstance(data, pd.Series):
+            data = pd.Series(np.asarray(data))
+        vals = data.astype(float)
+    else:
+        vals = data[values_colname].astype(float)
+
+    if by is None:
+        keys = np.zeros(len(vals), dtype=int)
+    elif isinstance(by, str):
+        keys = data[by]
+    else:
+        keys = [data[col] for col in by]
+    return vals, keys
+
+
+def calc_limits(data, values_colname=None, by=None, dist='normal', k=3):
+    """Tidy table of outlier limits, one row per group.
+
+        DATA: long-format dataframe, or a Series/array of
+            values (then VALUES_COLNAME is None)
+        BY: column name(s) to group by, or None for one group
+        DIST: 'normal' or 'symmetrical' (MAD), or 'skewed'
+            (double MAD)
+
+        Columns: n, median, mad_lower, mad_upper, lwr_lmt,
+        upr_lmt. For a single MAD, mad_lower == mad_upper.
+    """
+    vals, keys = _grouped(data, values_colname, by)
+    M = vals.groupby(keys, sort=True).transform('median')
+    abs_dev = (vals - M).abs()
+
+    if dist in C_VALUES:
+        C = C_VALUES[dist]
+        mad = C * abs_dev.groupby(keys, sort=True).median()
+        mad_lower = mad_upper = mad
+    elif dist == 'skewed':
+        C = DOUBLE_MAD_C
+        mad_lower = C * abs_dev.where(vals <= M).groupby(
+            keys, sort=True).median()
+        mad_upper = C * abs_dev.where(vals >= M).groupby(
+            keys, sort=True).median()
+    else:
+        raise ValueError(f"Unknown distribution: '{dist}'. Options " +
+            f"are: {list(C_VALUES)} and 'skewed'.")
+
+    grouped = vals.groupby(keys, sort=True)
+    limits = pd.DataFrame({
+        'n': grouped.size(),
+        'median': grouped.median(),
+        'mad_lower': mad_lower,
+        'mad_upper': mad_upper
+    })
+    limits['lwr_lmt'] = limits['median'] - (k * limits['mad_lower'])
+    limits['upr_lmt'] = limits['median'] + (k * limits['mad_upper'])
+    return limits
+
+
+def flag_outliers(data, values_colname=None, by=None, dist='normal', k=3):
+    """Flag values outside the MAD limits of their group.
+
+        Returns (limits, flags):
+            LIMITS: calc_limits table plus n_outliers
+            FLAGS: dataframe with the same index as DATA and
+                columns value, lwr_lmt, upr_lmt and outlier
+                (True if value < lwr_lmt or value > upr_lmt)
+    """
+    limits = calc_limits(data, values_colname, by, dist, k)
+    vals, keys = _grouped(data, values_colname, by)
+
+    # Broadcast each group's limits back onto its rows
+    # (rows with a missing group key get no limits)
+    codes = vals.groupby(keys, sort=True).ngroup().to_numpy()
+    valid = codes >= 0
+    lwr = np.where(valid, limits['lwr_lmt'].to_numpy()[codes], np.nan)
+    upr = np.where(valid, limits['upr_lmt'].to_numpy()[codes], np.nan)
+
+    flags = pd.DataFrame({
+        'value': vals.to_numpy(),
+        'lwr_lmt': lwr,
+        'upr_lmt': upr
+    }, index=vals.index)
+    flags['outlier'] = (flags['value'] < lwr) | (flags['value'] > upr)
+
+    limits['n_outliers'] = np.bincount(codes[valid],
+        weights=flags['outlier'].to_numpy()[valid],
+        minlength=len(limits)).astype(int)
+    return limits, flags
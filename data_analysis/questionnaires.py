@@ -0,0 +1,245 @@
+"""Table-driven questionnaire scoring.
+
+    Instruments are declared as tables: which subscale
+    each item belongs to, which items are reversed and
+    the score for each response. The tables of every
+    instrument are compiled into flat integer-indexed
+    lookup arrays, so long-format responses for any
+    number of subjects and instruments are scored in one
+    vectorized pass (no per-row or per-subject loops).
+
+    Subscale scores are the mean item score. Composite
+    scores (e.g., the APHAB global score) are the mean
+    item score over several subscales.
+
+    Example:
+        long = from_wide(wide, 'APHAB')
+        scores = score(long)
+
+    Adding an instrument:
+        MY_SCALE = Instrument('MY_SCALE',
+            items={1: 'A', 2: 'A', 3: 'B'},
+            reversed=[2],
+            scale=[0, 1, 2, 3, 4])
+        INSTRUMENTS['MY_SCALE'] = MY_SCALE
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+
+###########
+# Classes #
+###########
+class Instrument():
+    """Scoring tables for one questionnaire.
+
+        NAME: instrument name (the 'instrument' column)
+        ITEMS: {item number: subscale}. Items not listed
+            (e.g., demographics) are not scored.
+        REVERSED: reversed item numbers
+        SCALE: score for each response, starting with
+            response FIRST_RESPONSE. Reversed items use the
+            scale in reverse order.
+        COMPOSITES: {name: [subscales]}
+    """
+    def __init__(self, name, items, reversed=(), scale=(), first_response=1,
+        composites=None):
+        self.name = name
+        self.items = dict(items)
+        self.reversed = list(reversed)
+        self.scale = list(scale)
+        self.first_response = first_response
+        self.composites = composites or {}
+
+        # Subscales in order of first appearance
+        self.subscales = list(dict.fromkeys(self.items.values()))
+        self.n_items = max(self.items) + 1
+
+        # Item -> subscale code (-1: not scored)
+        self.subscale_lookup = np.full(self.n_items, -1)
+        for item, subscale in self.items.items():
+            self.subscale_lookup[item] = self.subscales.index(subscale)
+
+        # Score lookup, indexed by [item, response - FIRST_RESPONSE]
+        rev = np.zeros(self.n_items, dtype=bool)
+        rev[self.reversed] = True
+        scale = np.array(self.scale, dtype=float)
+        self.reversed_lookup = rev
+        self.score_lookup = np.where(rev[:, None], scale[::-1], scale)
+
+
+#############
+# Constants #
+#############
+# Abbreviated Profile of Hearing Aid Benefit
+APHAB = Instrument('APHAB',
+    items={
+        **{item: 'EC' for item in [4, 10, 12, 14, 15, 23]},
+        **{item: 'BN' for item in [1, 6, 7, 16, 19, 24]},
+        **{item: 'RV' for item in [2, 5, 9, 11, 18, 21]},
+        **{item: 'AV' for item in [3, 8, 13, 17, 20, 22]}
+    },
+    reversed=[1, 16, 19, 9, 11, 21],
+    scale=[99, 87, 75, 50, 25, 12, 1],
+    composites={'global': ['BN', 'EC', 'RV']}
+)
+
+INSTRUMENTS = {'APHAB': APHAB}
+
+
+#############
+# Functions #
+#############
+def _compile(instruments):
+    """Concatenate the lookup tables of INSTRUMENTS into
+        flat arrays (one offset per instrument).
+    """
+    insts = list(instruments.values())
+    item_offset = np.cumsum([0] + [inst.n_items for inst in insts])
+    score_offset = np.cumsum([0] + [inst.score_lookup.size for inst in insts])
+    sub_offset = np.cumsum([0] + [len(inst.subscales) for inst in insts])
+    return {
+        'n_items': np.array([inst.n_items for inst in insts]),
+        'n_responses': np.array([len(inst.scale) for inst in insts]),
+        'first_response': np.array([inst.first_response for inst in insts]),
+        'item_offset': item_offset[:-1],
+        'score_offset': score_offset[:-1],
+        'reversed': np.concatenate([inst.reversed_lookup for inst in insts]),
+        'subscale': np.concatenate([
+            np.where(inst.subscale_lookup >= 0, inst.subscale_lookup + off, -1)
+            for inst, off in zip(insts, sub_offset)]),
+        'score': np.concatenate([inst.score_lookup.ravel() for inst in insts]),
+        'subscale_names': [(inst.name, sub) for inst in insts
+            for sub in inst.subscales]
+    }
+
+
+def from_wide(wide, instrument, subject_col='subject'):
+    """Long-format responses from a wide dataframe with a
+        SUBJECT_COL column and one column per item number.
+    """
+    items = [col for col in wide.columns if col != subject_col]
+    long = wide.melt(id_vars=subject_col, value_vars=items,
+        var_name='item', value_name='response')
+    long = long.rename(columns={subject_col: 'subject'})
+    long.insert(1, 'instrument', instrument)
+    return long
+
+
+def _score(responses, tables, names):
+    """Look up scores for every row of RESPONSES. Returns
+        (valid, reversed, global subscale code, score);
+        rows that cannot be scored have valid == False.
+    """
+    inst = pd.Index(names).get_indexer(responses['instrument'])
+    item = pd.to_numeric(responses['item']).to_numpy(dtype=int)
+    resp = pd.to_numeric(responses['response']).to_numpy(dtype=float)
+
+    # Integer codes; invalid rows index 0 and are masked
+    valid = inst >= 0
+    inst = np.where(valid, inst, 0)
+    valid &= (item >= 0) & (item < tables['n_items'][inst])
+    col = resp - tables['first_response'][inst]
+    valid &= (col >= 0) & (col < tables['n_responses'][inst])
+    flat_item = np.where(valid, tables['item_offset'][inst] + item, 0)
+    sub = tables['subscale'][flat_item]
+    valid &= sub >= 0
+
+    flat_score = np.where(valid, tables['score_offset'][inst]
+        + item * tables['n_responses'][inst] + np.where(valid, col, 0), 0)
+    return (valid, tables['reversed'][flat_item] & valid, sub,
+        tables['score'][flat_score.astype(int)])
+
+
+def score_items(responses, instruments=None):
+    """Score long-format RESPONSES (columns: subject,
+        instrument, item, response) in one pass.
+
+        Returns a copy with 'reversed', 'score' and
+        'subscale' columns. Unscored items, unknown
+        instruments and missing or out-of-range responses
+        get a missing score and subscale.
+    """
+    instruments = INSTRUMENTS if instruments is None else instruments
+    tables = _compile(instruments)
+    valid, rev, sub, scores = _score(responses, tables, list(instruments))
+
+    names = np.array([sub for _, sub in tables['subscale_names']] + [None],
+        dtype=object)
+    scored = responses.copy()
+    scored['reversed'] = rev
+    scored['score'] = np.where(valid, scores, np.nan)
+    scored['subscale'] = names[np.where(valid, sub, -1)]
+    return scored
+
+
+def subscale_sums(responses, instruments=None):
+    """Sum and number of item scores per subject and
+        subscale, from long-format RESPONSES.
+
+        Returns a dataframe indexed by (subject, instrument,
+        subscale) with 'sum' and 'n' columns. Sums can be
+        added across batches of responses (see
+        aphab.score_incremental) before SUBSCALE_SCORES.
+    """
+    instruments = INSTRUMENTS if instruments is None else instruments
+    tables = _compile(instruments)
+    valid, _, sub, scores = _score(responses, tables, list(instruments))
+    subj_codes, subjects = pd.factorize(
+        responses['subject'].to_numpy()[valid], sort=True)
+
+    # One bincount over subject x subscale cells
+    n_subs = len(tables['subscale_names'])
+    cell = subj_codes * n_subs + sub[valid]
+    size = len(subjects) * n_subs
+    sums = np.bincount(cell, weights=scores[valid], minlength=size)
+    counts = np.bincount(cell, minlength=size)
+
+    index = pd.MultiIndex.from_tuples(
+        [(subject,) + name for subject in subjects
+            for name in tables['subscale_names']],
+        names=['subject', 'instrument', 'subscale'])
+    table = pd.DataFrame({'sum': sums, 'n': counts}, index=index)
+    return table[table['n'] > 0]
+
+
+def subscale_scores(sums, instruments=None):
+    """Subscale and composite scores (mean item score) from
+        SUBSCALE_SUMS. Returns a dataframe indexed by
+        subject, with (instrument, subscale) columns.
+    """
+    instruments = INSTRUMENTS if instruments is None else instruments
+    sums = sums.unstack(['instrument', 'subscale'], fill_value=0)
+
+    columns = []
+    scores = []
+    for name, inst in instruments.items():
+        for subscale in inst.subscales:
+            if ('sum', name, subscale) in sums.columns:
+                columns.append((name, subscale))
+                scores.append(sums[('sum', name, subscale)]
+                    / sums[('n', name, subscale)])
+        for composite, parts in inst.composites.items():
+            parts = [sub for sub in parts if ('sum', name, sub) in sums.columns]
+            if parts:
+                columns.append((name, composite))
+                scores.append(
+                    sums[[('sum', name, sub) for sub in parts]].sum(axis=1)
+                    / sums[[('n', name, sub) for sub in parts]].sum(axis=1))
+
+    scores = pd.concat(scores, axis=1)
+    scores.columns = pd.MultiIndex.from_tuples(columns,
+        names=['instrument', 'subscale'])
+    return scores
+
+
+def score(responses, instruments=None):
+    """Score long-format RESPONSES for every subject and
+        instrument. See SUBSCALE_SCORES.
+    """
+    return subscale_scores(subscale_sums(responses, instruments), instruments)
@@ -0,0 +1,167 @@
+"""Vectorized bootstrap and permutation contrasts.
+
+    Computes the mean difference and Cohen's d (pooled SD,
+    independent samples) for many pairs of groups at once,
+    with percentile bootstrap confidence intervals and
+    two-sided permutation p-values.
+
+    Bootstrap: each replicate resamples every group once
+    (with replacement); the group means and variances are
+    then combined into d and mean differences for all
+    pairs with array indexing. Permutation: the pooled
+    values of each pair are shuffled for a whole chunk of
+    replicates at a time (one row per replicate).
+
+    Resamples are drawn CHUNK_SIZE replicates at a time,
+    so memory is bounded by CHUNK_SIZE x group size no
+    matter how many replicates are requested. Results are
+    reproducible for a given SEED and CHUNK_SIZE.
+
+    Example:
+        groups = {'PREF': pref_ratings, 'FAST': fast_ratings,
+            'SLOW': slow_ratings}
+        pairs = {'PREF-FAST': ('PREF', 'FAST'),
+            'PREF-SLOW': ('PREF', 'SLOW')}
+        results = contrasts(groups, pairs, seed=1)
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+
+#############
+# Functions #
+#############
+def _effect_sizes(means, variances, n, a, b):
+    """Mean differences and Cohen's d for pairs (A[i], B[i]).
+
+        MEANS, VARIANCES: group statistics with groups on
+            the first axis (any trailing replicate axes)
+        N: group sizes
+        A, B: group indices of each pair
+    """
+    n = np.asarray(n, dtype=float).reshape((-1,) + (1,) * (means.ndim - 1))
+    diff = means[a] - means[b]
+    pooled = ((n[a] - 1) * variances[a] + (n[b] - 1) * variances[b]) \
+        / (n[a] + n[b] - 2)
+    return diff, diff / np.sqrt(pooled)
+
+
+def _resample_stats(vals, idx):
+    """Mean and variance (ddof=1) of each row of VALS[IDX] """
+    samples = vals[idx]
+    return samples.mean(axis=1), samples.var(axis=1, ddof=1)
+
+
+def bootstrap(groups, pairs, n_boot=10000, seed=None, chunk_size=1000):
+    """Bootstrap distributions of the mean difference and
+        Cohen's d for every pair.
+
+        GROUPS: list of value arrays
+        PAIRS: list of (group index, group index)
+
+        Returns (diffs, ds), each pairs x N_BOOT.
+    """
+    rng = np.random.default_rng(seed)
+    n = [len(vals) for vals in groups]
+    a, b = np.array(pairs).T
+
+    diffs = np.empty((len(pairs), n_boot))
+    ds = np.empty((len(pairs), n_boot))
+    for start in range(0, n_boot, chunk_size):
+        size = min(chunk_size, n_boot - start)
+        means = np.empty((len(groups), size))
+        variances = np.empty((len(groups), size))
+        for gg, vals in enumerate(groups):
+            idx = rng.integers(0, len(vals), (size, len(vals)))
+            means[gg], variances[gg] = _resample_stats(vals, idx)
+        diffs[:, start:start + size], ds[:, start:start + size] = \
+            _effect_sizes(means, variances, n, a, b)
+    return diffs, ds
+
+
+def permutation(groups, pairs, n_perm=10000, seed=None, chunk_size=1000):
+    """Permutation null distributions of the mean difference
+        and Cohen's d for every pair (group labels shuffled
+        within the pair).
+
+        Returns (diffs, ds), each pairs x N_PERM.
+    """
+    rng = np.random.default_rng(seed)
+    diffs = np.empty((len(pairs), n_perm))
+    ds = np.empty((len(pairs), n_perm))
+    for pp, (a, b) in enumerate(pairs):
+        pooled = np.concatenate([groups[a], groups[b]])
+        n = [len(groups[a]), len(groups[b])]
+        for start in range(0, n_perm, chunk_size):
+            size = min(chunk_size, n_perm - start)
+            shuffled = rng.permuted(np.tile(pooled, (size, 1)), axis=1)
+            first, second = shuffled[:, :n[0]], shuffled[:, n[0]:]
+            means = np.stack([first.mean(axis=1), second.mean(axis=1)])
+            variances = np.stack([first.var(axis=1, ddof=1),
+                second.var(axis=1, ddof=1)])
+            diff, d = _effect_sizes(means, variances, n, [0], [1])
+            diffs[pp, start:start + size] = diff[0]
+            ds[pp, start:start + size] = d[0]
+    return diffs, ds
+
+
+def contrasts(groups, pairs, n_boot=10000, n_perm=10000, ci=0.95, seed=None,
+    chunk_size=1000):
+    """Mean difference and Cohen's d, with bootstrap CIs and
+        permutation p-values, for every pair of groups.
+
+        GROUPS: {label: values}. Missing values are dropped.
+        PAIRS: {name: (label, label)}
+        N_BOOT, N_PERM: number of replicates (0 to skip)
+        CI: confidence level of the percentile intervals
+
+        Returns a dataframe with one row per pair.
+    """
+    labels = list(groups)
+    vals = []
+    for label in labels:
+        arr = np.asarray(groups[label], dtype=float)
+        vals.append(arr[~np.isnan(arr)])
+    pair_idx = [(labels.index(a), labels.index(b)) for a, b in pairs.values()]
+    a, b = np.array(pair_idx).T
+
+    # Independent streams, so N_PERM does not change the bootstrap
+    boot_seed, perm_seed = np.random.SeedSequence(seed).spawn(2)
+
+    # Point estimates
+    means = np.array([v.mean() for v in vals])
+    variances = np.array([v.var(ddof=1) for v in vals])
+    n = np.array([len(v) for v in vals])
+    diff, d = _effect_sizes(means, variances, n, a, b)
+
+    results = pd.DataFrame({
+        'pair': list(pairs),
+        'group1': [labels[ii] for ii in a],
+        'group2': [labels[ii] for ii in b],
+        'n1': n[a],
+        'n2': n[b],
+        'mean_diff': diff,
+        'd': d
+    })
+
+    if n_boot:
+        boot_diffs, boot_ds = bootstrap(vals, pair_idx, n_boot, boot_seed,
+            chunk_size)
+        q = 100 * np.array([(1 - ci) / 2, (1 + ci) / 2])
+        results[['mean_diff_lwr', 'mean_diff_upr']] = \
+            np.percentile(boot_diffs, q, axis=1).T
+        results[['d_lwr', 'd_upr']] = np.percentile(boot_ds, q, axis=1).T
+
+    if n_perm:
+        perm_diffs, _ = permutation(vals, pair_idx, n_perm, perm_seed,
+            chunk_size)
+        # Two-sided, counting the observed arrangement
+        extreme = (np.abs(perm_diffs) >= np.abs(diff)[:, None]).sum(axis=1)
+        results['p_perm'] = (extreme + 1) / (n_perm + 1)
+
+    return results
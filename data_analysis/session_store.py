@@ -0,0 +1,249 @@
+"""Columnar on-disk store for per-session rating CSVs.
+
+    Session CSVs (e.g., from a network share) are ingested
+    once into a partitioned dataset:
+        STORE_DIR/study=<study>/subject=<s>/condition=<c>/
+            <session>.parquet
+
+    A manifest records the mtime, size and hash of every
+    ingested CSV, so later ingests only re-parse new or
+    changed sessions (and drop deleted ones). Loading reads
+    only the partitions (and, for Parquet, the columns) that
+    are asked for.
+
+    Parquet needs pyarrow. Without it, partitions are
+    written as pickles: loading is still fast, but every
+    column of a partition is read.
+
+    Example:
+        store = SessionStore('session_store', study='MOCS')
+        store.ingest(path)
+        df = store.load(columns=['rating'], subject=['101'])
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import pandas as pd
+
+# Import system packages
+import os
+import json
+import hashlib
+from pathlib import Path
+
+try:
+    import pyarrow
+    FORMAT = 'parquet'
+except ImportError:
+    FORMAT = 'pickle'
+
+
+#################
+# Set constants #
+#################
+EXTENSIONS = {'parquet': '.parquet', 'pickle': '.pkl'}
+
+# Bookkeeping columns used to restore the original row order
+SOURCE = '_source'
+ROW = '_row'
+
+
+#########
+# BEGIN #
+#########
+class SessionStore():
+    """Partitioned store of session CSVs for one study.
+
+        STORE_DIR: root directory of the store (keep it on a
+            local disk)
+        STUDY: study name (top-level partition)
+        PARTITION_COLS: columns to partition sessions by
+    """
+    def __init__(self, store_dir, study, partition_cols=('subject', 'condition')):
+        self.study = study
+        self.partition_cols = list(partition_cols)
+        self.root = Path(store_dir) / self._part('study', study)
+        self.manifest_path = self.root / '_manifest.json'
+        self.manifest = self._read_manifest()
+
+
+    ############
+    # Manifest #
+    ############
+    def _read_manifest(self):
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, 'r') as fh:
+            manifest = json.load(fh)
+        # Drop the manifest if it was written in another format
+        if any(entry['format'] != FORMAT for entry in manifest.values()):
+            print("session_store: Storage format changed; rebuilding store")
+            return {}
+        return manifest
+
+
+    def _write_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = str(self.manifest_path) + '.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(self.manifest, fh, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+
+    @staticmethod
+    def _hash(file):
+        h = hashlib.sha1()
+        with open(file, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(2**20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+
+    ##########
+    # Ingest #
+    ##########
+    @staticmethod
+    def _part(col, value):
+        """Directory name for one partition value
+        """
+        return f"{col}={str(value).replace(os.sep, '_').replace('/', '_')}"
+
+
+    def _write_session(self, name, df):
+        """Split one session by PARTITION_COLS and write each
+            part. Returns the part paths (relative to root).
+        """
+        df = df.copy()
+        df[SOURCE] = name
+        df[ROW] = range(len(df))
+
+        parts = []
+        groups = df.groupby(self.partition_cols, sort=False, dropna=False) \
+            if self.partition_cols else [((), df)]
+        for values, part in groups:
+            if not isinstance(values, tuple):
+                values = (values,)
+            part_dir = Path(*[self._part(col, val) for col, val
+                in zip(self.partition_cols, values)])
+            rel = part_dir / (Path(name).stem + EXTENSIONS[FORMAT])
+            (self.root / part_dir).mkdir(parents=True, exist_ok=True)
+            part = part.reset_index(drop=True)
+            if FORMAT == 'parquet':
+                part.to_parquet(self.root / rel, index=False)
+            else:
+                part.to_pickle(self.root / rel)
+            parts.append(str(rel))
+        return parts
+
+
+    def _remove_parts(self, name):
+        for rel in self.manifest.pop(name)['parts']:
+            try:
+                os.remove(self.root / rel)
+            except FileNotFoundError:
+                pass
+
+
+    def ingest(self, csv_dir, pattern='*.csv', read_csv=pd.read_csv):
+        """Add new or changed session CSVs in CSV_DIR to the
+            store and drop sessions whose CSV was deleted.
+            READ_CSV parses one file into a dataframe.
+            Returns the number of sessions (re-)parsed.
+        """
+        files = {f.name: f for f in Path(csv_dir).glob(pattern)}
+
+        # Sessions removed from CSV_DIR
+        for name in set(self.manifest) - set(files):
+            self._remove_parts(name)
+
+        parsed = 0
+        for name, file in sorted(files.items()):
+            # Only hash files whose mtime or size changed
+            stat = file.stat()
+            entry = self.manifest.get(name)
+            if (entry is not None and entry['mtime'] == stat.st_mtime
+                and entry['size'] == stat.st_size):
+                continue
+            sha1 = self._hash(file)
+            if entry is not None and entry['sha1'] == sha1:
+                entry['mtime'] = stat.st_mtime # touched, not changed
+                continue
+
+            if entry is not None:
+                self._remove_parts(name)
+            parts = self._write_session(name, read_csv(file))
+            self.manifest[name] = {
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'sha1': sha1,
+                'format': FORMAT,
+                'parts': parts
+            }
+            parsed += 1
+
+        self._write_manifest()
+        print(f"session_store: {parsed} of {len(files)} sessions parsed " +
+            f"into '{self.root}'")
+        return parsed
+
+
+    ########
+    # Load #
+    ########
+    def _keep(self, rel, filters):
+        """Partition pruning: check the partition directory
+            names of one part against FILTERS
+        """
+        dirs = dict(d.split('=', 1) for d in Path(rel).parts[:-1])
+        for col, values in filters.items():
+            if col in dirs and dirs[col] not in [str(v) for v in values]:
+                return False
+        return True
+
+
+    def load(self, columns=None, **filters):
+        """Load the stored sessions as one dataframe, in the
+            same row order as concatenating the CSVs sorted
+            by name.
+
+            COLUMNS: columns to read (default: all)
+            FILTERS: column=value or column=[values], e.g.
+                subject=['101', '102'], condition='OAG'.
+                Partition columns are pruned without reading
+                any data; other columns are filtered after
+                reading.
+        """
+        filters = {col: (val if isinstance(val, (list, tuple, set))
+            else [val]) for col, val in filters.items()}
+
+        read_cols = None
+        if columns is not None:
+            read_cols = list(dict.fromkeys(list(columns) +
+                [col for col in filters if col not in columns] +
+                [SOURCE, ROW]))
+
+        frames = []
+        for name in sorted(self.manifest):
+            for rel in self.manifest[name]['parts']:
+                if not self._keep(rel, filters):
+                    continue
+                if FORMAT == 'parquet':
+                    frames.append(pd.read_parquet(self.root / rel,
+                        columns=read_cols))
+                else:
+                    part = pd.read_pickle(self.root / rel)
+                    frames.append(part if read_cols is None else part[read_cols])
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(frames, ignore_index=True)
+        for col, values in filters.items():
+            df = df[df[col].astype(str).isin([str(v) for v in values])]
+        df = df.sort_values([SOURCE, ROW], kind='stable')
+        df = df.drop(columns=[SOURCE, ROW]).reset_index(drop=True)
+        if columns is not None:
+            df = df[list(columns)]
+        return df
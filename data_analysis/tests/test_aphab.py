@@ -0,0 +1,78 @@
+"""Unit tests for APHAB scoring.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+# Import system packages
+import os
+import tempfile
+
+# Import custom module for testing
+import aphab
+
+
+#########
+# Tests #
+#########
+class TestAPHAB(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.tmp.name, 'APHAB.csv')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, responses):
+        # Two Qualtrics header rows and 17 metadata columns
+        rows = [['h'] * 45] * 2
+        for subject, values in responses:
+            rows.append(['x'] * 17 + [subject] + list(values))
+        pd.DataFrame(rows).to_csv(self.csv, index=False)
+
+    def test_lookup_scores(self):
+        wide = pd.DataFrame({'subject': ['s1'] * 2})
+        for q in range(1, 28):
+            wide[q] = ['1', '7']
+        long = aphab.score_responses(wide)
+        # Question 1 is reversed (BN); question 2 is not (RV)
+        q1 = long[long['q_num'] == 1]
+        q2 = long[long['q_num'] == 2]
+        self.assertEqual(list(q1['score']), [1, 99])
+        self.assertEqual(list(q2['score']), [99, 1])
+        self.assertEqual(q1['subscale'].iloc[0], 'BN')
+        self.assertEqual(q2['subscale'].iloc[0], 'RV')
+        self.assertEqual(len(long), 2 * 24)
+
+    def test_incremental_matches_full(self):
+        rng = np.random.default_rng(0)
+        responses = [(f"s{ii % 3}", rng.integers(1, 8, 27))
+            for ii in range(9)]
+
+        self._write(responses[:5])
+        aphab.score_incremental(self.csv)
+        self._write(responses)
+        incremental = aphab.score_incremental(self.csv)
+
+        os.remove(os.path.splitext(self.csv)[0] + '_scores.pkl')
+        full = aphab.score_incremental(self.csv)
+        pd.testing.assert_frame_equal(incremental, full, check_dtype=False)
+
+    def test_changed_rows_rescored(self):
+        self._write([('s1', [1] * 27)])
+        aphab.score_incremental(self.csv)
+        self._write([('s1', [7] * 27)])
+        scores = aphab.score_incremental(self.csv)
+        # All 7s: EC has no reversed items
+        self.assertEqual(scores.loc['s1', 'EC'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
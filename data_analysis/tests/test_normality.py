@@ -0,0 +1,71 @@
+"""Unit tests for batched normality tests.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+# Import custom modules for testing
+import normality as nt
+import data as do
+
+
+#################
+# Batched Tests #
+#################
+class TestRunTests(unittest.TestCase):
+    def setUp(self):
+        r = np.random.RandomState(1)
+        self.normal_dist = r.normal(loc=0, scale=1.0, size=200)
+        self.exp_dist = r.exponential(scale=2, size=200)
+        self.df = pd.DataFrame({
+            'level': np.repeat(['normal', 'exp'], 200),
+            'rating': np.concatenate([self.normal_dist, self.exp_dist])
+        })
+
+    def test_tidy_table(self):
+        results = nt.run_tests(self.df, 'rating', by='level', max_workers=1)
+        self.assertEqual(list(results.columns), ['level'] + nt.COLUMNS)
+        self.assertEqual(len(results), 2 * len(nt.TESTS))
+        self.assertTrue((results['n'] == 200).all())
+
+    def test_decisions(self):
+        results = nt.run_tests(self.df, 'rating', by='level', max_workers=1)
+        summary = nt.summarize(results)
+        self.assertTrue((summary.loc['normal'] == 'normal').all())
+        self.assertTrue((summary.loc['exp'] == 'NOT normal').all())
+
+    def test_matches_template_classes(self):
+        results = nt.run_tests(self.exp_dist, max_workers=1).set_index('test')
+        sw = do.Shapiro_Wilk(self.exp_dist, 'silent')
+        sw.run()
+        self.assertEqual(round(results.loc['Shapiro-Wilk', 'pvalue'], 4),
+            sw.pvalue)
+        ad = do.Anderson_Darling(self.exp_dist, 'silent')
+        ad.run()
+        self.assertEqual(round(results.loc['Anderson-Darling', 'crit_val'], 4),
+            ad.pvalue)
+
+    def test_pool_matches_serial(self):
+        serial = nt.run_tests(self.df, 'rating', by='level', max_workers=1)
+        pooled = nt.run_tests(self.df, 'rating', by='level', max_workers=2,
+            chunksize=1)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+    def test_no_shared_state(self):
+        jb1 = do.Jarque_Bera(self.normal_dist, 'silent')
+        jb1.run()
+        jb2 = do.Jarque_Bera(self.exp_dist, 'silent')
+        jb2.run()
+        self.assertEqual(jb1.test_results['Jarque-Bera'], 'normal')
+        self.assertEqual(jb2.test_results['Jarque-Bera'], 'NOT normal')
+
+
+if __name__ == '__main__':
+    unittest.main()
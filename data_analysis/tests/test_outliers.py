@@ -0,0 +1,66 @@
+"""Unit tests for grouped MAD outlier functions.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+# Import custom module for testing
+import outliers as ol
+
+
+#################
+# Grouped Tests #
+#################
+class TestGroupedMAD(unittest.TestCase):
+    def setUp(self):
+        vals = {
+            'subject': np.repeat([1, 2], [8, 19]),
+            'values': np.concatenate([
+                [1,3,3,6,8,10,10,1000],
+                [100,101,102,103,110,111,112,120,121,122,140,
+                    160,180,200,220,240,2000,2001,2002]
+            ])
+        }
+        self.df = pd.DataFrame(vals)
+
+    def test_mad_limits(self):
+        limits = ol.calc_limits(self.df, 'values', by='subject')
+        self.assertEqual(limits.loc[1, 'median'], 7)
+        self.assertEqual(round(limits.loc[1, 'upr_lmt'], 2), 22.57)
+        self.assertEqual(round(limits.loc[1, 'lwr_lmt'], 2), -8.57)
+
+    def test_double_mad_limits(self):
+        limits = ol.calc_limits(self.df, 'values', by='subject',
+            dist='skewed')
+        self.assertEqual(limits.loc[2, 'median'], 122)
+        self.assertEqual(limits.loc[2, 'mad_lower'], 17.0913)
+        self.assertEqual(limits.loc[2, 'mad_upper'], 130.7856)
+
+    def test_flags(self):
+        limits, flags = ol.flag_outliers(self.df, 'values', by='subject',
+            dist='skewed')
+        self.assertEqual(list(self.df['values'][flags['outlier']]),
+            [1000, 2000, 2001, 2002])
+        self.assertEqual(list(limits['n_outliers']), [1, 3])
+        self.assertTrue(flags.index.equals(self.df.index))
+
+    def test_single_group_matches_values(self):
+        limits = ol.calc_limits(self.df['values'])
+        self.assertEqual(len(limits), 1)
+        self.assertEqual(limits['median'].iloc[0],
+            np.median(self.df['values']))
+
+    def test_unknown_dist(self):
+        with self.assertRaises(ValueError):
+            ol.calc_limits(self.df, 'values', dist='uniform')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Unit tests for table-driven questionnaire scoring.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+# Import custom module for testing
+import questionnaires as qs
+
+
+#########
+# Tests #
+#########
+class TestScoring(unittest.TestCase):
+    def setUp(self):
+        self.toy = qs.Instrument('TOY',
+            items={1: 'A', 2: 'A', 3: 'B'},
+            reversed=[2],
+            scale=[0, 1, 2, 3, 4],
+            first_response=0,
+            composites={'total': ['A', 'B']})
+        self.instruments = {'APHAB': qs.APHAB, 'TOY': self.toy}
+
+    def test_toy_scores(self):
+        responses = pd.DataFrame({
+            'subject': ['s1'] * 3 + ['s2'] * 3,
+            'instrument': 'TOY',
+            'item': [1, 2, 3] * 2,
+            'response': [4, 4, 2, 0, 1, 3]
+        })
+        scores = qs.score(responses, self.instruments)['TOY']
+        # s1: A = (4 + 0) / 2; B = 2; total = 6 / 3
+        self.assertEqual(list(scores.loc['s1']), [2, 2, 2])
+        # s2: A = (0 + 3) / 2; B = 3; total = 6 / 3
+        self.assertEqual(list(scores.loc['s2']), [1.5, 3, 2])
+
+    def test_invalid_rows_not_scored(self):
+        responses = pd.DataFrame({
+            'subject': ['s1'] * 5,
+            'instrument': ['TOY', 'TOY', 'TOY', 'TOY', 'OTHER'],
+            'item': [1, 9, 2, 3, 1],
+            'response': [4, 4, 7, np.nan, 4]
+        })
+        scored = qs.score_items(responses, self.instruments)
+        self.assertEqual(list(scored['score'].notna()),
+            [True, False, False, False, False])
+        sums = qs.subscale_sums(responses, self.instruments)
+        self.assertEqual(sums.loc[('s1', 'TOY', 'A'), 'n'], 1)
+
+    def test_instruments_in_one_pass(self):
+        rng = np.random.default_rng(0)
+        aphab = pd.DataFrame({'subject': ['s1', 's2']})
+        for item in range(1, 25):
+            aphab[item] = rng.integers(1, 8, 2)
+        toy = pd.DataFrame({'subject': ['s1', 's2'], 1: [0, 1], 2: [4, 4],
+            3: [1, 1]})
+        responses = pd.concat([qs.from_wide(aphab, 'APHAB'),
+            qs.from_wide(toy, 'TOY')], ignore_index=True)
+
+        together = qs.score(responses, self.instruments)
+        alone = qs.score(qs.from_wide(aphab, 'APHAB'), {'APHAB': qs.APHAB})
+        pd.testing.assert_frame_equal(together['APHAB'], alone['APHAB'])
+        self.assertEqual(list(together.columns.get_level_values(0).unique()),
+            ['APHAB', 'TOY'])
+
+
+class TestAPHABTables(unittest.TestCase):
+    def test_reversed_scores(self):
+        responses = pd.DataFrame({
+            'subject': 's1',
+            'instrument': 'APHAB',
+            'item': [1, 1, 4, 4],
+            'response': [1, 7, 1, 7]
+        })
+        scored = qs.score_items(responses)
+        self.assertEqual(list(scored['score']), [1, 99, 99, 1])
+        self.assertEqual(list(scored['subscale']), ['BN', 'BN', 'EC', 'EC'])
+
+
+if __name__ == '__main__':
+    unittest.main()
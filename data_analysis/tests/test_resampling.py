@@ -0,0 +1,63 @@
+"""Unit tests for bootstrap and permutation contrasts.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+import pandas as pd
+
+# Import custom module for testing
+import resampling as rs
+
+
+##################
+# Contrast Tests #
+##################
+class TestContrasts(unittest.TestCase):
+    def setUp(self):
+        r = np.random.RandomState(1)
+        self.groups = {
+            'A': r.normal(loc=50, scale=10, size=100),
+            'B': r.normal(loc=60, scale=10, size=80),
+            'C': r.normal(loc=50, scale=10, size=90)
+        }
+        self.pairs = {'A-B': ('A', 'B'), 'A-C': ('A', 'C')}
+
+    def _cohen_d(self, d1, d2):
+        n1, n2 = len(d1), len(d2)
+        s1, s2 = np.var(d1, ddof=1), np.var(d2, ddof=1)
+        s = np.sqrt(((n1 - 1) * s1 + (n2 - 1) * s2) / (n1 + n2 -2))
+        return (np.mean(d1) - np.mean(d2)) / s
+
+    def test_point_estimates(self):
+        results = rs.contrasts(self.groups, self.pairs, n_boot=0, n_perm=0)
+        for row in results.itertuples():
+            d1, d2 = self.groups[row.group1], self.groups[row.group2]
+            self.assertAlmostEqual(row.d, self._cohen_d(d1, d2))
+            self.assertAlmostEqual(row.mean_diff, d1.mean() - d2.mean())
+
+    def test_intervals_and_pvalues(self):
+        results = rs.contrasts(self.groups, self.pairs, n_boot=2000,
+            n_perm=2000, seed=1).set_index('pair')
+        self.assertTrue((results['d_lwr'] < results['d']).all())
+        self.assertTrue((results['d'] < results['d_upr']).all())
+        # A-B differ by 1 SD; A-C do not differ
+        self.assertLess(results.loc['A-B', 'd_upr'], 0)
+        self.assertLess(results.loc['A-B', 'p_perm'], 0.01)
+        self.assertGreater(results.loc['A-C', 'p_perm'], 0.05)
+
+    def test_seeded(self):
+        first = rs.contrasts(self.groups, self.pairs, n_boot=500, n_perm=500,
+            seed=7, chunk_size=128)
+        second = rs.contrasts(self.groups, self.pairs, n_boot=500, n_perm=500,
+            seed=7, chunk_size=128)
+        pd.testing.assert_frame_equal(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+"""Unit tests for the partitioned session store.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import pandas as pd
+
+# Import system packages
+import os
+import tempfile
+from pathlib import Path
+
+# Import custom module for testing
+import session_store as ss
+
+
+#########
+# Funcs #
+#########
+def mk_session(subject, ratings):
+    """Session dataframe: one OAG and one LFG trial per rating
+    """
+    n = len(ratings)
+    return pd.DataFrame({
+        'subject': [subject] * (2 * n),
+        'condition': ['OAG'] * n + ['LFG'] * n,
+        'trial': list(range(2 * n)),
+        'rating': list(ratings) * 2
+    })
+
+
+###############
+# Store Tests #
+###############
+class StoreTests():
+    """Tests run once per storage format (see subclasses)
+    """
+    FORMAT = None
+
+    def setUp(self):
+        self._format = ss.FORMAT
+        ss.FORMAT = self.FORMAT
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.csv_dir = self.tmp / 'csvs'
+        self.csv_dir.mkdir()
+        self.store_dir = self.tmp / 'store'
+        self.sessions = {
+            'a.csv': mk_session(101, [10, 20, 30]),
+            'b.csv': mk_session(102, [40, 50]),
+        }
+        for name, df in self.sessions.items():
+            df.to_csv(self.csv_dir / name, index=False)
+
+    def tearDown(self):
+        ss.FORMAT = self._format
+        self._tmp.cleanup()
+
+    def _store(self, **kwargs):
+        return ss.SessionStore(self.store_dir, study='Test', **kwargs)
+
+    def _expected(self):
+        return pd.concat([self.sessions[name] for name in
+            sorted(self.sessions)], ignore_index=True)
+
+    def test_ingest(self):
+        store = self._store()
+        self.assertEqual(store.ingest(self.csv_dir), 2)
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+        # Parts are written in the partition directories
+        part = (store.root / 'subject=101' / 'condition=OAG' /
+            ('a' + ss.EXTENSIONS[self.FORMAT]))
+        self.assertTrue(part.exists())
+
+    def test_reingest_unchanged(self):
+        self._store().ingest(self.csv_dir)
+        # A new store object reads the manifest from disk
+        store = self._store()
+        self.assertEqual(store.ingest(self.csv_dir), 0)
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+
+    def test_reingest_touched(self):
+        store = self._store()
+        store.ingest(self.csv_dir)
+        file = self.csv_dir / 'a.csv'
+        os.utime(file, (0, file.stat().st_mtime + 10))
+        # Same content: hashed, but not re-parsed
+        self.assertEqual(store.ingest(self.csv_dir), 0)
+        self.assertEqual(store.manifest['a.csv']['mtime'],
+            file.stat().st_mtime)
+
+    def test_reingest_changed(self):
+        store = self._store()
+        store.ingest(self.csv_dir)
+        self.sessions['a.csv'] = mk_session(101, [11, 21, 31, 41])
+        self.sessions['a.csv'].to_csv(self.csv_dir / 'a.csv', index=False)
+        self.assertEqual(store.ingest(self.csv_dir), 1)
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+
+    def test_reingest_new_partition(self):
+        """ Parts of the old version of a session are removed """
+        store = self._store()
+        store.ingest(self.csv_dir)
+        old = store.manifest['b.csv']['parts']
+        self.sessions['b.csv'] = mk_session(103, [40, 50])
+        self.sessions['b.csv'].to_csv(self.csv_dir / 'b.csv', index=False)
+        store.ingest(self.csv_dir)
+        for rel in old:
+            self.assertFalse((store.root / rel).exists())
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+
+    def test_deleted(self):
+        store = self._store()
+        store.ingest(self.csv_dir)
+        parts = store.manifest['b.csv']['parts']
+        os.remove(self.csv_dir / 'b.csv')
+        del self.sessions['b.csv']
+        self.assertEqual(store.ingest(self.csv_dir), 0)
+        self.assertNotIn('b.csv', store.manifest)
+        for rel in parts:
+            self.assertFalse((store.root / rel).exists())
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+
+    def test_filters(self):
+        store = self._store()
+        store.ingest(self.csv_dir)
+        expected = self._expected()
+        # Partition column
+        pd.testing.assert_frame_equal(store.load(subject='102'),
+            expected[expected['subject'] == 102].reset_index(drop=True))
+        # Several values and partition columns
+        df = store.load(subject=[101, 102], condition='LFG')
+        pd.testing.assert_frame_equal(df,
+            expected[expected['condition'] == 'LFG'].reset_index(drop=True))
+        # Non-partition column (filtered after reading)
+        df = store.load(trial=[0, 1])
+        pd.testing.assert_frame_equal(df,
+            expected[expected['trial'] < 2].reset_index(drop=True))
+        # No match
+        self.assertTrue(store.load(subject='999').empty)
+
+    def test_columns(self):
+        store = self._store()
+        store.ingest(self.csv_dir)
+        expected = self._expected()
+        pd.testing.assert_frame_equal(store.load(columns=['rating']),
+            expected[['rating']])
+        # Filter columns are read, but not returned
+        df = store.load(columns=['rating'], condition='OAG')
+        pd.testing.assert_frame_equal(df, expected.loc[
+            expected['condition'] == 'OAG', ['rating']].reset_index(drop=True))
+
+    def test_partition_cols(self):
+        store = self._store(partition_cols=['subject'])
+        store.ingest(self.csv_dir)
+        self.assertTrue((store.root / 'subject=101' /
+            ('a' + ss.EXTENSIONS[self.FORMAT])).exists())
+        pd.testing.assert_frame_equal(store.load(), self._expected())
+
+    def test_empty(self):
+        store = self._store()
+        self.assertEqual(store.ingest(self.csv_dir, pattern='*.txt'), 0)
+        df = store.load(columns=['rating'])
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), ['rating'])
+
+
+@unittest.skipIf(ss.FORMAT != 'parquet', "Needs pyarrow")
+class TestParquet(StoreTests, unittest.TestCase):
+    FORMAT = 'parquet'
+
+
+class TestPickle(StoreTests, unittest.TestCase):
+    """ Fallback used when pyarrow is not installed """
+    FORMAT = 'pickle'
+
+
+class TestFormatChange(unittest.TestCase):
+    def test_rebuild(self):
+        """ A store written in another format is rebuilt """
+        _format = ss.FORMAT
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_dir = Path(tmp) / 'csvs'
+            csv_dir.mkdir()
+            mk_session(101, [10]).to_csv(csv_dir / 'a.csv', index=False)
+            try:
+                ss.FORMAT = 'pickle'
+                ss.SessionStore(Path(tmp) / 'store', 'Test').ingest(csv_dir)
+                ss.FORMAT = 'parquet'
+                store = ss.SessionStore(Path(tmp) / 'store', 'Test')
+            finally:
+                ss.FORMAT = _format
+            self.assertEqual(store.manifest, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""Content-addressed cache of filtered bands for the Fader.
+
+    Band splits are keyed by a hash of the signal samples plus
+    the filter settings (cutoffs, order, fs), so every Fader
+    built from the same input reuses one set of bands instead
+    of re-filtering. N-band splits for the MultiBandFader are
+    cached the same way (get_filterbank). Two layers:
+        *In-process LRU of the most recently used band sets
+        *Optional on-disk layer of .npy files in CACHE_DIR,
+            opened as read-only memmaps and evicted (least
+            recently used first) once they exceed MAX_BYTES
+
+    Cached arrays are read-only: they are shared by every
+    caller, so they must never be modified in place.
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+# Import system packages
+import os
+import hashlib
+from collections import OrderedDict
+
+# Import custom modules
+import filterbank as fb
+
+
+#########
+# BEGIN #
+#########
+class BandCache():
+    """LRU cache of low/high/direct band splits, with an
+        optional size-limited on-disk memmap layer.
+
+            MAX_ITEMS: band sets kept in memory
+            CACHE_DIR: directory for .npy files, or None to
+                keep the cache in memory only
+            MAX_BYTES: size limit of CACHE_DIR
+    """
+    BANDS = ('low', 'high', 'direct')
+
+    def __init__(self, max_items=4, cache_dir=None, max_bytes=2**31):
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    @staticmethod
+    def key(sig, fs, crossover_freq, direct_cutoff, order):
+        """Hash of the signal contents and filter settings
+        """
+        sig = np.ascontiguousarray(sig)
+        h = hashlib.sha1()
+        h.update(str((sig.dtype.str, sig.shape, fs, crossover_freq,
+            direct_cutoff, order)).encode())
+        h.update(memoryview(sig).cast('B'))
+        return h.hexdigest()
+
+
+    def get_bands(self, sig, fs, crossover_freq=1000, direct_cutoff=750,
+        order=10):
+        """Return a dict of 'low', 'high' and 'direct' bands for
+            SIG, computing (see filterbank.split_bands) and
+            caching them only if they are not already cached.
+        """
+        key = self.key(sig, fs, crossover_freq, direct_cutoff, order)
+
+        # Memory layer
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return dict(self._lru[key])
+
+        # Disk layer
+        stacked = self._load(key)
+        if stacked is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            bands = fb.split_bands(sig, fs, crossover_freq,
+                direct_cutoff, order)
+            stacked = np.stack([bands[band] for band in self.BANDS])
+            del bands
+            stacked.setflags(write=False)
+            self._save(key, stacked)
+
+        bands = dict(zip(self.BANDS, stacked))
+        self._lru[key] = bands
+        if len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+        return dict(bands)
+
+
+    def get_filterbank(self, sig, fs, edges, order=10):
+        """Return the (bands, samples) N-band split of SIG 
+            at crossover frequencies EDGES (see 
+            filterbank.split_n_bands), cached like get_bands.
+        """
+        key = self.key(sig, fs, tuple(edges), 'filterbank', order)
+
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return self._lru[key]
+
+        stacked = self._load(key)
+        if stacked is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            stacked = fb.split_n_bands(sig, fs, edges, order)
+            stacked.setflags(write=False)
+            self._save(key, stacked)
+
+        self._lru[key] = stacked
+        if len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+        return stacked
+
+
+    def clear(self):
+        """Empty the in-process layer (disk files are kept)
+        """
+        self._lru.clear()
+
+
+    ###################
+    # Disk functions #
+    ###################
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"bands_{key}.npy")
+
+
+    def _load(self, key):
+        """Open cached bands from disk as a read-only memmap
+        """
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path) # mark as recently used
+        return np.load(path, mmap_mode='r')
+
+
+    def _save(self, key, stacked):
+        """Write bands to disk, then evict old files if needed
+        """
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary name so readers never see a
+        # partial file
+        tmp = self._path(key) + '.tmp'
+        with open(tmp, 'wb') as fh:
+            np.save(fh, stacked)
+        os.replace(tmp, self._path(key))
+        self._evict(keep=self._path(key))
+
+
+    def _evict(self, keep=None):
+        """Remove least recently used files until CACHE_DIR
+            is under MAX_BYTES. Never removes KEEP.
+        """
+        files = [os.path.join(self.cache_dir, f)
+            for f in os.listdir(self.cache_dir)
+            if f.startswith('bands_') and f.endswith('.npy')]
+        files.sort(key=os.path.getmtime) # oldest first
+        total = sum(os.path.getsize(f) for f in files)
+        for f in files:
+            if total <= self.max_bytes:
+                break
+            if f == keep:
+                continue
+            total -= os.path.getsize(f)
+            os.remove(f)
+
+
+# Cache shared by every Fader in this process. Set
+# default_cache.cache_dir to persist bands between runs.
+default_cache = BandCache()
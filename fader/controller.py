@@ -1,5 +1,10 @@
 """Controller for simulating DEM gain decreases
     in different frequency bands.
+
+    For large grids of conditions, see sweep.py, which 
+    filters the input once and runs conditions in parallel.
+    For gain changes in more than two bands, see 
+    multiband.py.
 """
 
 ###########
@@ -82,6 +87,7 @@ for dur in range(1,2):
     print('LFG')
     print('-' * 70)
     lfg.run(sig_change=lfg.low, sig_stable=lfg.high)
+    #lfg.run_stft('LFG') # STFT mode (see spectral.py)
     #lfg.plot_segments(sig_before_gate=lfg.low)
     #lfg.write_audio("LFG")
     print('\n')
@@ -0,0 +1,128 @@
+"""Transition curves for the Fader gain envelope.
+
+    Each curve gives the gain at transition sample(s) T of
+    an N sample transition from gain FIRST to gain LAST
+    (magnitudes). T can be any array of sample indexes, so
+    a curve is evaluated in one vectorized call over the
+    whole transition, or over just the samples of one
+    streaming block.
+
+    Curves:
+        *linear: linear in magnitude (np.linspace; the
+            original Fader ramp)
+        *linear_db: linear in dB
+        *exponential: fast start, slow finish (K sets the
+            curvature)
+        *raised_cosine: half-cosine; smooth at both ends
+        *sigmoid: logistic; K sets the steepness
+        *compressor: one-pole smoothing in dB, like a
+            compressor gain stage, with ATTACK (gain
+            decreases) and RELEASE (gain increases) time
+            constants in seconds. Rescaled to reach LAST at
+            the last sample, like the other curves, so there
+            is no step into the end segment; time constants
+            long compared with the transition tend to
+            linear_db.
+
+    Curves are chosen by name, with optional parameters:
+        evaluate('sigmoid', t, n, 1, 0.3, fs, {'k': 12})
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+
+##########
+# Curves #
+##########
+def _frac(t, n):
+    """Position along the transition: 0 at the first
+        sample, 1 at the last (as in np.linspace)
+    """
+    return np.asarray(t, dtype=np.float64) / max(n - 1, 1)
+
+
+def _db(mag):
+    if mag <= 0:
+        raise ValueError("dB curves need gains above 0 " +
+            f"(got {mag})")
+    return 20 * np.log10(mag)
+
+
+def _shaped(shape, first, last):
+    """Magnitude from a 0 to 1 SHAPE """
+    return first + (last - first) * shape
+
+
+def linear(t, n, first, last, fs):
+    return _shaped(_frac(t, n), first, last)
+
+
+def linear_db(t, n, first, last, fs):
+    db = _db(first) + (_db(last) - _db(first)) * _frac(t, n)
+    return 10 ** (db / 20)
+
+
+def exponential(t, n, first, last, fs, k=5):
+    shape = -np.expm1(-k * _frac(t, n)) / -np.expm1(-k)
+    return _shaped(shape, first, last)
+
+
+def raised_cosine(t, n, first, last, fs):
+    shape = 0.5 - 0.5 * np.cos(np.pi * _frac(t, n))
+    return _shaped(shape, first, last)
+
+
+def sigmoid(t, n, first, last, fs, k=10):
+    # Logistic curve, rescaled to exactly 0 and 1 at the ends
+    def logistic(x):
+        return 1 / (1 + np.exp(-k * (x - 0.5)))
+    shape = (logistic(_frac(t, n)) - logistic(0)) \
+        / (logistic(1) - logistic(0))
+    return _shaped(shape, first, last)
+
+
+def compressor(t, n, first, last, fs, attack=0.005, release=0.05):
+    # 1 - exp(-t / tau), rescaled to exactly 1 at the last sample
+    tau = (attack if last < first else release) * fs
+    shape = np.expm1(-np.asarray(t, dtype=np.float64) / tau) \
+        / np.expm1(-max(n - 1, 1) / tau)
+    db = _db(first) + (_db(last) - _db(first)) * shape
+    return 10 ** (db / 20)
+
+
+#################
+# Set constants #
+#################
+CURVES = {
+    'linear': linear,
+    'linear_db': linear_db,
+    'exponential': exponential,
+    'raised_cosine': raised_cosine,
+    'sigmoid': sigmoid,
+    'compressor': compressor
+}
+
+
+#############
+# Functions #
+#############
+def evaluate(name, t, n, first, last, fs, params=None):
+    """Gain of curve NAME at transition samples T (see
+        module docstring). PARAMS: dict of curve parameters.
+    """
+    try:
+        curve = CURVES[name]
+    except KeyError:
+        raise NameError(f"Invalid transition curve: '{name}'. " +
+            f"Options are: {list(CURVES)}")
+    return curve(t, n, first, last, fs, **(params or {}))
+
+
+def label(name, params=None):
+    """Short label for file names, e.g., 'sigmoid-k12' """
+    return name + ''.join(f"-{key}{value}"
+        for key, value in sorted((params or {}).items()))
@@ -0,0 +1,211 @@
+"""Cached gain envelopes for the Fader.
+
+    A gain envelope is three segments: a constant start
+    gain, a ramp and a constant end gain. Only the ramp
+    needs to be stored, so envelopes are kept as segment
+    boundaries plus one cached, read-only ramp, and are
+    applied in place on slices of the signal instead of
+    being built (np.ones/np.linspace/np.repeat/np.hstack)
+    at full length and multiplied in.
+
+    Envelopes are cached by (length, floor, transition and
+    stable samples, direction, stable mode, transition
+    curve), so every condition in a sweep with the same
+    timing shares one. The ramp follows a transition curve
+    (see curves.py); ramps too long to cache are evaluated
+    only for the samples being processed (e.g., one
+    StreamFader block at a time).
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+from functools import lru_cache
+
+# Import custom modules
+import curves
+
+
+#################
+# Set constants #
+#################
+# Longest ramp (samples) kept in memory; longer ramps are
+# evaluated per block
+MAX_CACHED_RAMP = 2**22
+
+
+#########
+# BEGIN #
+#########
+class Envelope():
+    """Piecewise gain envelope: N_START samples of FIRST,
+        an N_TRANS sample ramp from FIRST to LAST, then
+        N_END samples of LAST. The ramp follows CURVE (see
+        curves.py) with CURVE_PARAMS (a tuple of (name, 
+        value) pairs); 'linear' matches 
+        np.linspace(FIRST, LAST, N_TRANS).
+    """
+    def __init__(self, n_start, n_trans, n_end, first, last,
+        curve='linear', curve_params=(), fs=None):
+        self.n_start = n_start
+        self.n_trans = n_trans
+        self.n_end = n_end
+        self.first = first
+        self.last = last
+        self.curve = curve
+        self.curve_params = tuple(curve_params)
+        self.fs = fs
+        self.edge1 = n_start
+        self.edge2 = n_start + n_trans
+
+
+    def __len__(self):
+        return self.n_start + self.n_trans + self.n_end
+
+
+    @property
+    def ramp(self):
+        """Cached, read-only transition ramp """
+        return _ramp(self.n_trans, self.first, self.last, self.curve,
+            self.curve_params, self.fs)
+
+
+    def ramp_values(self, lo, hi):
+        """Ramp values for transition samples LO:HI, sliced
+            from the cached ramp or, for ramps longer than
+            MAX_CACHED_RAMP, evaluated for LO:HI only
+        """
+        if self.n_trans <= MAX_CACHED_RAMP:
+            return self.ramp[lo:hi]
+        return curves.evaluate(self.curve, np.arange(lo, hi), self.n_trans,
+            self.first, self.last, self.fs, dict(self.curve_params))
+
+
+    def _segments(self, start, stop):
+        """Yield (lo, hi, gain) for the parts of each segment
+            inside samples START:STOP. GAIN is a scalar or a
+            view of the ramp.
+        """
+        for lo, hi, gain in [
+            (0, self.edge1, self.first),
+            (self.edge1, self.edge2, None),
+            (self.edge2, len(self), self.last)
+        ]:
+            lo, hi = max(lo, start), min(hi, stop)
+            if lo >= hi:
+                continue
+            if gain is None:
+                gain = self.ramp_values(lo - self.edge1, hi - self.edge1)
+            yield lo, hi, gain
+
+
+    def apply(self, sig, start=0):
+        """Multiply SIG in place by the envelope values for
+            samples START:START + len(SIG). SIG must be a
+            writable float array (samples on the first axis).
+            Returns SIG.
+        """
+        stop = start + len(sig)
+        for lo, hi, gain in self._segments(start, stop):
+            if np.ndim(gain) and sig.ndim > 1:
+                gain = gain.reshape((-1,) + (1,) * (sig.ndim - 1))
+            sig[(lo - start):(hi - start)] *= gain
+        return sig
+
+
+    def at(self, idx):
+        """Envelope values at any sample indexes IDX (e.g.,
+            STFT frame centres). Indexes before the start or
+            past the end get the first or last gain.
+        """
+        idx = np.asarray(idx)
+        pos = np.clip(idx - self.edge1, 0, max(self.n_trans - 1, 0))
+        if self.n_trans == 0:
+            ramp = np.full(idx.shape, self.last, dtype=np.float64)
+        elif self.n_trans <= MAX_CACHED_RAMP:
+            ramp = self.ramp[pos]
+        else:
+            ramp = curves.evaluate(self.curve, pos, self.n_trans,
+                self.first, self.last, self.fs, dict(self.curve_params))
+        env = np.where(idx < self.edge1, self.first, ramp)
+        return np.where(idx >= self.edge2, self.last, env)
+
+
+    def values(self, start=0, stop=None):
+        """Envelope values for samples START:STOP (a new
+            array; only needed for plotting or inspection)
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        env = np.ones(max(stop - start, 0))
+        return self.apply(env, start)
+
+
+#############
+# Functions #
+#############
+@lru_cache(maxsize=32)
+def _ramp(n, first, last, curve='linear', curve_params=(), fs=None):
+    """Read-only transition ramp of N samples """
+    if curve == 'linear':
+        ramp = np.linspace(first, last, n)
+    else:
+        ramp = curves.evaluate(curve, np.arange(n), n, first, last, fs,
+            dict(curve_params))
+    ramp.setflags(write=False)
+    return ramp
+
+
+def get_envelope(length, floor, trans_samps, stable_samps, direction,
+    stable='both', curve='linear', curve_params=None, fs=None):
+    """Cached envelope for a signal of LENGTH samples, laid
+        out like Fader.mk_segments (segments are clipped to
+        LENGTH).
+
+            FLOOR: gain (magnitude) at the bottom of the ramp
+            DIRECTION: 'decrease' (1 -> FLOOR) or 'increase'
+                (FLOOR -> 1)
+            STABLE: 'both', 'start' or 'none' (see Fader)
+            CURVE, CURVE_PARAMS: transition curve name and
+                parameter dict (see curves.py)
+            FS: sampling rate (needed by time-based curves)
+    """
+    if curve not in curves.CURVES:
+        raise NameError(f"Invalid transition curve: '{curve}'. " +
+            f"Options are: {list(curves.CURVES)}")
+    return _get_envelope(length, floor, trans_samps, stable_samps,
+        direction, stable, curve, tuple(sorted((curve_params or {}).items())),
+        fs)
+
+
+@lru_cache(maxsize=256)
+def _get_envelope(length, floor, trans_samps, stable_samps, direction,
+    stable, curve, curve_params, fs):
+    """Cached envelope (see get_envelope) """
+    if direction == 'decrease':
+        first, last = 1.0, floor
+    elif direction == 'increase':
+        first, last = floor, 1.0
+    else:
+        raise NameError("Invalid selection for 'DIRECTION.'" +
+            "Options are: 'decrease' and 'increase.'")
+
+    if stable == 'both':
+        n_start = min(stable_samps, length)
+        n_trans = min(trans_samps, length - n_start)
+        n_end = length - n_start - n_trans
+    elif stable == 'start':
+        n_start = min(stable_samps, length)
+        n_trans = min(trans_samps, length - n_start)
+        n_end = 0
+    elif stable == 'none':
+        n_start = 0
+        n_trans = min(trans_samps, length)
+        n_end = 0
+    else:
+        raise NameError("Invalid selection for 'STABLE.'" +
+            "Options are: 'both', 'start', and 'none.'")
+
+    return Envelope(n_start, n_trans, n_end, first, last, curve,
+        curve_params, fs)
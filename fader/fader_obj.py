@@ -21,6 +21,10 @@ from scipy.io import wavfile
 
 # Import custom modules
 import tmsignals as ts
+import filterbank as fb
+from band_cache import default_cache
+from envelopes import get_envelope
+import spectral
 
 
 #########
@@ -30,8 +34,15 @@ class Fader():
     """Change gain over time for selected frequency band
     """
     def __init__(self, signal, fs, trans_dur, floor, gain, 
-    direct_path, direction):
+    direct_path, direction, bands=None, curve='linear', curve_params=None):
         """Initialize object.
+
+            BANDS: optional dict of already-filtered 'low', 
+                'high' and 'direct' signals for SIGNAL (e.g., 
+                shared across conditions by sweep.py). If 
+                given, do_filter() is skipped.
+            CURVE: transition curve name, with optional 
+                CURVE_PARAMS dict (see curves.py)
         """
         self.signal = signal
         self.FLOOR = floor
@@ -40,18 +51,28 @@ class Fader():
         self.GAIN = gain
         self.DIRECT_PATH = direct_path
         self.DIRECTION = direction
+        self.CURVE = curve
+        self.CURVE_PARAMS = curve_params
 
         # Set initial values
         self.STABLE = 'both' # change to "start, end, both, none"
         self.STABLE_DUR = 5 # seconds
         self.DELAY = int(np.ceil((5/1000) * self.FS))
 
-        # Truncate signal based on total duration
-        self._set_audio_dur()
+        # Get total duration in samples
+        self._calc_samps()
 
         # Filter signals
         # NOTE: necessary even for OAG to get direct path signal
-        self.do_filter()
+        # The whole input is filtered, then truncated, so the 
+        # bands match those shared by sweep.py (BANDS)
+        if bands is None:
+            self.do_filter()
+        else:
+            self._set_bands(bands)
+
+        # Truncate signal based on total duration
+        self._set_audio_dur()
 
         """After init, the ready signals are:
             *self.signal
@@ -77,6 +98,49 @@ class Fader():
         self.calc_rms()
 
 
+    def run_stft(self, condition, n_fft=None, hop=None):
+        """Like run(), but apply the gain change in the STFT
+            domain (see spectral.py): one forward transform, 
+            a frames x bins gain mask built from the envelope 
+            and the band of CONDITION ('OAG', 'LFG' or 
+            'HFG'), and one overlap-add inverse. The band 
+            split matches do_filter(), so the output is close 
+            to run() with the matching bands.
+
+            N_FFT defaults to the first power of two of 40 ms 
+            at FS (512 at 8 kHz, 2048 at 44.1/48 kHz) and HOP 
+            to N_FFT / 4. With the defaults the output is 
+            within -70 dB (RMS error) of run() for all three 
+            conditions from 8 to 48 kHz (see tests/test_stft.py).
+        """
+        if n_fft is None:
+            n_fft = 2 ** int(np.ceil(np.log2(0.04 * self.FS)))
+        if hop is None:
+            hop = n_fft // 4
+
+        self.mk_segments(sig_change=self.signal)
+        if self.DIRECTION == 'increase' and self.STABLE == 'start':
+            raise NameError("Invalid selection for 'STABLE.'" +
+                "Options are: 'both' or 'none.'")
+
+        length = len(self.signal)
+        if self.STABLE == 'start':
+            length = len(self.sig_start) + len(self.sig_trans)
+        elif self.STABLE == 'none':
+            length = len(self.sig_trans)
+        self.env = get_envelope(length, self.FLOOR, self.trans_dur_samps,
+            self.stable_dur_samps, self.DIRECTION, self.STABLE,
+            self.CURVE, self.CURVE_PARAMS, self.FS)
+
+        self.sig_gated = spectral.process(self.signal[0:length], self.FS,
+            spectral.envelope_mask(self.env, condition, self.FS), n_fft, hop)
+
+        self.ha_out()
+        self.add_direct_path()
+
+        self.calc_rms()
+
+
     def _calc_samps(self):
         """Calculate total duration based on stable portions
         """
@@ -98,41 +162,35 @@ class Fader():
     def _set_audio_dur(self):
         """Truncate audio based on total duration
         """
-        # Get total duration in samples
-        self._calc_samps()
-
         # Truncate audio
         self.signal = self.signal[0:self.total_dur_samps]
 
 
-    def do_filter(self):
-        # Lowpass filter audio at 1000 Hz
-        self.low = self.butter_filt(
-            sig=self.signal, 
-            type='low', 
-            cutoff=1000, 
-            order=10, 
-            fs=self.FS, 
-            plts='n')
+    def _set_bands(self, bands):
+        """Use bands filtered from the whole input, truncated
+            like the signal
+        """
+        self.low = bands['low'][0:self.total_dur_samps]
+        self.high = bands['high'][0:self.total_dur_samps]
+        self.direct = bands['direct'][0:self.total_dur_samps]
 
-        # Highpass filter audio at 1000 Hz
-        self.high = self.butter_filt(
-            sig=self.signal, 
-            type='high', 
-            cutoff=1000, 
-            order=10, 
-            fs=self.FS, 
-            plts='n')
 
-        # Lowpass filter audio at 750 Hz
-        # Direct sound path
-        self.direct = self.butter_filt(
+    def do_filter(self):
+        """Split audio into low/high bands at 1000 Hz and a 
+            750 Hz lowpass direct path. The low/high split is a 
+            complementary crossover (one filter pass for both). 
+            Bands are looked up in the shared band cache first, 
+            so Faders built from the same input filter it once.
+            The whole input is filtered; bands are truncated 
+            like the signal.
+        """
+        bands = default_cache.get_bands(
             sig=self.signal, 
-            type='low', 
-            cutoff=750, 
-            order=10, 
             fs=self.FS, 
-            plts='n')
+            crossover_freq=1000, 
+            direct_cutoff=750, 
+            order=10)
+        self._set_bands(bands)
 
 
     def mk_segments(self, sig_change):
@@ -157,55 +215,54 @@ class Fader():
     def decrease_gain(self, sig_decrease):
         """Apply ramp to signal.
         """
-        # Create ramp
-        self.start_env = np.ones(len(self.sig_start))
-        self.trans_env = np.linspace(1, self.FLOOR, len(self.sig_trans))
-        self.end_env = np.repeat(self.FLOOR, len(self.sig_end))
-        
         if self.STABLE == 'both':
-            sig_decrease = sig_decrease
-            self.envelope = np.hstack([self.start_env, self.trans_env, 
-                self.end_env])
+            length = len(sig_decrease)
 
         elif self.STABLE == 'start':
-            sig_decrease = sig_decrease[0:(len(self.sig_start) + len(self.sig_trans))]
-            self.envelope = np.hstack([self.start_env, self.trans_env])
-            
+            length = len(self.sig_start) + len(self.sig_trans)
+
         elif self.STABLE == 'none':
-            sig_decrease = sig_decrease[0:len(self.sig_trans)]
-            self.envelope == self.trans_env
+            length = len(self.sig_trans)
 
         else:
             raise NameError("Invalid selection for 'STABLE.'" +
                 "Options are: 'both', 'start', and 'none.'")
-        
-        # Apply ramp to signal
-        self.sig_gated = sig_decrease * self.envelope
+
+        self._apply_envelope(sig_decrease, length)
 
 
     def increase_gain(self, sig_increase):
         """Apply ramp to signal.
         """
-        # Create ramp
-        self.start_env = np.repeat(self.FLOOR, len(self.sig_end))
-        self.trans_env = np.linspace(self.FLOOR, 1, len(self.sig_trans))
-        self.end_env = np.ones(len(self.sig_start))
-
         if self.STABLE == 'both':
-            sig_increase = sig_increase
-            self.envelope = np.hstack([self.start_env, self.trans_env, 
-                self.end_env])
-        
+            length = len(sig_increase)
+
         elif self.STABLE == 'none':
-            sig_increase = sig_increase[0:len(self.sig_trans)]
-            self.envelope == self.trans_env
+            length = len(self.sig_trans)
 
         else:
             raise NameError("Invalid selection for 'STABLE.'" +
                 "Options are: 'both' or 'none.'")
 
-        # Apply ramp to signal
-        self.sig_gated = sig_increase * self.envelope
+        self._apply_envelope(sig_increase, length)
+
+
+    def _apply_envelope(self, sig, length):
+        """Copy the first LENGTH samples of SIG and apply the
+            cached gain envelope to the copy in place, one 
+            segment slice at a time (see envelopes.py).
+        """
+        self.env = get_envelope(length, self.FLOOR, self.trans_dur_samps,
+            self.stable_dur_samps, self.DIRECTION, self.STABLE,
+            self.CURVE, self.CURVE_PARAMS, self.FS)
+        self.sig_gated = np.array(sig[0:length], dtype=np.float64)
+        self.env.apply(self.sig_gated)
+
+
+    @property
+    def envelope(self):
+        """Full-length gain envelope (built on request) """
+        return self.env.values()
 
 
     def ha_out(self, sig_stable=None):
@@ -294,11 +351,12 @@ class Fader():
     ####################
     # Filter functions #
     ####################
-    def _filt_freq_response(b, a, nyq, cutoff):
+    @staticmethod
+    def _filt_freq_response(sos, fs, cutoff):
         """Plot butterworth frequency response
         """
-        w, h = signal.freqz(b, a)
-        plt.semilogx((nyq / np.pi) * w, abs(h))
+        w, h = signal.sosfreqz(sos, fs=fs)
+        plt.semilogx(w, abs(h))
         plt.grid(True)
         plt.axvline(cutoff, c='g')
         plt.ylabel('Gain')
@@ -308,15 +366,14 @@ class Fader():
 
 
     def butter_filt(self, sig, type, cutoff, order, fs, plts):
-        """Create and apply butterworth filter
+        """Create and apply butterworth filter. Designs are 
+            cached second-order sections (see filterbank.py).
         """
-        nyq = 0.5 * fs
-        norm_cutoff = cutoff / nyq
-        b, a = signal.butter(order, norm_cutoff, btype=type, analog=False)
-        y = signal.filtfilt(b, a, sig)
+        sos = fb.design_sos(type, cutoff, order, fs)
+        y = signal.sosfiltfilt(sos, sig)
 
         if plts == 'y':
-            self._filt_freq_response(b, a, nyq, cutoff)
+            self._filt_freq_response(sos, fs, cutoff)
         
         return y
 
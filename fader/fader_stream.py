@@ -0,0 +1,249 @@
+"""Block-based (streaming) version of the Fader for long recordings.
+
+    Processes the input in fixed-size blocks: each block is
+    filtered with stateful second-order sections, gated with
+    the gain envelope for its sample range, mixed with the
+    delayed direct path and written out before the next block
+    is read. Memory use depends on BLOCK_SIZE, not on the
+    length of the recording.
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+from scipy import signal
+
+# Import custom modules
+import tmsignals as ts
+import filterbank as fb
+from models import WavWriter
+from envelopes import get_envelope
+
+
+#########
+# BEGIN #
+#########
+class StreamFader():
+    """Change gain over time for selected frequency band,
+        one block at a time.
+
+        Uses the same parameters and timing as Fader. The
+        input SIGNAL can be any 1-channel array-like that
+        supports slicing (e.g., a memory-mapped array or a
+        models.Audio object), and is only read one block
+        (plus overlap) at a time.
+
+        ZERO_PHASE: if False, filter with causal sosfilt,
+            carrying the filter state across blocks. If True,
+            approximate Fader's zero-phase filtfilt by running
+            sosfiltfilt on each block padded with OVERLAP
+            samples of neighbouring audio on both sides, and
+            keeping only the centre.
+
+        CURVE, CURVE_PARAMS: transition curve (see curves.py).
+            Evaluated per block for very long transitions.
+    """
+    def __init__(self, signal, fs, trans_dur, floor, gain,
+    direct_path, direction, block_size=2**16, zero_phase=False,
+    overlap=None, curve='linear', curve_params=None):
+        """Initialize object.
+        """
+        self.signal = signal
+        self.FLOOR = floor
+        self.FS = fs
+        self.TRANS_DUR = trans_dur
+        self.GAIN = gain
+        self.DIRECT_PATH = direct_path
+        self.DIRECTION = direction
+        self.BLOCK_SIZE = block_size
+        self.ZERO_PHASE = zero_phase
+        self.CURVE = curve
+        self.CURVE_PARAMS = curve_params
+
+        # Set initial values
+        self.STABLE = 'both' # change to "start, end, both, none"
+        self.STABLE_DUR = 5 # seconds
+        self.DELAY = int(np.ceil((5/1000) * self.FS))
+
+        # Overlap for the zero-phase approximation: long enough
+        # for the 10th-order filter transients to die out
+        if overlap is None:
+            overlap = int(0.05 * self.FS)
+        self.OVERLAP = overlap
+
+        # Filter designs: same bands as Fader.do_filter()
+        self.bands = {
+            'low': fb.design_sos('low', 1000, 10, self.FS),
+            'high': fb.design_sos('high', 1000, 10, self.FS),
+            'direct': fb.design_sos('low', 750, 10, self.FS)
+        }
+
+
+    def _calc_samps(self):
+        """Calculate segment lengths based on stable portions
+        """
+        stable = self.STABLE_DUR * self.FS
+        trans = self.TRANS_DUR * self.FS
+        if self.STABLE == 'both':
+            segs = (stable, trans, stable)
+        elif self.STABLE == 'start':
+            segs = (stable, trans, 0)
+        elif self.STABLE == 'none':
+            segs = (0, trans, 0)
+        else:
+            raise NameError("Invalid selection for 'STABLE.'" +
+                "Options are: 'both', 'start', and 'none.'")
+
+        self.stable_dur_samps = segs[0]
+        self.trans_dur_samps = segs[1]
+        self.total_dur_samps = int(min(sum(segs), len(self.signal)))
+        self.edge1 = segs[0]
+        self.edge2 = segs[0] + segs[1]
+
+
+    ###################
+    # Block functions #
+    ###################
+    def _blocks(self):
+        """Yield (start, stop) sample indexes for each block
+        """
+        for start in range(0, self.total_dur_samps, self.BLOCK_SIZE):
+            yield start, min(start + self.BLOCK_SIZE, self.total_dur_samps)
+
+
+    def _read(self, start, stop):
+        """Read a block of the input as float64
+        """
+        return np.asarray(self.signal[start:stop], dtype=np.float64)
+
+
+    def _filter_block(self, band, start, stop, zi):
+        """Filter one block of the input for a given band.
+            Returns the filtered block and the updated state.
+        """
+        sos = self.bands[band]
+        if self.ZERO_PHASE:
+            # Forward/backward filter the block plus overlap
+            lo = max(0, start - self.OVERLAP)
+            hi = min(self.total_dur_samps, stop + self.OVERLAP)
+            x = self._read(lo, hi)
+            if band == 'high':
+                # Complementary crossover, as in Fader.do_filter()
+                seg = x - signal.sosfiltfilt(self.bands['low'], x)
+            else:
+                seg = signal.sosfiltfilt(sos, x)
+            return seg[(start - lo):(stop - lo)], zi
+        y, zi = signal.sosfilt(sos, self._read(start, stop), zi=zi)
+        return y, zi
+
+
+    def _init_states(self):
+        """Zeroed filter states for every band
+        """
+        return {band: np.zeros((sos.shape[0], 2))
+            for band, sos in self.bands.items()}
+
+
+    def _get_envelope(self):
+        """Cached gain envelope, shared with Fader (see 
+            envelopes.py)
+        """
+        self.env = get_envelope(self.total_dur_samps, self.FLOOR,
+            self.trans_dur_samps, self.stable_dur_samps, self.DIRECTION,
+            self.STABLE, self.CURVE, self.CURVE_PARAMS, self.FS)
+
+
+    def _measure_levels(self):
+        """First pass: RMS of the input and of the delayed
+            direct path, needed to set the direct path level.
+        """
+        zi = self._init_states()['direct']
+        sig_sq = 0.0
+        direct_sq = 0.0
+        for start, stop in self._blocks():
+            sig_sq += np.sum(np.square(self._read(start, stop)))
+            direct, zi = self._filter_block('direct', start, stop, zi)
+            # Only samples that survive the delay
+            direct_sq += np.sum(np.square(direct[max(0, self.DELAY - start):]))
+
+        self.signal_rms = np.round(
+            ts.mag2db(np.sqrt(sig_sq / self.total_dur_samps)), 2)
+        direct_rms = ts.mag2db(np.sqrt(direct_sq /
+            (self.total_dur_samps - self.DELAY)))
+        # Same scaling ts.setRMS would apply to the full signal
+        self.direct_gain = ts.db2mag(
+            (self.signal_rms - self.GAIN) - direct_rms)
+
+
+    #################
+    # Main function #
+    #################
+    def run(self, sig_change, sig_stable=None, filename=None):
+        """Process the signal block by block.
+
+            SIG_CHANGE: band that receives the gain change:
+                'signal' (OAG), 'low' (LFG) or 'high' (HFG)
+            SIG_STABLE: band added back without a gain change
+                (e.g., 'high' for LFG), or None
+            FILENAME: if given, write the output to this .wav
+                file as it is produced and return None.
+                Otherwise return the final signal as an array.
+        """
+        self._calc_samps()
+        self._get_envelope()
+        self._measure_levels()
+
+        blocks = []
+        writer = None
+        if filename is not None:
+            writer = WavWriter(filename, self.FS)
+
+        states = self._init_states()
+        # HA output waiting for its delayed direct-path samples
+        ha_tail = np.zeros(0)
+        for start, stop in self._blocks():
+            bands = {}
+            for band in set(['direct', sig_change, sig_stable]):
+                if band == 'signal':
+                    bands[band] = self._read(start, stop)
+                elif band is not None:
+                    bands[band], states[band] = self._filter_block(
+                        band, start, stop, states[band])
+
+            # Apply ramp to signal (in place; the unfiltered 
+            # input is copied first so it is never modified)
+            ha_sig = bands[sig_change]
+            if sig_change == 'signal':
+                ha_sig = ha_sig.copy()
+            self.env.apply(ha_sig, start)
+            if sig_stable is not None:
+                ha_sig += bands[sig_stable]
+
+            # Delay HA output relative to the direct path
+            ha_sig = np.concatenate([ha_tail, ha_sig])
+            direct = bands['direct'][max(0, self.DELAY - start):]
+            out = ha_sig[0:len(direct)] + (self.direct_gain * direct)
+            ha_tail = ha_sig[len(direct):]
+
+            if writer is not None:
+                writer.write(out)
+            else:
+                blocks.append(out)
+
+        if writer is not None:
+            writer.close()
+            print(f"Wrote {writer.frames} samples to {filename}")
+            return None
+
+        self.final_sig = np.concatenate(blocks)
+        return self.final_sig
+
+
+    def write_audio(self, condition, sig_change, sig_stable=None):
+        """Stream the output straight to a .wav file
+        """
+        self.run(sig_change=sig_change, sig_stable=sig_stable,
+            filename=f'.\\audio_files_out\\{self.DIRECTION}_' +
+            condition + '_' + str(self.TRANS_DUR) + '.wav')
@@ -10,6 +10,7 @@ from scipy.io import wavfile
 
 # Import system packages
 import os
+import struct
 
 # Import sound packages
 import sounddevice as sd
@@ -39,33 +40,104 @@ class Audio:
         self.file_path = file_path
         self.level = level
 
-        # Read audio file
-        fs, audio_file = wavfile.read(self.file_path)
+        # Read audio file as a memory map: samples stay on 
+        # disk until they are used
+        fs, audio_file = self._read_wav(self.file_path)
 
         # Assign audio file attributes
         self.fs = fs
         self.original_audio = audio_file
-        self.dur = len(self.original_audio) / self.fs
-        self.t = np.arange(0,self.dur, 1/self.fs)
-        self.data_type = np.dtype(audio_file[0])
+        self._n_samples = len(audio_file)
+        self.dur = self._n_samples / self.fs
+        self.data_type = audio_file.dtype
         print(f"Incoming audio data type: {self.data_type}")
 
-        # Immediately convert to float64 for processing
-        self.convert_to_float()
+        # Conversion to float64 is deferred until working_audio 
+        # (or a slice of the audio) is requested
+        self._working_audio = None
+
+
+    @staticmethod
+    def _read_wav(file_path):
+        """ Read a .wav file as a read-only memory map, so 
+            opening a file does not copy its samples into RAM. 
+            Falls back to a normal read for formats scipy 
+            cannot memory map (e.g., 24-bit).
+
+            The file stays open for as long as the mapped 
+            array lives; on Windows it cannot be replaced or 
+            deleted until then. Objects kept for a long time 
+            should call release().
+        """
+        try:
+            return wavfile.read(file_path, mmap=True)
+        except ValueError:
+            return wavfile.read(file_path)
+
+
+    def release(self):
+        """ Drop the original audio, closing the .wav file. 
+            Working audio is converted first (if it was not 
+            already), so only one copy of the samples stays 
+            in memory. Afterwards, only working_audio can be 
+            used: slicing the object raises a ValueError.
+        """
+        if self._working_audio is None:
+            self.convert_to_float()
+        self.original_audio = None
+
+
+    @property
+    def t(self):
+        """ Time base in seconds, computed only when asked for """
+        return np.arange(0, self.dur, 1/self.fs)
+
+
+    @property
+    def working_audio(self):
+        """ Float64 audio for processing. Converted from the 
+            memory-mapped original audio on first use.
+        """
+        if self._working_audio is None:
+            self.convert_to_float()
+        return self._working_audio
+
+
+    @working_audio.setter
+    def working_audio(self, sig):
+        self._working_audio = sig
+
+
+    def __len__(self):
+        return self._n_samples
+
+
+    def __getitem__(self, index):
+        """ Float64 samples for a slice of the audio. Only the 
+            requested samples are read and converted, e.g.:
+                block = audio_obj[start:stop]
+        """
+        if self.original_audio is None:
+            raise ValueError(f"{self.name} was released; " +
+                "use working_audio")
+        return self._to_float(self.original_audio[index])
+
+
+    def _to_float(self, sig):
+        """ Convert samples of the original data type to float64 """
+        if self.data_type == 'float64':
+            return np.array(sig)
+        # 1. Convert to float64
+        sig = np.asarray(sig, dtype=np.float64)
+        # 2. Divide by original dtype max val
+        return sig / self.wav_dict[str(self.data_type)][1]
 
 
     def convert_to_float(self):
         """ Convert original audio data type to float64 
             for processing
         """
-        if self.data_type == 'float64':
-            pass
-        else:
-            # 1. Convert to float64
-            sig = self.original_audio.astype(np.float64)
-            # 2. Divide by original dtype max val
-            sig = sig / self.wav_dict[str(self.data_type)][1]
-            self.working_audio = sig
+        self.working_audio = self[:]
 
 
     def play(self):
@@ -228,3 +300,89 @@ class Audio:
 
             sigBothAdj = np.array([sigAdjLeft, sigAdjRight])
             return sigBothAdj
+
+
+class WavWriter:
+    """ Write a .wav file incrementally, one block of samples 
+        at a time, so long signals never need to be held in 
+        memory. Produces the same header layout as 
+        scipy.io.wavfile.write (IEEE float for float data, 
+        PCM for integer data), and can be read back with 
+        wavfile.read.
+
+        EXAMPLE:
+            with WavWriter('out.wav', 48000) as writer:
+                for block in blocks:
+                    writer.write(block)
+    """
+    def __init__(self, file_path, fs, dtype=np.float64, channels=1):
+        self.file_path = file_path
+        self.fs = int(fs)
+        self.dtype = np.dtype(dtype)
+        self.channels = channels
+        self.frames = 0
+
+        self._fid = open(self.file_path, 'wb')
+        self._write_header()
+
+
+    def _write_header(self):
+        """ Write RIFF header with placeholder sizes. Sizes are 
+            patched in close().
+        """
+        is_float = self.dtype.kind == 'f'
+        format_tag = 0x0003 if is_float else 0x0001
+        bit_depth = self.dtype.itemsize * 8
+        block_align = self.channels * self.dtype.itemsize
+        fmt_chunk = struct.pack('<HHIIHH', format_tag, self.channels, 
+            self.fs, self.fs * block_align, block_align, bit_depth)
+        if is_float:
+            # Add cbSize field for non-PCM files
+            fmt_chunk += b'\x00\x00'
+
+        header = b'RIFF' + b'\x00\x00\x00\x00' + b'WAVE'
+        header += b'fmt ' + struct.pack('<I', len(fmt_chunk)) + fmt_chunk
+        if is_float:
+            # Fact chunk holds the number of frames
+            self._fact_pos = len(header) + 8
+            header += b'fact' + struct.pack('<II', 4, 0)
+        else:
+            self._fact_pos = None
+        self._data_pos = len(header) + 4
+        header += b'data' + b'\x00\x00\x00\x00'
+        self._fid.write(header)
+
+
+    def write(self, block):
+        """ Append a block of samples (frames x channels) """
+        block = np.asarray(block, dtype=self.dtype)
+        self._fid.write(block.astype(self.dtype.newbyteorder('<'), 
+            copy=False).tobytes())
+        self.frames += block.shape[0]
+
+
+    def close(self):
+        """ Patch chunk sizes and close the file """
+        if self._fid.closed:
+            return
+        data_bytes = self.frames * self.channels * self.dtype.itemsize
+        # Pad data chunk to an even number of bytes
+        if data_bytes % 2:
+            self._fid.write(b'\x00')
+        size = self._fid.tell()
+        self._fid.seek(4)
+        self._fid.write(struct.pack('<I', size - 8))
+        if self._fact_pos is not None:
+            self._fid.seek(self._fact_pos)
+            self._fid.write(struct.pack('<I', self.frames))
+        self._fid.seek(self._data_pos)
+        self._fid.write(struct.pack('<I', data_bytes))
+        self._fid.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
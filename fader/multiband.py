@@ -0,0 +1,173 @@
+"""Multi-band version of the Fader.
+
+    Splits the input into N bands at any set of crossover
+    frequencies (see filterbank.split_n_bands; the bands
+    sum back to the input exactly) and applies a separate
+    gain change to every band. All band gains are applied
+    and the bands summed in one vectorized operation per
+    block of samples, so a whole multi-channel hearing aid
+    gain change costs one analysis pass (cached, see
+    band_cache.py) and one weighted sum.
+
+    The direct path, delay and RMS reporting are the same
+    as Fader. With EDGES=[1000], BAND_PRESETS reproduce the
+    OAG, LFG and HFG conditions of Fader.
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+# Import custom modules
+from fader_obj import Fader
+from band_cache import default_cache
+from envelopes import get_envelope
+import filterbank as fb
+
+
+#################
+# Set constants #
+#################
+# Two-band (EDGES=[1000]) equivalents of the Fader conditions:
+# True marks the bands that receive the gain change
+BAND_PRESETS = {
+    'OAG': [True, True],
+    'LFG': [True, False],
+    'HFG': [False, True]
+}
+
+
+#########
+# BEGIN #
+#########
+class MultiBandFader(Fader):
+    """Change gain over time, independently in each of N
+        frequency bands.
+
+            EDGES: crossover frequencies in Hz (N - 1 values)
+            FLOORS: gain (magnitude) at the end of the
+                transition for each band; 1 leaves a band
+                unchanged. A single value is used for every
+                band.
+            DIRECTIONS: 'decrease' or 'increase' for each
+                band (or one value for all)
+            CURVE, CURVE_PARAMS: transition curve (see
+                curves.py), shared by every band
+            BLOCK_SIZE: samples per vectorized block (bounds
+                the memory used for the gain matrix)
+    """
+    def __init__(self, signal, fs, trans_dur, gain, direct_path, edges,
+        floors, directions='decrease', order=10, curve='linear',
+        curve_params=None, block_size=2**16):
+        """Initialize object.
+        """
+        self.EDGES = list(edges)
+        self.ORDER = order
+        self.BLOCK_SIZE = block_size
+        n_bands = len(self.EDGES) + 1
+        self.FLOORS = self._per_band(floors, n_bands, 'FLOORS')
+        self.DIRECTIONS = self._per_band(directions, n_bands, 'DIRECTIONS')
+
+        super().__init__(signal, fs, trans_dur, floor=min(self.FLOORS),
+            gain=gain, direct_path=direct_path,
+            direction=self.DIRECTIONS[0], curve=curve,
+            curve_params=curve_params)
+
+
+    @staticmethod
+    def _per_band(value, n_bands, name):
+        """One value per band """
+        if np.ndim(value) == 0 or isinstance(value, str):
+            return [value] * n_bands
+        value = list(value)
+        if len(value) != n_bands:
+            raise ValueError(f"{name} needs one value per band " +
+                f"({n_bands} bands)")
+        return value
+
+
+    @classmethod
+    def from_preset(cls, condition, signal, fs, trans_dur, floor, gain,
+        direct_path, direction, **kwargs):
+        """Two-band fader for a Fader condition ('OAG', 'LFG'
+            or 'HFG'; see BAND_PRESETS)
+        """
+        floors = [floor if change else 1.0
+            for change in BAND_PRESETS[condition]]
+        return cls(signal, fs, trans_dur, gain, direct_path, edges=[1000],
+            floors=floors, directions=direction, **kwargs)
+
+
+    def do_filter(self):
+        """Split audio into N bands at EDGES and a 750 Hz
+            lowpass direct path. The bands are looked up in 
+            the shared band cache first. As in Fader, the whole 
+            input is filtered and the bands are truncated like 
+            the signal.
+        """
+        n = self.total_dur_samps
+        self.bands = default_cache.get_filterbank(self.signal, self.FS,
+            self.EDGES, self.ORDER)[:, 0:n]
+        self.direct = fb.sos_filt(self.signal, 'low', 750, 10, self.FS)[0:n]
+
+
+    def run(self):
+        """Call functions in order to create final signal.
+        """
+        self.mk_segments(sig_change=self.signal)
+        if self.STABLE == 'start' and 'increase' in self.DIRECTIONS:
+            raise NameError("Invalid selection for 'STABLE.'" +
+                "Options are: 'both' or 'none.'")
+
+        # Envelopes are clipped to the STABLE mode (see 
+        # Fader.decrease_gain); the bands are gated to match
+        self.envs = [get_envelope(self.bands.shape[1], floor,
+            self.trans_dur_samps, self.stable_dur_samps, direction,
+            self.STABLE, self.CURVE, self.CURVE_PARAMS, self.FS)
+            for floor, direction in zip(self.FLOORS, self.DIRECTIONS)]
+        n = len(self.envs[0])
+
+        # Apply every band gain and sum the bands, one block
+        # (bands x samples) at a time
+        self.sig_gated = np.empty(n)
+        for start in range(0, n, self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, n)
+            gains = np.stack([env.values(start, stop) for env in self.envs])
+            self.sig_gated[start:stop] = np.einsum('bn,bn->n', gains,
+                self.bands[:, start:stop])
+
+        self.ha_out()
+        self.add_direct_path()
+
+        self.calc_rms()
+
+
+    def band_envelopes(self):
+        """Gain trajectory of every band (bands x samples) """
+        return np.stack([env.values() for env in self.envs])
+
+
+if __name__ == '__main__':
+    from models import Audio
+    import tmsignals as ts
+
+    # Read in audio with SNR of 0 (see controller.py)
+    speech_obj = Audio('.\\audio_files_in\\CST_Speech_Trunc.wav', -20)
+    babble_obj = Audio('.\\audio_files_in\\CST_Babble_4.wav', -20)
+    speech = speech_obj.working_audio
+    combo = speech + babble_obj.working_audio[0:len(speech)]
+
+    # Four channels; gain drops most in the highest channels
+    mbf = MultiBandFader(
+        signal=combo,
+        fs=speech_obj.fs,
+        trans_dur=2,
+        gain=6,
+        direct_path='y',
+        edges=[500, 1000, 2000],
+        floors=ts.db2mag([0, -3, -6, -10])
+        )
+    mbf.run()
+    mbf.write_audio('MB4')
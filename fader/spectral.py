@@ -0,0 +1,132 @@
+"""STFT gain engine for the Fader.
+
+    Applies a time- and frequency-dependent gain to a
+    signal in the short-time Fourier domain: one forward
+    rfft per frame, multiplication by a 2-D gain mask
+    (frames x bins), and one inverse rfft with weighted
+    overlap-add. Frames are transformed in vectorized
+    batches of BATCH frames, so memory depends on BATCH,
+    not on the length of the signal, and an arbitrary
+    spectral gain trajectory costs about as much as a
+    single filter pass.
+
+    Windows are cached per FFT size (a periodic Hann
+    window for analysis and synthesis, with the overlap-add
+    normalization computed once); scipy.fft keeps its own
+    cache of FFT plans, so repeated calls with the same
+    size reuse both.
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+from scipy import fft
+from scipy import signal
+from functools import lru_cache
+
+# Import custom modules
+import filterbank as fb
+
+
+#############
+# Functions #
+#############
+@lru_cache(maxsize=8)
+def _window(n_fft, hop):
+    """Cached periodic Hann window and the overlap-add
+        normalization for one hop (sum of squared windows)
+    """
+    if n_fft % hop:
+        raise ValueError("N_FFT must be a multiple of HOP")
+    win = signal.get_window('hann', n_fft)
+    norm = np.square(win).reshape(-1, hop).sum(axis=0)
+    win.setflags(write=False)
+    norm.setflags(write=False)
+    return win, norm
+
+
+def frame_centers(n_samples, n_fft=1024, hop=256):
+    """Sample index of the centre of every frame used by
+        PROCESS for a signal of N_SAMPLES
+    """
+    n_frames = (n_samples + n_fft) // hop + 1
+    return np.arange(n_frames) * hop - n_fft + n_fft // 2
+
+
+def process(sig, fs, gain_fn, n_fft=1024, hop=256, batch=256):
+    """Apply a time-frequency gain to SIG (1-D).
+
+        GAIN_FN(t, freqs): returns the gain mask (frames x
+            bins) for frame centre times T (samples) and
+            bin frequencies FREQS (Hz)
+        N_FFT, HOP: frame and hop size (N_FFT must be a
+            multiple of HOP)
+        BATCH: frames per vectorized batch
+
+        A mask of all ones returns SIG (to rounding error).
+    """
+    sig = np.asarray(sig, dtype=np.float64)
+    win, norm = _window(n_fft, hop)
+    overlap = n_fft // hop
+    freqs = fft.rfftfreq(n_fft, 1 / fs)
+
+    # Zero-pad so every sample is covered by OVERLAP frames
+    padded = np.concatenate([np.zeros(n_fft), sig, np.zeros(n_fft)])
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop]
+    centers = frame_centers(len(sig), n_fft, hop)
+    out = np.zeros(len(padded) + n_fft)
+
+    for first in range(0, len(frames), batch):
+        spec = fft.rfft(frames[first:first + batch] * win, axis=1)
+        spec *= gain_fn(centers[first:first + batch], freqs)
+        chunk = fft.irfft(spec, n=n_fft, axis=1) * win
+
+        # Overlap-add: every OVERLAP-th frame is contiguous
+        for kk in range(overlap):
+            sub = chunk[kk::overlap]
+            start = (first + kk) * hop
+            out[start:start + sub.size] += sub.ravel()
+
+    out = out[n_fft:n_fft + len(sig)]
+    # Overlap-add normalization (periodic with period HOP)
+    out /= np.resize(norm, len(out))
+    return out
+
+
+def band_weights(freqs, condition, fs, crossover_freq=1000, order=10):
+    """Share of each frequency in the band that changes
+        gain, matching Fader's zero-phase crossover: the
+        lowpass band is the squared magnitude of the same
+        digital Butterworth design (forward/backward
+        filtering) and the highpass band is its complement.
+
+            CONDITION: 'OAG', 'LFG' or 'HFG'
+            FS: sampling rate in Hz
+    """
+    if condition == 'OAG':
+        return np.ones(len(freqs))
+    # The digital response, not the analog prototype: the 
+    # bilinear transform warps the crossover at low FS
+    _, h = signal.sosfreqz(fb.design_sos('low', crossover_freq, order, fs),
+        worN=np.asarray(freqs, dtype=np.float64), fs=fs)
+    low = np.abs(h) ** 2
+    if condition == 'LFG':
+        return low
+    elif condition == 'HFG':
+        return 1 - low
+    raise NameError("Invalid selection for 'CONDITION.'" +
+        "Options are: 'OAG', 'LFG' and 'HFG.'")
+
+
+def envelope_mask(env, condition, fs, crossover_freq=1000, order=10):
+    """Gain mask builder for PROCESS: at every frame the
+        gain of each bin is 1 + (ENV(t) - 1) * weight, i.e.,
+        the envelope gain applied to the share of the bin in
+        the band that changes (see BAND_WEIGHTS).
+    """
+    def gain_fn(t, freqs):
+        weights = band_weights(freqs, condition, fs, crossover_freq, order)
+        return 1 + np.multiply.outer(env.at(t) - 1, weights)
+    return gain_fn
@@ -0,0 +1,196 @@
+"""Parallel sweep runner for DEM gain change conditions.
+
+    Filters the whole input once, places the signal and its
+    bands in shared memory, and fans the envelope/mix work for
+    every condition in the grid out across a process pool.
+    Each worker writes its own .wav file; the parent writes a
+    manifest (.csv) describing every output file. Conditions
+    can differ in transition curve (see curves.py), so curve
+    shapes are swept in the same run.
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+from scipy.io import wavfile
+
+# Import system packages
+import os
+import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# Import custom modules
+from fader_obj import Fader
+from band_cache import default_cache
+import tmsignals as ts
+import curves as tc
+
+
+#################
+# Set constants #
+#################
+# Band conditions: (band with gain change, band left unchanged)
+BAND_CONDITIONS = {
+    'OAG': ('signal', None),
+    'LFG': ('low', 'high'),
+    'HFG': ('high', 'low')
+}
+
+# Row order of the shared memory block
+ROWS = ['signal', 'low', 'high', 'direct']
+
+
+#############
+# Functions #
+#############
+def mk_grid(trans_durs, floors_db, gains, directions,
+    conditions=('OAG', 'LFG', 'HFG'), curves=('linear',)):
+    """Make a list of condition dicts from every combination
+        of the given parameter values.
+
+            TRANS_DURS: transition durations in seconds
+            FLOORS_DB: gain floors in dB (e.g., -10)
+            GAINS: direct path level re: input in dB
+            DIRECTIONS: 'decrease' and/or 'increase'
+            CONDITIONS: keys of BAND_CONDITIONS
+            CURVES: transition curve names, or (name, params) 
+                tuples (see curves.py)
+    """
+    grid = []
+    for trans_dur, floor_db, gain, direction, cond, curve in itertools.product(
+        trans_durs, floors_db, gains, directions, conditions, curves):
+        name, params = (curve, {}) if isinstance(curve, str) else curve
+        grid.append({
+            'trans_dur': trans_dur,
+            'floor_db': floor_db,
+            'gain': gain,
+            'direction': direction,
+            'condition': cond,
+            'curve': name,
+            'curve_params': dict(params)
+        })
+    return grid
+
+
+def _file_name(pars):
+    """Output .wav name for one condition (linear curves 
+        keep the original names)
+    """
+    curve = ''
+    if pars.get('curve', 'linear') != 'linear' or pars.get('curve_params'):
+        curve = '_' + tc.label(pars['curve'], pars.get('curve_params'))
+    return (f"{pars['direction']}_{pars['condition']}_" +
+        f"{pars['trans_dur']}_floor{pars['floor_db']}_" +
+        f"gain{pars['gain']}{curve}.wav")
+
+
+def _run_condition(shm_name, shape, fs, pars, out_dir):
+    """Worker: attach to the shared bands, run one condition
+        and write the result to disk. Returns a manifest row.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        shared = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        shared.setflags(write=False) # shared by every worker
+        bands = dict(zip(ROWS, shared))
+
+        fader = Fader(
+            signal=bands['signal'],
+            fs=fs,
+            trans_dur=pars['trans_dur'],
+            floor=ts.db2mag(pars['floor_db']),
+            gain=pars['gain'],
+            direct_path='y',
+            direction=pars['direction'],
+            bands=bands,
+            curve=pars.get('curve', 'linear'),
+            curve_params=pars.get('curve_params')
+            )
+
+        change, stable = BAND_CONDITIONS[pars['condition']]
+        fader.run(sig_change=bands[change][0:fader.total_dur_samps],
+            sig_stable=None if stable is None else
+                bands[stable][0:fader.total_dur_samps])
+
+        file_path = os.path.join(out_dir, _file_name(pars))
+        wavfile.write(file_path, fs, fader.final_sig)
+
+        row = dict(pars)
+        row['file'] = file_path
+        row['samples'] = len(fader.final_sig)
+        row['signal_rms'] = fader.signal_rms
+        row['final_rms'] = np.round(ts.mag2db(ts.rms(fader.final_sig)), 2)
+        return row
+    finally:
+        shm.close()
+
+
+def run_sweep(signal, fs, grid, out_dir, max_workers=None,
+    manifest='manifest.csv'):
+    """Run every condition in GRID (see mk_grid) in parallel.
+
+        The whole input is filtered once and shared with the
+        workers through shared memory, so no worker re-filters
+        or copies it; each condition slices the bands to its
+        own duration. Filtering the whole input (rather than
+        the longest duration in GRID) keeps the output of a
+        condition the same in every sweep it is part of.
+        Output .wav files and the manifest are written to
+        OUT_DIR. Returns the list of manifest rows.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    sig = np.asarray(signal, dtype=np.float64)
+
+    # Filter once (or reuse cached bands)
+    bands = default_cache.get_bands(sig, fs)
+    bands['signal'] = sig
+
+    # Copy signal and bands into shared memory
+    shape = (len(ROWS), len(sig))
+    shm = shared_memory.SharedMemory(create=True,
+        size=int(np.prod(shape)) * 8)
+    try:
+        shared = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for ii, row in enumerate(ROWS):
+            shared[ii] = bands[row]
+        del bands, sig
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_condition, shm.name, shape, fs,
+                pars, out_dir) for pars in grid]
+            rows = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Write manifest
+    manifest_path = os.path.join(out_dir, manifest)
+    with open(manifest_path, 'w', newline='') as fh:
+        csvwriter = csv.DictWriter(fh, fieldnames=rows[0].keys())
+        csvwriter.writeheader()
+        csvwriter.writerows(rows)
+    print(f"Wrote {len(rows)} files and manifest to {out_dir}")
+
+    return rows
+
+
+if __name__ == '__main__':
+    from models import Audio
+
+    # Read in audio with SNR of 0 (see controller.py)
+    speech_obj = Audio('.\\audio_files_in\\CST_Speech_Trunc.wav', -20)
+    babble_obj = Audio('.\\audio_files_in\\CST_Babble_4.wav', -20)
+    speech = speech_obj.working_audio
+    combo = speech + babble_obj.working_audio[0:len(speech)]
+
+    grid = mk_grid(
+        trans_durs=range(1, 31),
+        floors_db=[-10],
+        gains=[6],
+        directions=['decrease']
+        )
+    run_sweep(combo, speech_obj.fs, grid, '.\\audio_files_out')
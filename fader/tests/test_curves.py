@@ -0,0 +1,54 @@
+"""Unit tests for the Fader transition curves.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+
+# Import custom module for testing
+import curves
+
+
+###############
+# Curve Tests #
+###############
+class TestCurves(unittest.TestCase):
+    def test_endpoints_and_monotonic(self):
+        fs = 48000
+        for name in curves.CURVES:
+            for n in [1000, 48000]:
+                for first, last in [(1.0, 0.3), (0.3, 1.0)]:
+                    with self.subTest(name=name, n=n, first=first):
+                        gain = curves.evaluate(name, np.arange(n), n, first,
+                            last, fs)
+                        self.assertAlmostEqual(gain[0], first)
+                        self.assertAlmostEqual(gain[-1], last)
+                        steps = np.sign(last - first) * np.diff(gain)
+                        self.assertTrue((steps >= -1e-12).all())
+
+    def test_compressor_short_transition(self):
+        # Time constant much longer than the transition: still 
+        # reaches LAST, so there is no step into the end segment
+        fs = 48000
+        gain = curves.evaluate('compressor', np.arange(1000), 1000, 0.3, 1.0,
+            fs, {'release': 0.05})
+        self.assertAlmostEqual(gain[-1], 1.0)
+        self.assertLess(np.abs(np.diff(gain)).max(), 0.01)
+
+    def test_linear_matches_linspace(self):
+        np.testing.assert_allclose(
+            curves.evaluate('linear', np.arange(100), 100, 1, 0.3, None),
+            np.linspace(1, 0.3, 100))
+
+    def test_unknown_curve(self):
+        with self.assertRaises(NameError):
+            curves.evaluate('cubic', np.arange(10), 10, 1, 0.3, 48000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Unit tests for the multi-band Fader.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+
+# Import custom modules for testing
+try:
+    from fader_obj import Fader
+    from multiband import MultiBandFader
+except OSError: # sounddevice could not find PortAudio
+    Fader = None
+
+
+###################
+# MultiBand Tests #
+###################
+@unittest.skipIf(Fader is None, "Needs sounddevice (PortAudio)")
+class TestPresets(unittest.TestCase):
+    def setUp(self):
+        self.fs = 8000
+        self.signal = np.random.RandomState(1).normal(scale=0.1,
+            size=self.fs * 15)
+
+    def _both(self, cond, stable, direction):
+        """Fader and two-band preset for one condition """
+        fader = Fader(self.signal, self.fs, 2, 0.3, 6, 'y', direction)
+        fader.STABLE = stable
+        sigs = {'OAG': (fader.signal, None), 'LFG': (fader.low, fader.high),
+            'HFG': (fader.high, fader.low)}
+        mbf = MultiBandFader.from_preset(cond, self.signal, self.fs, 2, 0.3,
+            6, 'y', direction)
+        mbf.STABLE = stable
+        return fader, sigs[cond], mbf
+
+    def test_matches_fader(self):
+        for stable, direction in [('both', 'decrease'), ('both', 'increase'),
+            ('start', 'decrease'), ('none', 'decrease'), ('none', 'increase')]:
+            for cond in ['OAG', 'LFG', 'HFG']:
+                with self.subTest(stable=stable, direction=direction,
+                    cond=cond):
+                    fader, sigs, mbf = self._both(cond, stable, direction)
+                    fader.run(*sigs)
+                    mbf.run()
+                    np.testing.assert_allclose(mbf.final_sig,
+                        fader.final_sig, rtol=0, atol=1e-12)
+
+    def test_increase_needs_end_segment(self):
+        _, _, mbf = self._both('LFG', 'start', 'increase')
+        with self.assertRaises(NameError):
+            mbf.run()
+
+
+if __name__ == '__main__':
+    unittest.main()
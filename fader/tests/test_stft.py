@@ -0,0 +1,71 @@
+"""Unit tests for the STFT gain engine.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+
+# Import custom modules for testing
+import spectral
+try:
+    from fader_obj import Fader
+except OSError: # sounddevice could not find PortAudio
+    Fader = None
+
+
+##############
+# STFT Tests #
+##############
+class TestSpectral(unittest.TestCase):
+    def test_unity_mask(self):
+        """ A mask of all ones returns the signal """
+        sig = np.random.RandomState(0).normal(size=5000)
+        out = spectral.process(sig, 8000, lambda t, f: 1)
+        np.testing.assert_allclose(out, sig, atol=1e-12)
+
+    def test_band_weights(self):
+        """ LFG and HFG weights are complementary, with half
+            the power at the crossover
+        """
+        for fs in [8000, 48000]:
+            freqs = np.array([0, 1000, fs / 2])
+            low = spectral.band_weights(freqs, 'LFG', fs)
+            high = spectral.band_weights(freqs, 'HFG', fs)
+            np.testing.assert_allclose(low + high, 1)
+            np.testing.assert_allclose(low, [1, 0.5, 0], atol=1e-9)
+
+
+@unittest.skipIf(Fader is None, "Needs sounddevice (PortAudio)")
+class TestRunSTFT(unittest.TestCase):
+    def _error_db(self, fs, condition):
+        """ RMS error of run_stft() against run(), in dB re
+            the RMS of run()
+        """
+        sig = np.random.RandomState(0).normal(scale=0.1, size=fs * 13)
+        ref = Fader(sig, fs, 2, 0.3, 6, 'y', 'decrease')
+        bands = {'OAG': (ref.signal, None), 'LFG': (ref.low, ref.high),
+            'HFG': (ref.high, ref.low)}
+        ref.run(*bands[condition])
+        stft = Fader(sig, fs, 2, 0.3, 6, 'y', 'decrease')
+        stft.run_stft(condition)
+        err = stft.final_sig - ref.final_sig
+        return 20 * np.log10(np.sqrt(np.mean(err ** 2)) /
+            np.sqrt(np.mean(ref.final_sig ** 2)))
+
+    def test_matches_run(self):
+        """ Default N_FFT/HOP are within -70 dB of run() at
+            low and high sampling rates
+        """
+        for fs in [8000, 48000]:
+            for condition in ['OAG', 'LFG', 'HFG']:
+                with self.subTest(fs=fs, condition=condition):
+                    self.assertLess(self._error_db(fs, condition), -70)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Unit tests for the parallel sweep runner.
+"""
+
+###################
+# Import packages #
+###################
+# Import testing packages
+import unittest
+
+# Import data science packages
+import numpy as np
+from scipy.io import wavfile
+
+# Import system packages
+import tempfile
+
+# Import custom modules for testing
+try:
+    import sweep
+    from fader_obj import Fader
+    import tmsignals as ts
+except OSError: # sounddevice could not find PortAudio
+    sweep = None
+
+
+###############
+# Sweep Tests #
+###############
+@unittest.skipIf(sweep is None, "Needs sounddevice (PortAudio)")
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.fs = 8000
+        self.signal = np.random.RandomState(1).normal(scale=0.1,
+            size=self.fs * 20)
+        self.out_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.out_dir.cleanup()
+
+    def _fader(self, pars):
+        """Plain Fader run of one sweep condition """
+        fader = Fader(self.signal, self.fs, pars['trans_dur'],
+            ts.db2mag(pars['floor_db']), pars['gain'], 'y',
+            pars['direction'])
+        sigs = {'signal': fader.signal, 'low': fader.low, 'high': fader.high}
+        change, stable = sweep.BAND_CONDITIONS[pars['condition']]
+        fader.run(sig_change=sigs[change],
+            sig_stable=None if stable is None else sigs[stable])
+        return fader.final_sig
+
+    def test_matches_fader(self):
+        # Two durations: each condition must not depend on 
+        # the others in the grid
+        grid = sweep.mk_grid(trans_durs=[1, 3], floors_db=[-10], gains=[6],
+            directions=['decrease', 'increase'])
+        rows = sweep.run_sweep(self.signal, self.fs, grid, self.out_dir.name,
+            max_workers=2)
+        self.assertEqual(len(rows), len(grid))
+        for pars, row in zip(grid, rows):
+            fs, swept = wavfile.read(row['file'])
+            self.assertEqual(fs, self.fs)
+            np.testing.assert_array_equal(swept, self._fader(pars))
+
+
+if __name__ == '__main__':
+    unittest.main()
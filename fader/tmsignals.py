@@ -3,7 +3,7 @@ import numpy as np
 from scipy.fft import irfft, rfft, rfftfreq
 
 
-def addSynth(F0, harm, amp, phi, dur, fs = 48000):
+def addSynth(F0, harm, amp, phi, dur, fs = 48000, method='auto'):
     """ 
         Create a complex signal via additive synthesis. Returns
         the signal AND the time base. 
@@ -14,6 +14,15 @@ def addSynth(F0, harm, amp, phi, dur, fs = 48000):
         PHI: phase in degrees
         DUR: duration in seconds
         FS: sampling rate in samples/second
+        METHOD: synthesis engine to use:
+            'loop': one np.sin call per harmonic (original 
+                implementation; fine for a handful of harmonics)
+            'matmul': block-wise matrix products of time and 
+                frequency terms (any frequencies)
+            'ifft': inverse-FFT spectral synthesis; requires 
+                integer-Hz components below Nyquist
+            'auto': choose based on harmonic count, duration 
+                and whether the components fall on integer Hz
 
         EXAMPLE: Create a sawtooth wave
             harms = np.arange(2,60,2)
@@ -24,16 +33,119 @@ def addSynth(F0, harm, amp, phi, dur, fs = 48000):
         Written by: Travis M. Moore
         Last edited: Jan. 13, 2022
     """
-    phi = deg2rad(phi) # phase to radians
     t = np.arange(0,dur,1/fs) # time base
-    sig = np.zeros(len(t)) # Make empty array to save memory
-    # Additive synthesis
-    for ii in range(len(harm)):
-        harmonics = amp[ii] * np.sin(2*np.pi* (F0 * harm[ii]) * t + phi[ii])
-        sig += harmonics
+    freqs = F0 * np.asarray(harm, dtype=float)
+    amp = np.asarray(amp, dtype=float)
+    phi = np.radians(np.asarray(phi, dtype=float)) # phase to radians
+
+    if method == 'auto':
+        method = _choose_synth_method(freqs, len(t), fs)
+
+    if method == 'loop':
+        sig = np.zeros(len(t)) # Make empty array to save memory
+        # Additive synthesis
+        for ii in range(len(freqs)):
+            harmonics = amp[ii] * np.sin(2*np.pi* freqs[ii] * t + phi[ii])
+            sig += harmonics
+    elif method == 'matmul':
+        sig = _synth_matmul(freqs, amp, phi, len(t), fs)
+    elif method == 'ifft':
+        if not _is_integer_hz(freqs, fs):
+            raise ValueError("The 'ifft' method requires integer-Hz " +
+                "components below Nyquist and an integer sampling rate")
+        sig = _synth_ifft(freqs, amp, phi, len(t), fs)
+    else:
+        raise ValueError(f"Unknown synthesis method: {method}. " +
+            "Options are: 'auto', 'loop', 'matmul' and 'ifft'")
     return [t, sig]
 
 
+# Number of (samples x harmonics) elements held in memory at 
+# once by the matrix-product synthesis path (~32 MB of float64)
+SYNTH_CHUNK_ELEMENTS = 2**22
+
+
+def _choose_synth_method(freqs, nsamps, fs):
+    """
+        Pick an additive synthesis engine. A few harmonics are 
+        cheapest to loop over. Dense integer-Hz sets (e.g., noise 
+        from mkNoise) are synthesized in one inverse FFT; 
+        everything else uses the chunked matrix product.
+    """
+    if len(freqs) <= 8:
+        return 'loop'
+    if _is_integer_hz(freqs, fs) and (len(freqs) * nsamps > fs):
+        return 'ifft'
+    return 'matmul'
+
+
+def _is_integer_hz(freqs, fs):
+    """
+        True if every component (and FS) falls on an integer 
+        number of Hz in the range [0, fs/2], so the signal is 
+        periodic over FS samples (i.e., exactly 1 second).
+    """
+    if float(fs) != int(fs):
+        return False
+    return bool(np.all(freqs == np.round(freqs)) and 
+        np.all(freqs >= 0) and np.all(freqs <= fs/2))
+
+
+def _synth_matmul(freqs, amp, phi, nsamps, fs):
+    """
+        Additive synthesis as a pair of matrix products. The 
+        signal is reshaped into (blocks x block_len) and each 
+        component is split with the angle-sum identity:
+            sin(w*(t0 + tau) + phi) = 
+                cos(w*t0 + phi)*sin(w*tau) + sin(w*t0 + phi)*cos(w*tau)
+        so np.sin/np.cos are only evaluated on roughly 
+        sqrt(samples) x harmonics points and the rest is done 
+        by BLAS. Harmonics are processed in chunks to keep the 
+        intermediate matrices bounded in size.
+    """
+    block = int(np.ceil(np.sqrt(nsamps)))
+    nblocks = int(np.ceil(nsamps / block))
+    tau = np.arange(block) / fs # time within a block
+    t0 = np.arange(nblocks) * block / fs # block start times
+    omega = 2*np.pi*freqs
+
+    sig = np.zeros((nblocks, block))
+    step = max(1, SYNTH_CHUNK_ELEMENTS // max(block, nblocks))
+    for start in range(0, len(freqs), step):
+        w = omega[start:start+step]
+        a = amp[start:start+step]
+        inner = np.outer(tau, w)
+        outer = np.outer(t0, w) + phi[start:start+step]
+        sig += (a * np.cos(outer)) @ np.sin(inner).T
+        sig += (a * np.sin(outer)) @ np.cos(inner).T
+    return sig.ravel()[0:nsamps]
+
+
+def _synth_ifft(freqs, amp, phi, nsamps, fs):
+    """
+        Additive synthesis by placing each integer-Hz component 
+        in the bin of a 1-second (FS-point) spectrum and taking 
+        a single inverse rFFT. The 1-second period is tiled to 
+        the requested number of samples, so the output matches 
+        the 'loop' method to within floating point error.
+
+        A sine with amplitude A and phase PHI at bin k maps to 
+        the complex coefficient (N/2)*A*exp(j*(PHI - pi/2)). DC 
+        and Nyquist bins are purely real: N*A*sin(PHI).
+    """
+    N = int(fs)
+    k = freqs.astype(int)
+    coefs = (N/2) * amp * np.exp(1j * (phi - np.pi/2))
+    # DC and Nyquist components are real-valued
+    edge = (k == 0) | (2*k == N)
+    coefs[edge] = N * amp[edge] * np.sin(phi[edge])
+    spectrum = np.zeros(N//2 + 1, dtype=complex)
+    np.add.at(spectrum, k, coefs) # handles repeated frequencies
+    period = irfft(spectrum, N)
+    reps = int(np.ceil(nsamps / N))
+    return np.tile(period, reps)[0:nsamps]
+
+
 def db2mag(db):
     """ 
         Convert decibels to magnitude. Takes a single
@@ -241,62 +353,57 @@ def mkBinauralNoise(freqs,dur,itd,ild,fs):
                 freqs = np.arange(500,2001)
                 sig = ts.mkBinauralNoise(freqs,0.1,0,700,-1,48000)
 
+        Both ears are synthesized in the frequency domain: the 
+        random phases (seed 12) go into a single 2 x rFFT bin 
+        array, the ITD is applied as a linear phase shift 
+        (exact for fractional-sample ITDs), the ILD as a 
+        per-ear gain, and one irfft produces both channels. 
+        Integer-Hz noises use a 1-second (FS-point) spectrum 
+        that is tiled to the full duration; other frequency 
+        lists fall back to the block matrix-product engine 
+        used by addSynth. Output matches the previous 
+        per-frequency np.sin loops to within ~1e-9 of a 
+        full-scale sample (floating point rounding only).
+
         Written by: Travis M. Moore
         Last edited: Jan. 13, 2022
     """
-    freqs = [x/fs for x in freqs] # Change array into samples
+    freqs = np.asarray(freqs, dtype=float)
     dur = round(dur * fs) # stim duration in seconds to samples
     itd = fs * itd / 1000000 # unrounded samples
-
-    # Create time bases
-    fulldur = np.ceil(dur + np.abs(itd))
-    t = np.arange(0,fulldur,dtype=int)
-    tlead = t - np.abs(itd)/2 # time vector for leading signal
-    tlag = t + np.abs(itd)/2 # time vector for lagging signal
+    fulldur = int(np.ceil(dur + np.abs(itd)))
 
     # Set numpy random seed
     r = np.random.RandomState(12) # only affects local seed; not global
     phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*r.rand(len(freqs)) # using r seed
 
-    # Additive synthesis
-    if itd > 0:
-        sigLeft = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigLeft += harmonics   
-        sigRight = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigRight += harmonics
-    elif itd < 0:
-        sigRight = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigLeft += harmonics
-    elif itd == 0:
-        sigRight = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigLeft += harmonics
-
-    # Apply ILD
-    if ild > 0:
-        sigLeft = sigLeft / db2mag(np.abs(ild/2))
-        sigRight = sigRight * db2mag(np.abs(ild/2))
-    elif ild < 0:
-        sigLeft = sigLeft * db2mag(np.abs(ild/2))
-        sigRight = sigRight / db2mag(np.abs(ild/2))
-
-    # Assign noises to left/right channels
-    sigBoth = np.array([sigLeft, sigRight])
+    # Apply ITD as a linear phase shift: +/- half the ITD 
+    # per ear. Positive ITDs delay the right channel.
+    shifts = np.array([-itd/2, itd/2]) # samples: [left, right]
+    phases = phi + 2*np.pi * np.outer(shifts, freqs/fs)
+
+    # Apply ILD as a per-ear gain: +/- half the ILD per ear
+    gains = np.array([1/db2mag(ild/2), db2mag(ild/2)]) # [left, right]
+
+    if _is_integer_hz(freqs, fs):
+        N = int(fs)
+        k = freqs.astype(int)
+        coefs = (N/2) * np.exp(1j * (phases - np.pi/2))
+        # DC and Nyquist components are real-valued
+        edge = (k == 0) | (2*k == N)
+        coefs[:, edge] = N * np.sin(phases[:, edge])
+        spectrum = np.zeros((2, N//2 + 1), dtype=complex)
+        for chan in range(2):
+            np.add.at(spectrum[chan], k, coefs[chan])
+        spectrum *= gains[:, np.newaxis]
+        period = irfft(spectrum, N, axis=-1)
+        reps = int(np.ceil(fulldur / N))
+        sigBoth = np.tile(period, reps)[:, 0:fulldur]
+    else:
+        amp = np.ones(len(freqs))
+        sigBoth = np.array([
+            gains[chan] * _synth_matmul(freqs, amp, phases[chan], 
+                fulldur, fs) for chan in range(2)])
 
     """
     # Apply gates
@@ -310,6 +417,48 @@ def mkBinauralNoise(freqs,dur,itd,ild,fs):
     return sigBoth
 
 
+# Number of stimuli computed at once by the batch functions
+BATCH_CHUNK = 64
+
+
+def _fill_batch(core, pars, nsamps, filename=None, chunk=BATCH_CHUNK):
+    """
+        Shared driver for the mk*Batch functions. Broadcasts the 
+        parameter arrays in PARS against each other, flattens 
+        them (C order) into n_stimuli, allocates the 
+        (n_stimuli, 2, NSAMPS) output and fills it CHUNK stimuli 
+        at a time by calling CORE on each slice of parameters.
+
+        If FILENAME is given, the output is a .npy file opened 
+        with np.lib.format.open_memmap, so only one chunk of 
+        stimuli is ever held in RAM. The returned memmap can be 
+        reopened later with np.load(FILENAME, mmap_mode='r').
+    """
+    pars = [np.ravel(x).astype(float) for x in np.broadcast_arrays(*pars)]
+    n = len(pars[0])
+    if filename is None:
+        out = np.zeros((n, 2, nsamps))
+    else:
+        out = np.lib.format.open_memmap(filename, mode='w+', 
+            dtype=np.float64, shape=(n, 2, nsamps))
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        out[start:stop] = core(*[x[start:stop] for x in pars])
+    if filename is not None:
+        out.flush()
+    return out
+
+
+def _ild_gains(ild):
+    """
+        Per-ear gains for an array of ILDs, split evenly across 
+        the ears. Returns a (stimuli, 2, 1) array to broadcast 
+        against (stimuli, 2, samples) signals.
+    """
+    half = np.asarray(db2mag(np.asarray(ild)/2))
+    return np.stack([1/half, half], axis=1)[:, :, np.newaxis]
+
+
 def mkGaborClick(cf, dur, itd, ild, fs):
     """ 
         MKGABORCLICKS Generate two Gabor clicks with a 
@@ -367,6 +516,50 @@ def mkGaborClick(cf, dur, itd, ild, fs):
     return clickBoth
 
 
+def mkGaborClickBatch(cf, dur, itd, ild, fs, filename=None, 
+    chunk=BATCH_CHUNK):
+    """
+        Vectorized mkGaborClick over arrays of parameters. 
+        Returns an array of shape (n_stimuli, 2, n_samples).
+
+        CF, ITD and ILD may be scalars or arrays; they are 
+        broadcast against each other and flattened in C order 
+        (use np.meshgrid(..., indexing='ij') for full grids). 
+        DUR and FS are shared by every stimulus. Clicks with 
+        smaller ITDs are shorter than the longest click and are 
+        zero-padded at the end to n_samples.
+
+        FILENAME: optional .npy path; stimuli are streamed to 
+            disk CHUNK at a time (see _fill_batch)
+
+        EXAMPLE: 
+            cfs, itds = np.meshgrid([2000,4000], [-300,0,300], 
+                indexing='ij')
+            clicks = mkGaborClickBatch(cfs, 0.002, itds, 0, 48000)
+    """
+    dur = dur * fs
+    sd = dur / 6.66
+    itd_max = np.max(np.abs(fs * np.asarray(itd, dtype=float) / 1000000))
+    nsamps = int(np.ceil(dur + itd_max))
+
+    def core(cf, itd, ild):
+        cf = cf[:, np.newaxis, np.newaxis] / fs
+        itd = fs * itd / 1000000
+        fulldur = (dur + np.abs(itd))[:, np.newaxis, np.newaxis]
+        # Same time base as mkGaborClick, offset per stimulus
+        n = np.arange(1, nsamps+1)
+        t = n - (fulldur/2)
+        shifts = np.stack([-itd/2, itd/2], axis=1)[:, :, np.newaxis]
+        tshift = t + shifts # [tlead, tlag]
+        clicks = np.cos(2*np.pi*cf*tshift) * np.exp(np.square(tshift/sd)*-1)
+        clicks *= _ild_gains(ild)
+        # Zero samples beyond each click's own length
+        clicks *= n <= np.ceil((fulldur + 1) - 1)
+        return clicks
+
+    return _fill_batch(core, [cf, itd, ild], nsamps, filename, chunk)
+
+
 def mkIPD(freq,dur,ipd,ild,fs=48000):
     """
         Create a binaural pure tone at frequency FREQ 
@@ -406,6 +599,34 @@ def mkIPD(freq,dur,ipd,ild,fs=48000):
     return sig2chan
 
 
+def mkIPDBatch(freq, dur, ipd, ild, fs=48000, filename=None, 
+    chunk=BATCH_CHUNK):
+    """
+        Vectorized mkIPD over arrays of parameters. Returns an 
+        array of shape (n_stimuli, 2, n_samples).
+
+        FREQ, IPD and ILD may be scalars or arrays; they are 
+        broadcast against each other and flattened in C order. 
+        DUR and FS are shared by every stimulus.
+
+        FILENAME: optional .npy path; stimuli are streamed to 
+            disk CHUNK at a time (see _fill_batch)
+
+        EXAMPLE: sigs = mkIPDBatch([500, 1000], 0.1, [[0], [90]], -2)
+    """
+    t = np.arange(0,dur,1/fs) # same time base as mkTone
+
+    def core(freq, ipd, ild):
+        # Apply +/- half of phase to each channel
+        phis = np.radians(np.stack([-ipd/2, ipd/2], axis=1))
+        sigs = np.sin(2*np.pi*freq[:, np.newaxis, np.newaxis]*t 
+            + phis[:, :, np.newaxis])
+        sigs *= _ild_gains(ild)
+        return sigs
+
+    return _fill_batch(core, [freq, ipd, ild], len(t), filename, chunk)
+
+
 def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
     """
         Create a binaural pure tone at frequency FREQ with 
@@ -477,10 +698,76 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
     return sigBoth
 
 
+def mkITDBatch(freq, dur, itd, ild, rampdur, fs=48000, filename=None, 
+    chunk=BATCH_CHUNK):
+    """
+        Vectorized mkITD over arrays of parameters. Returns an 
+        array of shape (n_stimuli, 2, n_samples).
+
+        FREQ, ITD and ILD may be scalars or arrays; they are 
+        broadcast against each other and flattened in C order 
+        (use np.meshgrid(..., indexing='ij') for full grids). 
+        DUR, RAMPDUR and FS are shared by every stimulus. 
+        Stimuli with smaller ITDs are shorter than the longest 
+        stimulus and are zero-padded at the end to n_samples.
+
+        FILENAME: optional .npy path; stimuli are streamed to 
+            disk CHUNK at a time (see _fill_batch)
+
+        EXAMPLE: 
+            f, itd, ild = np.meshgrid([500,1000], [-800,0,800], 
+                [-2,0,2], indexing='ij')
+            sigs = mkITDBatch(f, 0.05, itd, ild, 0.02, 48000, 
+                filename='itd_grid.npy')
+    """
+    dur = round(dur * fs) # stim duration in seconds to samples
+    rampdur = round(rampdur * fs)
+    itd_max = np.max(np.abs(fs * np.asarray(itd, dtype=float) / 1000000))
+    nsamps = int(np.ceil(dur + itd_max))
+
+    # Same raised-cosine gate as mkITD, with a trailing 1 so 
+    # indexing still works when rampdur is 0
+    gate = np.cos(np.linspace(np.pi, 2*np.pi, rampdur))
+    gate = (gate + 1) / 2
+    gate = np.append(gate, 1.0)
+
+    def core(freq, itd, ild):
+        freq = freq[:, np.newaxis, np.newaxis] / fs
+        itd = fs * itd / 1000000 # unrounded samples
+        itd_int = np.ceil(np.abs(itd)/2) # rounded itd samples
+        fulldur = np.ceil(dur + np.abs(itd))
+        sustain = fulldur - (2*rampdur) - itd_int
+
+        # The ear whose envelope is padded at the start uses 
+        # the "lead" time vector; the other ear uses "lag"
+        shifts = np.stack([-itd/2, itd/2], axis=1)[:, :, np.newaxis]
+        onsets = np.stack([itd_int*(itd > 0), itd_int*(itd < 0)], 
+            axis=1)[:, :, np.newaxis]
+        sustain = sustain[:, np.newaxis, np.newaxis]
+
+        # Build gated envelopes: ramp, sustain, ramp, zeros
+        t = np.arange(nsamps)
+        rel = t - onsets
+        off = rel - rampdur - sustain
+        env = np.where(rel < rampdur, 
+            gate[np.clip(rel, 0, rampdur).astype(int)], 1.0)
+        env = np.where(off >= 0, 
+            gate[np.clip(rampdur - 1 - off, 0, rampdur).astype(int)], env)
+        env[(rel < 0) | (off >= rampdur)] = 0
+
+        sigs = np.sin(2*np.pi*freq*(t + shifts)) * env
+        sigs *= _ild_gains(ild)
+        return sigs
+
+    return _fill_batch(core, [freq, itd, ild], nsamps, filename, chunk)
+
+
 def mkNoise(freqs,dur,fs):
     """ Create a brief noise using additive synthesis and random 
         phases. WARNING: Durations longer than 1 second will 
-        repeat. Large bandwidths can take a while to process.
+        repeat. Integer-Hz frequency lists are synthesized with 
+        a single inverse FFT (see addSynth), so large bandwidths 
+        are fast.
         
             FREQS: a list of frequencies to be included in the noise
             DUR: duration in seconds
@@ -21,6 +21,22 @@ import matplotlib.pyplot as plt
 from matplotlib import rcParams
 rcParams.update({'figure.autolayout': True})
 
+# System
+import os
+import sys
+
+# Custom
+from responses import normalize_responses
+from responses import percent_tables
+# Shared analysis modules (one copy, in data_analysis)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data_analysis'))
+from batch_render import FigureJob, render_jobs
+
+# Where saved plots go (set DEM_PLOT_DIR to override)
+PLOT_DIR = os.environ.get('DEM_PLOT_DIR',
+    r'C:\Users\MooTra\OneDrive - Starkey\Desktop\DEM Plots')
+
 plt.rcParams['figure.figsize'] = [12, 8]
 
 #plt.style.use('seaborn-v0_8')
@@ -54,6 +70,7 @@ app_data = pd.read_csv('app_data.csv')
 
 df = pd.concat([df, app_data])
 df.reset_index(drop=True, inplace=True)
+df = normalize_responses(df)
 df.to_csv('all_data.csv', index=False)
 
 
@@ -78,62 +95,45 @@ label_list = ['Satisfaction', 'Appropriate Time for Change',
               'Speed of Transition', 'DEM vs Normal Program', 
               'Satisfaction with Snapshot (Toggling)']
 results = {}
+def plot_stacked_bar(y_wide, title):
+    """ Stacked bar plot of one percentage table (see 
+        responses.percent_tables).
+    """
+    # Display the plot
+    y_wide.plot(x='subject', kind='bar', stacked=True)
+    plt.ylabel('Percent of Responses')
+    plt.xlabel('Subject Number')
+    plt.title(title)
+    plt.legend(loc='upper left', facecolor='white', framealpha=1)
+
+    # Display percents on the stacked bars
+    df_rel = y_wide[y_wide.columns[1:]]
+    for n in df_rel:
+        for i, (cs, ab, pc, tot) in enumerate(zip(y_wide.iloc[:, 1:].cumsum(1)[n], y_wide[n], df_rel[n], y_wide[n])):
+            #plt.text(tot, i, str(tot), va='center')
+            #plt.text(i, tot, str(round(tot,1)), va='center', ha='center')
+            #plt.text(cs - ab/2, i, str(np.round(pc, 1)) + '%', va='center', ha='center')
+            #plt.text(i, cs - ab/2, str(np.round(pc, 1)) + '%', ha='center')
+            plt.text(i, cs - ab/2, str(int(pc)) + '%', ha='center')
+
+
 def stacked_bar(show='y', save='n'):
+    # Percentage tables for every question at once
+    results.update(percent_tables(df))
+
     for ii, q in enumerate(list(df.columns[1:])):
-        # Get response counts
-        vals = pd.DataFrame(df.loc[:, ['subject', q]].value_counts())
-        vals.rename(columns={0:'count'}, inplace=True)
-        print(f"\nOriginal Counts: {vals}")
-
-        total_count = vals.groupby(['subject']).sum()
-
-        # Get list of subjects
-        subs = list(vals.index.get_level_values('subject').unique())
-
-        # Add 0 for missing responses
-        # Convert existing reponse counts to percentage
-        for resp in vals.index.get_level_values(q).unique():
-            for sub in subs:
-                try:
-                    vals.loc[(sub, resp), :] = np.round(float(vals.loc[(sub, resp)]) / float(total_count.loc[sub]), 2) * 100
-                except KeyError:
-                    vals.loc[(sub, resp), :] = 0.0
-        print(f"\nPercentages: {vals}")
-    
-        # Make wide dataframe for stacked bar plot func
-        y = vals.reset_index()
-        y.sort_values(by='subject', inplace=True)
-        y_wide = y.pivot(index='subject', columns=q, values='count').reset_index()
-
-        # Add group data
-        newrow = list(y_wide.mean()[1:])
-        newrow = [round(num, 2) for num in newrow]
-        newrow.insert(0, 'Average')
-        y_wide.loc[len(y_wide.index)] = newrow
+        y_wide = results[q]
         print(y_wide)
-        results[q] = y_wide
-
-        # Display the plot
-        y_wide.plot(x='subject', kind='bar', stacked=True)
-        plt.ylabel('Percent of Responses')
-        plt.xlabel('Subject Number')
-        plt.title(q.capitalize() + ': ' + label_list[ii])
-        plt.legend(loc='upper left', facecolor='white', framealpha=1)
-
-        # Display percents on the stacked bars
-        df_rel = y_wide[y_wide.columns[1:]]
-        for n in df_rel:
-            for i, (cs, ab, pc, tot) in enumerate(zip(y_wide.iloc[:, 1:].cumsum(1)[n], y_wide[n], df_rel[n], y_wide[n])):
-                #plt.text(tot, i, str(tot), va='center')
-                #plt.text(i, tot, str(round(tot,1)), va='center', ha='center')
-                #plt.text(cs - ab/2, i, str(np.round(pc, 1)) + '%', va='center', ha='center')
-                #plt.text(i, cs - ab/2, str(np.round(pc, 1)) + '%', ha='center')
-                plt.text(i, cs - ab/2, str(int(pc)) + '%', ha='center')
+
+        # Tables only; no plotting
+        if show != 'y' and save != 'y':
+            continue
+
+        plot_stacked_bar(y_wide, q.capitalize() + ': ' + label_list[ii])
 
         # Save/show?
         if save == 'y':
-            desktop = r'C:\Users\MooTra\OneDrive - Starkey\Desktop\DEM Plots'
-            plt.savefig(desktop + f'\{q + "_all_data_stacked"}.png')
+            plt.savefig(os.path.join(PLOT_DIR, q + "_all_data_stacked.png"))
 
         if show == 'y':
             plt.show()
@@ -143,6 +143,14 @@ def stacked_bar(show='y', save='n'):
 # Call stacked bar plot func
 stacked_bar(show='n', save='n')
 
+# Render every stacked bar plot headlessly, in parallel
+# (see batch_render.py; unchanged tables are skipped)
+BATCH_RENDER = False
+if BATCH_RENDER and __name__ == '__main__':
+    render_jobs([FigureJob(q + '_all_data_stacked', plot_stacked_bar,
+        args=(results[q], q.capitalize() + ': ' + label_list[ii]))
+        for ii, q in enumerate(list(df.columns[1:]))], out_dir=PLOT_DIR)
+
 
 #####################
 # Statistical Tests #
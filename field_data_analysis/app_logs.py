@@ -0,0 +1,102 @@
+""" Loader for DEM field trial app logs.
+
+    Each log is a transposed key/value .csv file: one
+    "Key,Value" row per field. Logs are parsed directly
+    (no pandas transpose) in a thread pool, checked for
+    the required keys and combined into a single typed
+    dataframe. Files that cannot be read or are missing
+    required keys are listed in a summary instead of
+    being skipped silently.
+"""
+
+###########
+# Imports #
+###########
+# Data science
+import pandas as pd
+
+# System
+import csv
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+
+#############
+# Constants #
+#############
+# Log keys (as written by the app) and new column names
+FIELDS = {
+    'ParticipantID': 'subject',
+    'QuestionnarieOne': 'q5',
+    'QuestionnarieTwo': 'q6a',
+    'QuestionnaireThree': 'q6b',
+    'QuestionnaireFour': 'q6c',
+    'QuestionnaireFive': 'q6d',
+    'QuestionnaireSix': 'q7a',
+    'QuestionnaireSeven': 'q7b'
+}
+
+# Keys that must be present in every log
+REQUIRED_KEYS = list(FIELDS)
+
+
+#############
+# Functions #
+#############
+def parse_log(file):
+    """ Parse one app log into a dict of {column: value}.
+        Empty values become None. Values that contain
+        unquoted commas are rejoined. Raises ValueError if
+        a required key is missing.
+    """
+    record = {}
+    with open(file, 'r', newline='', encoding='utf-8-sig') as fh:
+        for row in csv.reader(fh):
+            if not row or row[0] not in FIELDS or FIELDS[row[0]] in record:
+                continue
+            value = ','.join(row[1:]).strip()
+            record[FIELDS[row[0]]] = value if value else None
+
+    missing = [key for key in REQUIRED_KEYS if FIELDS[key] not in record]
+    if missing:
+        raise ValueError(f"Missing keys: {missing}")
+    return record
+
+
+def _parse(file):
+    """ Worker: return (record, None) or (None, error) """
+    try:
+        return parse_log(file), None
+    except (OSError, UnicodeDecodeError, csv.Error, ValueError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def load_logs(path, pattern='*.csv', max_workers=8):
+    """ Load every app log in PATH.
+
+        Returns (data, problems):
+            DATA: one row per valid log, with the columns
+                in FIELDS (all 'string' dtype)
+            PROBLEMS: file name and error for every log
+                that could not be used
+    """
+    files = sorted(Path(path).glob(pattern))
+    print(f"\napp_logs: Found {len(files)} files")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_parse, files))
+
+    records = [rec for rec, err in results if err is None]
+    problems = pd.DataFrame(
+        [(file.name, err) for file, (rec, err) in zip(files, results)
+            if err is not None],
+        columns=['file', 'error'])
+
+    data = pd.DataFrame.from_records(records, columns=list(FIELDS.values()))
+    data = data.astype('string')
+
+    print(f"app_logs: Loaded {len(data)} logs; {len(problems)} problem files")
+    if len(problems) > 0:
+        print(problems.to_string(index=False))
+
+    return data, problems
@@ -20,6 +20,17 @@ import matplotlib.pyplot as plt
 from matplotlib import rcParams
 rcParams.update({'figure.autolayout': True})
 
+# System
+import os
+
+# Custom
+from responses import normalize_responses
+from responses import percent_tables
+
+# Where saved plots go (set DEM_PLOT_DIR to override)
+PLOT_DIR = os.environ.get('DEM_PLOT_DIR',
+    r'C:\Users\MooTra\OneDrive - Starkey\Desktop\DEM Plots')
+
 
 
 # Generate dict of questions and responses for plotting
@@ -56,6 +67,7 @@ data.columns = ['journal_id', 'subject', 'entry_date', 'q1', 'q2', 'q3', 'q5', '
  'q6b', 'q6c', 'q6d', 'q7a', 'q7b', 'q4', 'q8']
 
 df = data.iloc[:, [1, 6, 7, 8, 9, 10, 11, 12]].copy()
+df = normalize_responses(df)
 
 df.to_csv('binder_data.csv', index=False)
 
@@ -64,59 +76,43 @@ df.to_csv('binder_data.csv', index=False)
 ####################
 # Stacked Bar Plot #
 ####################
+def plot_stacked_bar(y_wide, title):
+    """ Stacked bar plot of one percentage table (see 
+        responses.percent_tables).
+    """
+    # Display the plot
+    y_wide.plot(x='subject', kind='bar', stacked=True)
+    plt.ylabel('Percent of Responses')
+    plt.xlabel('Subject Number')
+    plt.title(title)
+
+    # Display percents on the stacked bars
+    df_rel = y_wide[y_wide.columns[1:]]
+    for n in df_rel:
+        for i, (cs, ab, pc, tot) in enumerate(zip(y_wide.iloc[:, 1:].cumsum(1)[n], y_wide[n], df_rel[n], y_wide[n])):
+            #plt.text(tot, i, str(tot), va='center')
+            #plt.text(i, tot, str(round(tot,1)), va='center', ha='center')
+            #plt.text(cs - ab/2, i, str(np.round(pc, 1)) + '%', va='center', ha='center')
+            plt.text(i, cs - ab/2, str(np.round(pc, 1)) + '%', ha='center')
+
+
 def stacked_bar(show='y', save='n'):
+    # Percentage tables for every question at once
+    tables = percent_tables(df)
+
     for ii, q in enumerate(list(df.columns[1:])):
-        # Get response counts
-        vals = pd.DataFrame(df.loc[:, ['subject', q]].value_counts())
-        vals.rename(columns={0:'count'}, inplace=True)
-        print(f"\nOriginal Counts: {vals}")
-
-        total_count = vals.groupby(['subject']).sum()
-
-        # Get list of subjects
-        subs = list(vals.index.get_level_values('subject').unique())
-
-        # Add 0 for missing responses
-        # Convert existing reponse counts to percentage
-        for resp in vals.index.get_level_values(q).unique():
-            for sub in subs:
-                try:
-                    vals.loc[(sub, resp), :] = np.round(float(vals.loc[(sub, resp)]) / float(total_count.loc[sub]), 2) * 100
-                except KeyError:
-                    vals.loc[(sub, resp), :] = 0.0
-        print(f"\nPercentages: {vals}")
-    
-        # Make wide dataframe for stacked bar plot func
-        y = vals.reset_index()
-        y.sort_values(by='subject', inplace=True)
-        y_wide = y.pivot(index='subject', columns=q, values='count').reset_index()
-
-        # Add group data
-        newrow = list(y_wide.mean()[1:])
-        newrow = [round(num, 2) for num in newrow]
-        newrow.insert(0, 'Average')
-        y_wide.loc[len(y_wide.index)] = newrow
+        y_wide = tables[q]
         print(y_wide)
 
-        # Display the plot
-        y_wide.plot(x='subject', kind='bar', stacked=True)
-        plt.ylabel('Percent of Responses')
-        plt.xlabel('Subject Number')
-        plt.title(q.capitalize() + ': ' + label_list[ii])
-
-        # Display percents on the stacked bars
-        df_rel = y_wide[y_wide.columns[1:]]
-        for n in df_rel:
-            for i, (cs, ab, pc, tot) in enumerate(zip(y_wide.iloc[:, 1:].cumsum(1)[n], y_wide[n], df_rel[n], y_wide[n])):
-                #plt.text(tot, i, str(tot), va='center')
-                #plt.text(i, tot, str(round(tot,1)), va='center', ha='center')
-                #plt.text(cs - ab/2, i, str(np.round(pc, 1)) + '%', va='center', ha='center')
-                plt.text(i, cs - ab/2, str(np.round(pc, 1)) + '%', ha='center')
+        # Tables only; no plotting
+        if show != 'y' and save != 'y':
+            continue
+
+        plot_stacked_bar(y_wide, q.capitalize() + ': ' + label_list[ii])
 
         # Save/show?
         if save == 'y':
-            desktop = r'C:\Users\MooTra\OneDrive - Starkey\Desktop\DEM Plots'
-            plt.savefig(desktop + f'\{q + "_binder_stacked"}.png')
+            plt.savefig(os.path.join(PLOT_DIR, q + "_binder_stacked.png"))
 
         if show == 'y':
             plt.show()
@@ -151,8 +147,8 @@ def pie_chart(data, question, blurb, show='y', save='n'):
     plt.title(f"{blurb}")
 
     if save == 'y':
-        desktop = r'C:\Users\MooTra\OneDrive - Starkey\Desktop\DEM Plots'
-        plt.savefig(desktop + f'\{question}.png', bbox_inches='tight')
+        plt.savefig(os.path.join(PLOT_DIR, question + ".png"),
+            bbox_inches='tight')
         #time.sleep(1)
 
     if show == 'y':
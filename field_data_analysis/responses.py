@@ -0,0 +1,124 @@
+""" Response normalization for DEM field trial data.
+
+    Questionnaire responses (app logs and binder journals)
+    are cleaned with vectorized string operations: each
+    question column is lowercased, recoded using the
+    mapping table for that question (if any) and stored
+    as an ordered pandas categorical. Questions answered
+    only with numbers stay numeric, and numbers sort by
+    value (2 before 10), then text answers alphabetically.
+
+    Response percentage tables (for the stacked bar plots)
+    are also computed here, without matplotlib.
+"""
+
+###########
+# Imports #
+###########
+# Data science
+import numpy as np
+import pandas as pd
+
+
+#############
+# Constants #
+#############
+# Question columns shared by the app and binder data
+QUESTIONS = ['q5', 'q6a', 'q6b', 'q6c', 'q6d', 'q7a', 'q7b']
+
+# Per-question recoding tables: {question: {old: new}}
+# (applied after lowercasing)
+RESPONSE_MAPS = {
+    'q7a': {
+        'personal program': 'personal',
+        'adaptive feature': 'dem'
+    }
+}
+
+
+#############
+# Functions #
+#############
+def _response_key(response):
+    """ Sort key: numbers by value, then text """
+    try:
+        return (0, float(response), '')
+    except (TypeError, ValueError):
+        return (1, 0.0, str(response))
+
+
+def _as_numeric(col):
+    """ COL as numbers (integers if possible) if every
+        answer is a number; otherwise COL unchanged
+    """
+    nums = pd.to_numeric(col, errors='coerce')
+    if not col.notna().any() or nums.notna().sum() != col.notna().sum():
+        return col
+    if (nums.dropna() % 1 == 0).all():
+        return nums.astype('Int64')
+    return nums
+
+
+def normalize_responses(data, questions=None, maps=None, categorical=True):
+    """ Return a copy of DATA with each question column
+        lowercased, recoded with MAPS and (optionally)
+        converted to an ordered categorical. Columns of
+        numeric answers are converted back to numbers.
+        Missing responses stay missing.
+
+        QUESTIONS: columns to normalize (default: every
+            column of QUESTIONS found in DATA)
+        MAPS: recoding tables (default: RESPONSE_MAPS)
+    """
+    if questions is None:
+        questions = [q for q in QUESTIONS if q in data.columns]
+    if maps is None:
+        maps = RESPONSE_MAPS
+
+    data = data.copy()
+    for q in questions:
+        col = data[q].astype('string').str.lower()
+        if q in maps:
+            col = col.replace(maps[q])
+        col = _as_numeric(col)
+        if categorical:
+            order = sorted(col.dropna().unique(), key=_response_key)
+            col = pd.Categorical(col, categories=order, ordered=True)
+        data[q] = col
+    return data
+
+
+def percent_tables(data, questions=None, subject_col='subject'):
+    """ Percentage of each response per subject, for every 
+        question at once (one crosstab on the long-format 
+        data). Percentages are rounded to whole percents, 
+        as (count / total, rounded to 2 decimals) * 100. 
+        Missing responses are not counted.
+
+        Returns {question: table}. Each table is wide: a 
+        SUBJECT_COL column, one column per response (numbers 
+        in numeric order, then text; see NORMALIZE_RESPONSES) 
+        and an 'Average' row with the mean across subjects.
+    """
+    if questions is None:
+        questions = [q for q in data.columns if q != subject_col]
+
+    long = data.melt(id_vars=[subject_col], value_vars=questions,
+        var_name='question', value_name='response').dropna()
+    order = sorted(long['response'].unique(), key=_response_key)
+    long['response'] = pd.Categorical(long['response'], categories=order,
+        ordered=True)
+    pct = pd.crosstab([long['question'], long[subject_col]],
+        long['response'], normalize='index')
+    pct = np.round(pct, 2) * 100
+
+    tables = {}
+    for q in questions:
+        answered = set(long.loc[long['question'] == q, 'response'])
+        responses = [resp for resp in order if resp in answered]
+        table = pct.loc[q, responses].sort_index()
+        table.loc['Average'] = np.round(table.mean(), 2)
+        table.columns.name = q
+        table.index.name = subject_col
+        tables[q] = table.reset_index()
+    return tables
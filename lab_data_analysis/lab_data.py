@@ -32,7 +32,14 @@ plt.rc('legend', fontsize=BIGGER_SIZE)    # legend fontsize
 plt.xticks(rotation=45, ha='right')
 
 # Import system packages
-from pathlib import Path
+import os
+import sys
+
+# Import custom modules
+# Shared analysis modules (one copy, in data_analysis)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data_analysis'))
+from session_store import SessionStore
 
 
 #########
@@ -49,11 +56,15 @@ def to_percent(s):
 #############
 # To single df
 _path = r'\\starfile\Public\Temp\MooreT\DEM\Vesta Data'
-files = Path(_path).glob('*.csv')
-
-try:
-    df = pd.concat((pd.read_csv(f) for f in files), ignore_index=True)
-except ValueError:
+# Only new or changed sessions are parsed (see session_store.py);
+# the store lives next to this script, not in the working directory
+store = SessionStore(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session_store'),
+    study='Vesta', partition_cols=['subject'])
+store.ingest(_path)
+df = store.load()
+
+if df.empty:
     print('\nlab_data: No files were found!\n')
     quit()
 
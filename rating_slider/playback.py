@@ -0,0 +1,335 @@
+""" Playback engine:
+    One long-lived sounddevice OutputStream for every
+    trial. Audio is written to a ring buffer that the
+    stream callback reads from, so presenting a stimulus
+    never opens or closes a PortAudio stream. Supports
+    queueing, instant stop/replace and routing audio to
+    output channels (e.g., 'Speaker Number').
+
+    The ring buffer has a single writer (the GUI thread)
+    and a single reader (the stream callback). Each side
+    only ever advances its own index, so no lock is
+    needed.
+
+    Pass backend=FakeOutputStream to run without a
+    sound card (e.g., for testing).
+"""
+
+# Import data science packages
+import numpy as np
+
+# Import system packages
+from collections import deque
+from types import SimpleNamespace
+
+
+class RingBuffer:
+    """ Single-producer, single-consumer ring buffer of
+        multichannel float32 audio. Indexes only ever
+        increase; slots are index % capacity.
+    """
+    def __init__(self, capacity, channels):
+        self.capacity = int(capacity)
+        self.channels = channels
+        self.data = np.zeros((self.capacity, channels), dtype=np.float32)
+        self.write_idx = 0 # only advanced by the writer
+        self.read_idx = 0 # only advanced by the reader
+
+
+    def free(self, read_from=0):
+        """ Free frames. READ_FROM: index the reader will
+            resume from, if ahead of READ_IDX (e.g., a
+            pending flush; see PlaybackEngine.stop)
+        """
+        start = max(self.read_idx, read_from)
+        return self.capacity - (self.write_idx - start)
+
+
+    def available(self):
+        return self.write_idx - self.read_idx
+
+
+    def write(self, block, read_from=0):
+        """ Copy BLOCK (frames x channels) into the buffer,
+            then publish it by advancing the write index.
+            Frames before READ_FROM count as free (see FREE).
+        """
+        n = len(block)
+        free = self.free(read_from)
+        if n > free:
+            raise ValueError(f"Playback buffer full: {n} frames " +
+                f"queued, {free} free. Use a longer buffer_dur.")
+        start = self.write_idx % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start+first] = block[0:first]
+        self.data[0:n-first] = block[first:]
+        self.write_idx += n
+
+
+    def read_into(self, out):
+        """ Copy up to len(OUT) frames into OUT (zero filling
+            the rest). Returns the number of frames read.
+        """
+        n = min(len(out), self.available())
+        start = self.read_idx % self.capacity
+        first = min(n, self.capacity - start)
+        out[0:first] = self.data[start:start+first]
+        out[first:n] = self.data[0:n-first]
+        out[n:] = 0
+        self.read_idx += n
+        return n
+
+
+class PlaybackEngine:
+    """ Persistent output stream fed from a ring buffer.
+
+        FS: sampling rate in Hz
+        DEVICE: output device ID (None for the default)
+        MIN_CHANNELS: open at least this many output channels,
+            so common mappings don't reopen the stream
+        BUFFER_DUR: ring buffer length in seconds (the
+            longest audio that can be queued at once)
+        BLOCKSIZE, LATENCY: passed to the stream
+        BACKEND: stream class (sd.OutputStream by default)
+    """
+    def __init__(self, fs=48000, device=None, min_channels=2,
+        buffer_dur=60, blocksize=0, latency='low', backend=None):
+        if backend is None:
+            import sounddevice as sd
+            backend = sd.OutputStream
+        self.backend = backend
+        self.fs = fs
+        self.device = device
+        self.min_channels = min_channels
+        self.buffer_dur = buffer_dur
+        self.blocksize = blocksize
+        self.latency_setting = latency
+
+        self.channels = min_channels
+        self.stream = None
+        self.ring = None
+
+        # Flush requests from the writer (see stop)
+        self._flush_to = 0
+        self._flush_req = 0
+        self._flush_done = 0
+
+        # (start index, queue time) of each queued signal
+        self._starts = deque()
+
+        # Measured latencies in seconds
+        self.buffer_latency = None # callback to DAC
+        self.start_latency = None # queue() call to DAC
+
+
+    #####################
+    # Stream management #
+    #####################
+    def start(self):
+        """ Open and start the output stream """
+        if self.stream is not None:
+            return
+        self.ring = RingBuffer(self.buffer_dur * self.fs, self.channels)
+        self._starts.clear()
+        self._flush_to = 0
+        self._flush_req = 0
+        self._flush_done = 0
+        self.stream = self.backend(
+            samplerate=self.fs,
+            device=self.device,
+            channels=self.channels,
+            dtype='float32',
+            blocksize=self.blocksize,
+            latency=self.latency_setting,
+            callback=self._callback
+        )
+        self.stream.start()
+        print(f"Playback: Opened output stream: {self.channels} " +
+            f"channels, {self.fs} Hz, device {self.device}")
+
+
+    def close(self):
+        """ Stop and close the output stream """
+        if self.stream is None:
+            return
+        self.stream.stop()
+        self.stream.close()
+        self.stream = None
+        self.ring = None
+
+
+    def _configure(self, fs, device, channels):
+        """ Reopen the stream only if the sampling rate,
+            device or number of channels has to change
+        """
+        channels = max(self.min_channels, channels)
+        if device is None:
+            device = self.device
+        if (self.stream is not None and fs == self.fs and
+            device == self.device and channels <= self.channels):
+            return
+        self.close()
+        self.fs = fs
+        self.device = device
+        self.channels = max(self.channels, channels)
+        self.start()
+
+
+    #############
+    # Callback #
+    #############
+    def _callback(self, outdata, frames, time, status):
+        """ Stream callback: copy the next block from the ring
+            buffer. Runs on the audio thread.
+        """
+        if status:
+            print(f"Playback: {status}")
+        ring = self.ring
+
+        # Skip audio discarded by stop/replace
+        req = self._flush_req
+        if req != self._flush_done:
+            ring.read_idx = max(ring.read_idx, self._flush_to)
+            self._flush_done = req
+            while self._starts and self._starts[0][0] < ring.read_idx:
+                self._starts.popleft()
+
+        before = ring.read_idx
+        ring.read_into(outdata)
+
+        # Latency measurements
+        self.buffer_latency = time.outputBufferDacTime - time.currentTime
+        while self._starts and self._starts[0][0] < ring.read_idx:
+            start_idx, t_queued = self._starts.popleft()
+            dac_time = time.outputBufferDacTime + (start_idx - before) / self.fs
+            self.start_latency = dac_time - t_queued
+
+
+    ############
+    # Playback #
+    ############
+    def _map(self, sig, mapping):
+        """ Route the columns of SIG to the 1-based output
+            channels in MAPPING. A 1-channel SIG is sent to
+            every mapped channel. A single channel number
+            maps a multichannel SIG to consecutive channels
+            starting at that number.
+        """
+        sig = np.asarray(sig, dtype=np.float32)
+        if sig.ndim == 1:
+            sig = sig[:, np.newaxis]
+        if mapping is None:
+            mapping = 1
+        if np.isscalar(mapping):
+            mapping = range(mapping, mapping + sig.shape[1])
+        mapping = np.atleast_1d(mapping).astype(int)
+        if sig.shape[1] not in (1, len(mapping)):
+            raise ValueError(f"Cannot map {sig.shape[1]} channels to " +
+                f"output channels {list(mapping)}")
+        return sig, mapping
+
+
+    def queue(self, sig, fs=None, mapping=None, device=None):
+        """ Add SIG (frames, or frames x channels) to the end
+            of the playback queue.
+
+            MAPPING: 1-based output channel(s) for the columns
+                of SIG (e.g., the 'Speaker Number'). Defaults
+                to the first channels.
+        """
+        sig, mapping = self._map(sig, mapping)
+        self._configure(fs or self.fs, device, int(mapping.max()))
+
+        block = np.zeros((len(sig), self.channels), dtype=np.float32)
+        block[:, mapping - 1] = sig
+        self._starts.append((self.ring.write_idx, self.stream.time))
+        try:
+            # Audio discarded by a pending stop() is free space
+            self.ring.write(block, read_from=self._flush_to)
+        except ValueError:
+            self._starts.pop()
+            raise
+
+
+    def stop(self):
+        """ Discard everything queued. Takes effect at the
+            start of the next callback block; the discarded
+            frames are free for queue() straight away.
+        """
+        if self.ring is None:
+            return
+        self._flush_to = self.ring.write_idx
+        self._flush_req += 1
+
+
+    def play(self, sig, fs=None, mapping=None, device=None):
+        """ Replace anything playing or queued with SIG """
+        self.stop()
+        self.queue(sig, fs=fs, mapping=mapping, device=device)
+
+
+    @property
+    def is_playing(self):
+        if self.ring is None:
+            return False
+        if self._flush_req != self._flush_done:
+            return self.ring.write_idx > self._flush_to
+        return self.ring.available() > 0
+
+
+    @property
+    def latency(self):
+        """ Reported and measured output latency in seconds:
+                reported: PortAudio's output latency
+                buffer: last callback time to DAC time
+                start: last queue() call to its first sample
+                    reaching the DAC
+        """
+        return {
+            'reported': None if self.stream is None else self.stream.latency,
+            'buffer': self.buffer_latency,
+            'start': self.start_latency
+        }
+
+
+class FakeOutputStream:
+    """ Stand-in for sd.OutputStream with no sound card.
+        Call pump() to run the callback; each block it
+        writes is appended to OUTPUT.
+    """
+    def __init__(self, samplerate, channels, callback, device=None,
+        dtype='float32', blocksize=0, latency='low'):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.device = device
+        self.blocksize = blocksize or 512
+        self.latency = self.blocksize / samplerate
+        self.time = 0.0
+        self.active = False
+        self.output = []
+
+
+    def start(self):
+        self.active = True
+
+
+    def stop(self):
+        self.active = False
+
+
+    def close(self):
+        self.active = False
+
+
+    def pump(self, blocks=1):
+        """ Run the callback for BLOCKS blocks """
+        for _ in range(blocks):
+            outdata = np.zeros((self.blocksize, self.channels),
+                dtype=np.float32)
+            time = SimpleNamespace(currentTime=self.time,
+                outputBufferDacTime=self.time + self.latency)
+            self.callback(outdata, self.blocksize, time, None)
+            self.output.append(outdata)
+            self.time += self.blocksize / self.samplerate
+        return np.concatenate(self.output)
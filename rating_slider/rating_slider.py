@@ -24,6 +24,7 @@ import random
 # Import custom modules
 import views as v
 import models as m
+import playback
 from mainmenu import MainMenu
 
 
@@ -43,6 +44,9 @@ class Application(tk.Tk):
         self.sessionpars_model = m.SessionParsModel()
         self._load_sessionpars()
 
+        # One output stream for the whole session
+        self.player = playback.PlaybackEngine()
+
         # Make audio files list model
         self._audio_list = []
         self.audiolist_model = m.AudioList(self.sessionpars)
@@ -64,7 +68,7 @@ class Application(tk.Tk):
         # Create callback dictionary
         event_callbacks = {
             '<<FileSession>>': lambda _: self._show_sessionpars(),
-            '<<FileQuit>>': lambda _: self.quit(),
+            '<<FileQuit>>': lambda _: self._quit(),
             '<<ParsDialogOk>>': lambda _: self._save_sessionpars(),
             '<<ParsDialogCancel>>': lambda _: self._load_sessionpars()
         }
@@ -72,6 +76,9 @@ class Application(tk.Tk):
         for sequence, callback in event_callbacks.items():
             self.bind(sequence, callback)
 
+        # Close the output stream when the window is closed
+        self.protocol('WM_DELETE_WINDOW', self._quit)
+
         # Status label to display trial count
         self.status = tk.StringVar(value="Trials Completed: 0")
         ttk.Label(self, textvariable=self.status).grid(sticky='w', padx=30, pady=(0,10))
@@ -175,7 +182,8 @@ class Application(tk.Tk):
 
                 # Audio object expects a full file path and a presentation level
                 audio_obj = m.Audio(file_path, self.sessionpars['Presentation Level'].get())
-                audio_obj.play()
+                audio_obj.play(engine=self.player,
+                    channels=self.sessionpars['Speaker Number'].get())
                 # Enable submit button on successful presentation
                 self.main_frame.btn_submit.config(state="enabled")
             elif self._records_saved >= len(self._audio_list):
@@ -189,6 +197,7 @@ class Application(tk.Tk):
 
     def _quit(self):
         """ Exit the program """
+        self.player.close()
         self.destroy()
 
 